@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Export a whole workspace folder with one request instead of one per notebook.
+The folder is downloaded as a SOURCE archive (a zip of notebook sources) and
+streamed to disk. Each notebook is then read out of the zip one member at a
+time and rendered locally with the converter into an HTML document. That
+document stands in for the notebook's HTML export, so the wrapper, the
+export manifest and the page cache treat both modes the same way.
+
+Source archives carry no cell results, so pages exported this way show code
+and markdown but no outputs; the default per-notebook HTML export keeps them.
+"""
+
+import os
+import shutil
+import hashlib
+import tempfile
+import posixpath
+import zipfile
+
+from convert_notebooks import CELL_READERS, convert_to_html_fragment
+from highlight import highlight_css
+from instrumentation import stage
+
+ARCHIVE_FORMAT = 'SOURCE'
+
+
+def archive_directory(workspace_paths):
+    """The deepest workspace folder containing every given notebook"""
+    parents = [posixpath.dirname(path) for path in workspace_paths]
+    return posixpath.commonpath(parents) if parents else '/'
+
+
+def is_below(directory, root):
+    """True if workspace folder `directory` is strictly inside `root`"""
+    root = root.rstrip('/')
+    return directory.rstrip('/').startswith(root + '/')
+
+
+def archive_members(archive_path, directory, workspace_paths):
+    """Map each workspace notebook path to its member in the archive
+
+    Members are matched on their path relative to `directory`, without the
+    extension the export adds (.py, .ipynb); archives may or may not put the
+    folder's own name in front. Notebooks in languages the converter cannot
+    read are left out.
+    """
+    wanted = {posixpath.relpath(path, directory): path for path in workspace_paths}
+    folder = posixpath.basename(directory.rstrip('/'))
+    members = {}
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            stem, ext = posixpath.splitext(info.filename)
+            if info.is_dir() or ext not in CELL_READERS:
+                continue
+            relative = stem[len(folder) + 1:] if folder and stem.startswith(folder + '/') else stem
+            path = wanted.get(relative) or wanted.get(stem)
+            if path:
+                members[path] = info.filename
+    return members
+
+
+def notebook_document(name, fragment):
+    """A standalone HTML document for a locally rendered notebook"""
+    return (f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{name}</title>\n'
+            f'<style>\n{highlight_css()}\n</style>\n</head>\n<body>\n{fragment}\n</body>\n</html>\n')
+
+
+def render_member(archive_path, member, name, dest_path):
+    """Render one notebook of the archive into an HTML document at `dest_path`
+
+    The member is copied out under the notebook's own name (the converter
+    reads the format from the extension); returns the document's SHA-256.
+    """
+    ext = posixpath.splitext(member)[1]
+    with tempfile.TemporaryDirectory() as tmp, stage('render', name) as span:
+        source_path = os.path.join(tmp, name + ext)
+        with zipfile.ZipFile(archive_path) as archive, archive.open(member) as src, \
+                open(source_path, 'wb') as out:
+            shutil.copyfileobj(src, out)
+        _, fragment = convert_to_html_fragment(source_path)
+        data = notebook_document(name, fragment).encode('utf-8')
+        span.add_bytes(len(data))
+    with open(dest_path, 'wb') as f:
+        f.write(data)
+    return hashlib.sha256(data).hexdigest()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cell models on a corpus of generated .py notebooks:
+
+  dicts      the original parser, a list of {'type', 'content'} dicts
+  tuples     the line-by-line parser, a list of Cell tuples with their text
+  compact    NotebookCells, offsets into a memory-mapped source
+
+Each model is measured on four workloads: holding every notebook's cells
+at once (retained Python memory; mapped pages are page cache and not
+counted), scanning for kinds and titles, hashing every cell for change
+detection, and reading the full text of every cell as rendering does.
+
+Usage: python3 .github/scripts/benchmarks/bench_cells.py [--notebooks 200] [--cells 200]
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parser import iter_notebook_cells, legacy_parse_databricks_notebook  # noqa: E402
+from corpus import generate_notebook  # noqa: E402
+from notebook_cells import NotebookCells  # noqa: E402
+
+
+def parse_tuples(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(iter_notebook_cells(f))
+
+
+def hold(model, paths):
+    """Every notebook's cells held at once; returns what has to stay alive"""
+    if model == 'dicts':
+        return [legacy_parse_databricks_notebook(path) for path in paths]
+    if model == 'tuples':
+        return [parse_tuples(path) for path in paths]
+    stack = ExitStack()
+    return stack, [stack.enter_context(NotebookCells.open(path)) for path in paths]
+
+
+def scan(model, paths):
+    """Cell kinds and titles across the corpus"""
+    kinds = Counter()
+    titled = 0
+    for path in paths:
+        if model == 'dicts':
+            kinds.update(cell['type'] for cell in legacy_parse_databricks_notebook(path))
+        elif model == 'tuples':
+            for cell in parse_tuples(path):
+                kinds[cell.type] += 1
+                titled += bool(cell.title)
+        else:
+            with NotebookCells.open(path) as cells:
+                for i in range(len(cells)):
+                    kinds[cells.kind(i)] += 1
+                    titled += cells.title_starts[i] >= 0
+    return kinds, titled
+
+
+def digests(model, paths):
+    """One hash per cell, as a per-cell change check would compute"""
+    result = []
+    for path in paths:
+        if model == 'dicts':
+            result += [hashlib.sha256(cell['content'].encode('utf-8')).hexdigest()
+                       for cell in legacy_parse_databricks_notebook(path)]
+        elif model == 'tuples':
+            result += [hashlib.sha256(cell.content.encode('utf-8')).hexdigest() for cell in parse_tuples(path)]
+        else:
+            with NotebookCells.open(path) as cells:
+                result += [cells.digest(i) for i in range(len(cells))]
+    return result
+
+
+def materialise(model, paths):
+    """Total length of every cell's text, read one notebook at a time"""
+    total = 0
+    for path in paths:
+        if model == 'dicts':
+            total += sum(len(cell['content']) for cell in legacy_parse_databricks_notebook(path))
+        elif model == 'tuples':
+            total += sum(len(cell.content) for cell in parse_tuples(path))
+        else:
+            with NotebookCells.open(path) as cells:
+                total += sum(len(cells.text(i)) for i in range(len(cells)))
+    return total
+
+
+def release(result):
+    if isinstance(result, tuple) and isinstance(result[0], ExitStack):
+        result[0].close()
+
+
+def measure(func, model, paths):
+    """(seconds, retained MB, peak MB) of func(model, paths)
+
+    Timed without tracing; memory comes from a second, traced run.
+    """
+    start = time.perf_counter()
+    release(func(model, paths))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = func(model, paths)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    release(result)
+    return elapsed, current / (1024 * 1024), peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the notebook cell models')
+    parser.add_argument('--notebooks', type=int, default=200)
+    parser.add_argument('--cells', type=int, default=200, help='Cells per notebook')
+    parser.add_argument('--cell-lines', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [generate_notebook(os.path.join(tmp, f'notebook_{i:04d}.py'), cells=args.cells,
+                                   cell_lines=args.cell_lines, seed=i)
+                 for i in range(args.notebooks)]
+        corpus_mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+        print(f"{len(paths)} notebooks, {args.cells} cells each, {corpus_mb:.1f} MB")
+
+        for label, func in [('hold all', hold), ('scan', scan), ('hash cells', digests),
+                            ('read text', materialise)]:
+            for model in ('dicts', 'tuples', 'compact'):
+                release(func(model, paths[:1]))   # warm up
+                elapsed, retained, peak = measure(func, model, paths)
+                print(f"{label:>10} {model:>8}: {elapsed:6.2f}s, retained {retained:7.1f} MB, "
+                      f"peak {peak:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark recursive workspace discovery against the local stub list API:
+a cold walk, a warm walk with nothing changed, and a warm walk after one
+nested notebook changed. Every walk lists every directory.
+
+Usage: python3 .github/scripts/benchmarks/bench_discovery.py [--objects 20000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workspace_client import WorkspaceClient  # noqa: E402
+from workspace_discovery import walk_workspace  # noqa: E402
+from stub_workspace import StubWorkspace, start_stub_server, populate_tree, notebook_html  # noqa: E402
+
+ROOT = '/Workspace/Users/stub@example.com'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark workspace discovery')
+    parser.add_argument('--objects', type=int, default=20000, help='Number of notebooks in the stub')
+    parser.add_argument('--latency', type=float, default=0.01, help='Stub latency per request in seconds')
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    workspace = StubWorkspace(args.latency)
+    paths = populate_tree(workspace, args.objects, root=ROOT)
+    server, base_url = start_stub_server(workspace)
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            WorkspaceClient(base_url, 'stub', max_workers=args.workers) as client:
+        cache_path = os.path.join(tmp, 'workspace_index.json')
+
+        def run(label):
+            workspace.request_count = 0
+            start = time.perf_counter()
+            notebooks, stats = walk_workspace(client, ROOT, cache_path)
+            elapsed = time.perf_counter() - start
+            print(f"{label:>14}: {len(notebooks)} notebooks in {elapsed:.2f}s, "
+                  f"{workspace.request_count} requests, {stats['listed']} directories listed, "
+                  f"{stats['reused']} from cache")
+
+        run('cold')
+        run('warm')
+        time.sleep(0.002)
+        workspace.add_notebook(paths[len(paths) // 2], notebook_html('changed'))
+        run('one changed')
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark notebook export against the local stub workspace API: one bare
+requests.get per notebook versus the pooled, concurrent WorkspaceClient.
+
+Usage: python3 .github/scripts/benchmarks/bench_export.py [--notebooks 200] [--latency 0.05]
+"""
+
+import os
+import sys
+import time
+import base64
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workspace_client import WorkspaceClient  # noqa: E402
+from stub_workspace import StubWorkspace, start_stub_server, populate  # noqa: E402
+
+
+def serial_export(base_url, paths):
+    """Original behaviour: unpooled, serial, no retries"""
+    exported = 0
+    for path in paths:
+        response = requests.get(f"{base_url}/api/2.0/workspace/export",
+                                headers={'Authorization': 'Bearer stub'},
+                                params={'path': path, 'format': 'HTML'})
+        if response.status_code == 200:
+            base64.b64decode(response.json()['content']).decode('utf-8')
+            exported += 1
+    return exported
+
+
+def client_export(base_url, paths, workers):
+    """Concurrent streamed exports to disk, as export_databricks_notebooks.py runs them"""
+    with tempfile.TemporaryDirectory() as tmp, \
+            WorkspaceClient(base_url, 'stub', max_workers=workers, backoff_base=0.05) as client, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        dests = [os.path.join(tmp, f'{i}.html') for i in range(len(paths))]
+        return sum(1 for digest in executor.map(client.export_html_to_file, paths, dests) if digest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark workspace export throughput')
+    parser.add_argument('--notebooks', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub latency per request in seconds')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rate-limit-every', type=int, default=25, help='Stub answers every Nth request with 429')
+    args = parser.parse_args()
+
+    workspace = StubWorkspace(args.latency, args.rate_limit_every)
+    paths = populate(workspace, args.notebooks)
+    server, base_url = start_stub_server(workspace)
+
+    try:
+        for label, run in [('serial requests.get', lambda: serial_export(base_url, paths)),
+                           (f'WorkspaceClient x{args.workers}', lambda: client_export(base_url, paths, args.workers))]:
+            workspace.request_count = 0
+            start = time.perf_counter()
+            exported = run()
+            elapsed = time.perf_counter() - start
+            print(f"{label:>24}: {exported}/{len(paths)} exported in {elapsed:.2f}s "
+                  f"({workspace.request_count} requests)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
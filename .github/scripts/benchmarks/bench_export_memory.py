@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compare peak RSS of the in-memory export path (json, b64decode, decode,
+create_wrapper_html) with the streaming path (chunked base64 decode to disk,
+then write_wrapper_html) on a large synthetic export. Each path runs in a
+fresh subprocess so its peak RSS is measured in isolation.
+
+Usage: python3 .github/scripts/benchmarks/bench_export_memory.py [--size-mb 100]
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import resource
+import tempfile
+import subprocess
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from corpus import generate_export_html, write_export_payload  # noqa: E402
+
+
+def run_in_memory(payload_path, output_path):
+    from export_databricks_notebooks import create_wrapper_html
+    with open(payload_path, 'rb') as f:
+        data = json.loads(f.read())
+    html = base64.b64decode(data['content']).decode('utf-8')
+    wrapped = create_wrapper_html('large_notebook', html)
+    with open(output_path, 'w') as f:
+        f.write(wrapped)
+
+
+def run_streaming(payload_path, output_path):
+    from stream_utils import decode_base64_json_field, CHUNK_SIZE
+    from export_databricks_notebooks import write_wrapper_html
+    raw_path = output_path + '.raw'
+    with open(payload_path, 'rb') as f, open(raw_path, 'wb') as raw:
+        decode_base64_json_field(iter(lambda: f.read(CHUNK_SIZE), b''), raw)
+    with open(output_path, 'wb') as out:
+        write_wrapper_html('large_notebook', raw_path, out)
+    os.remove(raw_path)
+
+
+def peak_rss_mb():
+    """Peak RSS of this process; VmHWM is used because ru_maxrss survives exec"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode, payload_path, output_path):
+    # Stylesheet assets are written under ./site, so keep them in the temp dir
+    os.chdir(os.path.dirname(output_path))
+    run = run_in_memory if mode == 'in-memory' else run_streaming
+    start = time.perf_counter()
+    run(payload_path, output_path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark export memory use')
+    parser.add_argument('--size-mb', type=int, default=100, help='Size of the synthetic HTML export')
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'PAYLOAD', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        html_path = generate_export_html(os.path.join(tmp, 'export.html'), args.size_mb * 1024 * 1024)
+        payload_path = write_export_payload(html_path, os.path.join(tmp, 'export.json'))
+        os.remove(html_path)
+        print(f"Synthetic export: {os.path.getsize(payload_path) / (1024 * 1024):.1f} MB of JSON")
+
+        outputs = {}
+        for mode in ['in-memory', 'streaming']:
+            output_path = os.path.join(tmp, f'{mode}.html')
+            result = subprocess.run([sys.executable, __file__, '--child', mode, payload_path, output_path],
+                                    check=True, capture_output=True, text=True)
+            stats = json.loads(result.stdout)
+            print(f"{mode:>10}: {stats['seconds']:.2f}s, peak RSS {stats['peak_rss_mb']:.0f} MB")
+            with open(output_path, 'rb') as f:
+                outputs[mode] = f.read()
+            os.remove(output_path)
+        print(f"Outputs identical: {outputs['in-memory'] == outputs['streaming']}")
+
+
+if __name__ == '__main__':
+    main()
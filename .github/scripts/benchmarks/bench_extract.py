@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark body/style extraction from exported notebook HTML: the regexes
+create_wrapper_html used to run over the whole document versus the single
+pass tokenizer in html_extract.
+
+Besides synthetic exports of the given sizes, a pathological export is
+measured: many <style> tags that are never closed (each one makes the lazy
+regex scan to the end of the document) and markup inside script strings.
+
+Usage: python3 .github/scripts/benchmarks/bench_extract.py [--sizes 10 100]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import EXPORT_HEAD, generate_export_html  # noqa: E402
+from html_extract import scan_html  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def regex_extract(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    body_match = re.search(r'<body[^>]*>(.*?)</body>', html, re.DOTALL)
+    styles = re.findall(r'<style[^>]*>(.*?)</style>', html, re.DOTALL)
+    return len(styles), body_match is not None
+
+
+def tokenizer_extract(path):
+    with open(path, 'rb') as f:
+        extract = scan_html(f)
+    return len(extract.styles), extract.body is not None
+
+
+def generate_pathological(path, target_bytes, unclosed=200):
+    """An export with unclosed <style> tags and tags inside script strings"""
+    filler = '<div class="cell"><p>' + 'Lorem ipsum dolor sit amet. ' * 40 + '</p></div>\n'
+    script = '<script>var t = "<body></body><style>";</script>\n'
+    blocks = max(1, target_bytes // len(filler))
+    every = max(1, blocks // unclosed)
+    with open(path, 'w') as f:
+        f.write(EXPORT_HEAD.format(name='pathological'))
+        for i in range(blocks):
+            f.write(filler)
+            if i % every == 0:
+                f.write('<!-- <style> in a comment -->\n' + script + '<style\n')
+        f.write('</body>\n</html>\n')
+    return path
+
+
+def measure(label, func, path):
+    start = time.perf_counter()
+    result = func(path)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / MB
+    print(f"  {label:>9}: {elapsed:7.3f}s  {size_mb / elapsed:8.1f} MB/s  "
+          f"(styles={result[0]}, body={'yes' if result[1] else 'no'})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML body/style extraction')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100], help='Export sizes in MB')
+    parser.add_argument('--pathological-mb', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = []
+        for size in args.sizes:
+            cases.append((f'{size} MB export', generate_export_html(
+                os.path.join(tmp, f'export_{size}.html'), size * MB, seed=size)))
+        cases.append((f'{args.pathological_mb} MB pathological', generate_pathological(
+            os.path.join(tmp, 'pathological.html'), args.pathological_mb * MB)))
+
+        for label, path in cases:
+            print(label)
+            measure('regex', regex_extract, path)
+            measure('tokenizer', tokenizer_extract, path)
+
+
+if __name__ == '__main__':
+    main()
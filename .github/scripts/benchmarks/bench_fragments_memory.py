@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Compare peak RSS of handing converted notebooks to the site builder through
+one JSON document (every fragment held in a dict, dumped, then loaded back,
+as the converter and builder used to) with publish(), which writes each
+section as soon as it is converted. Both modes convert from a pre-warmed
+fragment cache so the measurement is dominated by the hand-off, and each
+runs in a fresh subprocess so its peak RSS is measured in isolation.
+
+Usage: python3 .github/scripts/benchmarks/bench_fragments_memory.py [--notebooks 100] [--notebook-kb 100]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_databricks_notebook  # noqa: E402
+from bench_export_memory import peak_rss_mb  # noqa: E402
+from convert_notebooks import cache_salt, convert_notebook  # noqa: E402
+from fragment_cache import FragmentCache  # noqa: E402
+
+
+def run_json(paths, cache, site_dir):
+    from build_site import write_manifest, write_section
+    notebook_data = dict(filter(None, (convert_notebook(path, cache) for path in paths)))
+    with open('notebook_fragments.json', 'w') as f:
+        json.dump(notebook_data, f)
+    del notebook_data
+    with open('notebook_fragments.json', 'r') as f:
+        notebooks = json.load(f)
+    os.makedirs(site_dir)
+    write_manifest(site_dir, [write_section(site_dir, name, notebooks[name]) for name in sorted(notebooks)])
+
+
+def run_publish(paths, cache, site_dir):
+    from build_site import write_manifest
+    from publish_site import publish_notebooks
+    finished = publish_notebooks(paths, site_dir, cache=cache)
+    write_manifest(site_dir, [finished[name].entry for name in sorted(finished)])
+
+
+def child(mode, workdir):
+    os.chdir(workdir)
+    paths = sorted(glob.glob('notebooks/*.py'))
+    cache = FragmentCache('cache', salt=cache_salt())
+    run = run_json if mode == 'json' else run_publish
+    start = time.perf_counter()
+    sys.stdout = open(os.devnull, 'w')
+    run(paths, cache, f'site_{mode}')
+    sys.stdout = sys.__stdout__
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fragment hand-off memory use')
+    parser.add_argument('--notebooks', type=int, default=100)
+    parser.add_argument('--notebook-kb', type=int, default=100)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'WORKDIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'notebooks'))
+        paths = [generate_databricks_notebook(os.path.join(tmp, 'notebooks', f'nb_{i:04d}.py'),
+                                              args.notebook_kb * 1024, seed=i)
+                 for i in range(args.notebooks)]
+        print(f"Warming the fragment cache for {len(paths)} notebooks...")
+        cache = FragmentCache(os.path.join(tmp, 'cache'), salt=cache_salt())
+        sys.stdout = open(os.devnull, 'w')
+        for path in paths:
+            convert_notebook(path, cache)
+        sys.stdout = sys.__stdout__
+
+        manifests = {}
+        for mode in ['json', 'publish']:
+            result = subprocess.run([sys.executable, __file__, '--child', mode, tmp],
+                                    check=True, capture_output=True, text=True)
+            stats = json.loads(result.stdout)
+            print(f"{mode:>7}: {stats['seconds']:.2f}s, peak RSS {stats['peak_rss_mb']:.0f} MB")
+            with open(os.path.join(tmp, f'site_{mode}', 'manifest.json')) as f:
+                manifests[mode] = f.read()
+        print(f"Manifests identical: {manifests['json'] == manifests['publish']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark build-time highlighting: converting a corpus with an empty cell
+cache versus a rebuild where every cell is already cached (as after editing
+a single cell of a notebook, which invalidates its fragment but not its cells).
+
+Usage: python3 .github/scripts/benchmarks/bench_highlight.py [--notebooks 20] [--notebook-kb 500]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_databricks_notebook  # noqa: E402
+from convert_notebooks import convert_notebook  # noqa: E402
+from fragment_cache import FragmentCache  # noqa: E402
+from highlight import highlight_salt  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark build-time syntax highlighting')
+    parser.add_argument('--notebooks', type=int, default=20)
+    parser.add_argument('--notebook-kb', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs('notebooks')
+        paths = [generate_databricks_notebook(f'notebooks/nb_{i:03d}.py', args.notebook_kb * 1024, seed=i)
+                 for i in range(args.notebooks)]
+        cell_cache = FragmentCache('cells', salt=highlight_salt())
+
+        outputs = []
+        for label in ('cold cell cache', 'warm cell cache'):
+            start = time.perf_counter()
+            notebook_data = [convert_notebook(path, cell_cache=cell_cache) for path in paths]
+            elapsed = time.perf_counter() - start
+            outputs.append(notebook_data)
+            print(f"{label:>16}: {len(paths)} notebooks in {elapsed:.2f}s")
+        print(f"identical output: {outputs[0] == outputs[1]}")
+
+
+if __name__ == '__main__':
+    main()
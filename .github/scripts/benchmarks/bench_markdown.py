@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for markdown cell rendering: markdown.markdown() per cell
+(a new Markdown instance and extension load each time) versus the reused
+instance in convert_notebooks, with and without its memo cache.
+
+The corpus is the markdown from this repository's notebooks and README,
+sampled into a workload where a share of cells repeats verbatim, as the
+boilerplate headers and disclaimers do across accelerator notebooks.
+
+Usage: python3 .github/scripts/benchmarks/bench_markdown.py [--cells 5000] [--repeat-share 0.6]
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import random
+import argparse
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(os.path.dirname(SCRIPTS_DIR))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import markdown  # noqa: E402
+
+from convert_notebooks import (  # noqa: E402
+    MARKDOWN_EXTENSIONS, CELL_READERS, render_markdown,
+)
+
+
+def repository_markdown():
+    """Markdown cells from notebooks/ plus the README split at its headings"""
+    cells = []
+    for path in sorted(glob.glob(os.path.join(REPO_ROOT, 'notebooks', '*'))):
+        reader = CELL_READERS.get(os.path.splitext(path)[1])
+        if reader:
+            with open(path, 'r', encoding='utf-8') as f:
+                cells.extend(cell.content for cell in reader(f) if cell.type == 'markdown')
+    readme = os.path.join(REPO_ROOT, 'README.md')
+    if os.path.exists(readme):
+        with open(readme, 'r', encoding='utf-8') as f:
+            cells.extend(section for section in re.split(r'\n(?=#)', f.read()) if section.strip())
+    return cells
+
+
+def workload(cells, count, repeat_share, seed=0):
+    """`count` cells: repeated verbatim with probability `repeat_share`, else made unique"""
+    rng = random.Random(seed)
+    return [rng.choice(cells) if rng.random() < repeat_share
+            else f'{rng.choice(cells)}\n\nRevision {i}.'
+            for i in range(count)]
+
+
+def per_cell_instance(text):
+    return markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark markdown cell rendering')
+    parser.add_argument('--cells', type=int, default=5000)
+    parser.add_argument('--repeat-share', type=float, default=0.6)
+    args = parser.parse_args()
+
+    source = repository_markdown()
+    cells = workload(source, args.cells, args.repeat_share)
+    print(f"{len(source)} distinct markdown cells in the repository, workload of {len(cells)} cells")
+
+    outputs = {}
+    renderers = [
+        ('markdown.markdown per cell', per_cell_instance),
+        ('reused instance', render_markdown.__wrapped__),
+        ('reused instance + memo', render_markdown),
+    ]
+    for label, render in renderers:
+        render_markdown.cache_clear()
+        start = time.perf_counter()
+        outputs[label] = [render(text) for text in cells]
+        elapsed = time.perf_counter() - start
+        print(f"{label:>27}: {len(cells) / elapsed:9.0f} cells/s")
+    first = outputs[renderers[0][0]]
+    print(f"identical output: {all(result == first for result in outputs.values())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Compare exported notebook pages with bodies copied verbatim against pages
+written through the large-output pass: page bytes, asset bytes and time.
+Exports come from the corpus generator (logs and inline PNGs); every other
+notebook repeats an earlier one's outputs, as re-run copies of a notebook
+do, so image deduplication shows up in the asset total.
+
+Usage: python3 .github/scripts/benchmarks/bench_outputs.py [--notebooks 20] [--export-mb 4]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_export_html  # noqa: E402
+import export_databricks_notebooks as export  # noqa: E402
+from large_outputs import OutputLimits  # noqa: E402
+from site_templates import SiteTemplate  # noqa: E402
+
+
+def directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def build(sources, site_dir, limits):
+    export.OUTPUT_LIMITS = limits
+    names = sorted(sources)
+    template = SiteTemplate(site_dir)
+    start = time.perf_counter()
+    page_bytes = 0
+    for name in names:
+        output_path = os.path.join(site_dir, f'{name}.html')
+        export.write_notebook_page(name, sources[name], output_path, template)
+        page_bytes += os.path.getsize(output_path)
+    return time.perf_counter() - start, page_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the large-output pass on exported pages')
+    parser.add_argument('--notebooks', type=int, default=20)
+    parser.add_argument('--export-mb', type=float, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = {}
+        for i in range(args.notebooks):
+            name = f'nb_{i:03d}'
+            sources[name] = generate_export_html(os.path.join(tmp, f'{name}.src.html'),
+                                                 int(args.export_mb * 1024 * 1024), seed=i // 2, name=name)
+        source_mb = sum(os.path.getsize(path) for path in sources.values()) / 1024 / 1024
+        print(f"{len(sources)} exports, {source_mb:.0f} MB")
+
+        modes = [
+            ('verbatim', OutputLimits(inline_image_bytes=0, text_output_bytes=0, lazy_images=False)),
+            ('output pass', OutputLimits()),
+        ]
+        for label, limits in modes:
+            site_dir = os.path.join(tmp, label.replace(' ', '_'))
+            elapsed, page_bytes = build(sources, site_dir, limits)
+            asset_bytes = directory_bytes(os.path.join(site_dir, 'assets'))
+            print(f"{label:>12}: {elapsed:.2f}s, pages {page_bytes / 1024 / 1024:7.1f} MB "
+                  f"({page_bytes / len(sources) / 1024:6.0f} KB per page), "
+                  f"assets {asset_bytes / 1024 / 1024:6.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
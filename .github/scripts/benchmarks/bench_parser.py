@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming notebook parser against the original
+read-everything implementation.
+
+Usage: python3 .github/scripts/benchmarks/bench_parser.py [--sizes 1 10 100]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from convert_notebooks import Cell  # noqa: E402
+from corpus import generate_databricks_notebook  # noqa: E402
+from highlight import strip_magic_prefix  # noqa: E402
+
+COMMAND_SEPARATOR = '# COMMAND ----------'
+NOTEBOOK_HEADER = '# Databricks notebook source'
+
+# Parser states
+_CELL_START = 0
+_CELL_MARKDOWN = 1
+_CELL_CODE = 2
+
+
+def legacy_parse_databricks_notebook(filepath):
+    """Original parser: whole-file read, re.split and substring scans"""
+    with open(filepath, 'r') as f:
+        content = f.read()
+
+    sections = re.split(r'# COMMAND ----------', content)
+    cells = []
+
+    for section in sections:
+        if not section.strip():
+            continue
+
+        if '# MAGIC %md' in section:
+            lines = section.split('\n')
+            md_lines = []
+            for line in lines:
+                if line.startswith('# MAGIC %md'):
+                    md_lines.append(line[11:].strip())
+                elif line.startswith('# MAGIC '):
+                    md_lines.append(line[8:])
+                elif line.startswith('# MAGIC'):
+                    md_lines.append(line[7:])
+
+            md_content = '\n'.join(md_lines)
+            cells.append({'type': 'markdown', 'content': md_content})
+        else:
+            lines = section.split('\n')
+            code_lines = []
+            for line in lines:
+                if not line.startswith('# DBTITLE'):
+                    code_lines.append(line)
+
+            code_content = '\n'.join(code_lines).strip()
+            if code_content:
+                cells.append({'type': 'code', 'content': code_content})
+
+    return cells
+
+
+def _finish_cell(state, lines, title):
+    """Build the Cell for the lines collected so far, or None if it is empty"""
+    if state == _CELL_MARKDOWN:
+        return Cell('markdown', '\n'.join(lines), title)
+    if state == _CELL_CODE:
+        code_content = '\n'.join(lines).strip()
+        if code_content:
+            return Cell('code', code_content, title)
+    return None
+
+
+def iter_notebook_cells(f):
+    """Yield cells one at a time from a Databricks .py notebook file handle
+
+    The line-by-line parser the site used before NotebookCells, kept as the
+    reference iter_mapped_cells() is checked against. Only the cell currently
+    being assembled is held in memory; every cell has the default language.
+    """
+    state = _CELL_START
+    lines = []
+    title = ''
+
+    for lineno, line in enumerate(f):
+        line = line.rstrip('\n')
+
+        if line.rstrip() == COMMAND_SEPARATOR:
+            cell = _finish_cell(state, lines, title)
+            if cell:
+                yield cell
+            state, lines, title = _CELL_START, [], ''
+            continue
+
+        if lineno == 0 and line.rstrip() == NOTEBOOK_HEADER:
+            continue
+
+        if line.startswith('# DBTITLE'):
+            # Titles are metadata, never part of the cell body
+            title = line.partition(',')[2].strip()
+            continue
+
+        if state == _CELL_START:
+            if not line.strip():
+                continue
+            if line.startswith('# MAGIC %md'):
+                state = _CELL_MARKDOWN
+            else:
+                state = _CELL_CODE
+
+        if state == _CELL_MARKDOWN:
+            if line.startswith('# MAGIC %md'):
+                lines.append(line[11:].strip())
+            elif line.startswith('# MAGIC'):
+                lines.append(strip_magic_prefix(line))
+        else:
+            lines.append(line)
+
+    cell = _finish_cell(state, lines, title)
+    if cell:
+        yield cell
+
+
+def streaming_parse(filepath):
+    """Consume the streaming parser without keeping the cells"""
+    count = 0
+    with open(filepath, 'r') as f:
+        for _ in iter_notebook_cells(f):
+            count += 1
+    return count
+
+
+def measure(func, filepath):
+    """Return (seconds, peak traced bytes) for one call"""
+    start = time.perf_counter()
+    func(filepath)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(filepath)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100],
+                        help='Synthetic notebook sizes in MB')
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'parser':>10} {'MB/s':>10} {'peak MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes:
+            path = os.path.join(tmp, f'synthetic_{size_mb}mb.py')
+            generate_databricks_notebook(path, size_mb * 1024 * 1024)
+            actual_mb = os.path.getsize(path) / (1024 * 1024)
+
+            for label, func in [('legacy', legacy_parse_databricks_notebook),
+                                ('streaming', streaming_parse)]:
+                elapsed, peak = measure(func, path)
+                print(f"{size_mb:>6}MB {label:>10} {actual_mb / elapsed:>10.1f} {peak / (1024 * 1024):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark the build-time search index: time to index a synthetic corpus,
+the number and size of shards (raw and gzipped), and query latency of the
+shipped search script under node, cold (index and shards read and parsed
+per query) and warm (shards already cached).
+
+Notebooks come from the corpus generator plus markdown cells drawn from a
+Zipf-distributed vocabulary, so the index has a realistic term count.
+
+Usage: python3 .github/scripts/benchmarks/bench_search.py [--notebooks 500] [--notebook-kb 40] [--queries 200]
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_databricks_notebook  # noqa: E402
+from search_index import SEARCH_SCRIPT, build_search_index  # noqa: E402
+from site_templates import SEARCH_INDEX  # noqa: E402
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'qu', 'an', 'el', 'or', 'ix', 'um', 'da', 'fe', 'gi']
+
+# Loads the search script without a DOM and times SiteSearch.search() with a
+# file-backed fetch; prints per-mode latency statistics as JSON
+NODE_HARNESS = '''
+const fs = require('fs');
+const path = require('path');
+const [scriptPath, siteDir, indexUrl, queriesPath] = process.argv.slice(2);
+eval(fs.readFileSync(scriptPath, 'utf8'));
+const queries = JSON.parse(fs.readFileSync(queriesPath, 'utf8'));
+const fetchJSON = url => fs.promises.readFile(path.join(siteDir, url), 'utf8').then(JSON.parse);
+
+function stats(times, hits) {
+    times.sort((a, b) => a - b);
+    return {
+        median_ms: times[Math.floor(times.length / 2)],
+        p95_ms: times[Math.floor(times.length * 0.95)],
+        max_ms: times[times.length - 1],
+        mean_hits: hits / times.length,
+    };
+}
+
+(async () => {
+    const result = {};
+    for (const mode of ['cold', 'warm']) {
+        const shared = new SiteSearch(indexUrl, fetchJSON);
+        if (mode === 'warm') {
+            for (const query of queries) {
+                await shared.search(query);
+            }
+        }
+        const times = [];
+        let hits = 0;
+        for (const query of queries) {
+            const searcher = mode === 'cold' ? new SiteSearch(indexUrl, fetchJSON) : shared;
+            const start = process.hrtime.bigint();
+            hits += (await searcher.search(query)).length;
+            times.push(Number(process.hrtime.bigint() - start) / 1e6);
+        }
+        result[mode] = stats(times, hits);
+    }
+    console.log(JSON.stringify(result));
+})();
+'''
+
+
+def vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def zipf_words(rng, vocab, count):
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    return rng.choices(vocab, weights=weights, k=count)
+
+
+def generate_corpus(notebooks_dir, count, notebook_kb, vocab):
+    paths = []
+    for i in range(count):
+        rng = random.Random(i)
+        path = generate_databricks_notebook(os.path.join(notebooks_dir, f'notebook_{i:04d}.py'),
+                                            notebook_kb * 1024, seed=i, data_ratio=0.3)
+        with open(path, 'a') as f:
+            for _ in range(8):
+                words = ' '.join(zipf_words(rng, vocab, 120))
+                f.write(f'\n# COMMAND ----------\n\n# MAGIC %md\n# MAGIC {words}\n')
+        paths.append(path)
+    return paths
+
+
+def sample_queries(rng, vocab, count):
+    """Mix of one-word, two-word and prefix queries"""
+    common = vocab[:2000]
+    queries = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            queries.append(rng.choice(common))
+        elif kind == 1:
+            queries.append(f'{rng.choice(common)} {rng.choice(common)}')
+        else:
+            queries.append(rng.choice(common)[:3])
+    return queries
+
+
+def shard_report(site_dir, sizes):
+    search_dir = os.path.dirname(os.path.join(site_dir, SEARCH_INDEX))
+    index_name = os.path.basename(SEARCH_INDEX)
+    shards = sorted(size for name, size in sizes.items() if name != index_name)
+    gz_total = 0
+    for name in sizes:
+        with open(os.path.join(search_dir, name), 'rb') as f:
+            gz_total += len(gzip.compress(f.read()))
+    print(f"index.json: {sizes[index_name] / 1024:.1f} KB")
+    print(f"{len(shards)} shards: median {shards[len(shards) // 2] / 1024:.1f} KB, "
+          f"largest {shards[-1] / 1024:.1f} KB, total {sum(sizes.values()) / 1024 / 1024:.2f} MB "
+          f"({gz_total / 1024 / 1024:.2f} MB gzipped)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the search index')
+    parser.add_argument('--notebooks', type=int, default=500)
+    parser.add_argument('--notebook-kb', type=int, default=40)
+    parser.add_argument('--vocabulary', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocab = vocabulary(rng, args.vocabulary)
+    with tempfile.TemporaryDirectory() as tmp:
+        notebooks_dir = os.path.join(tmp, 'notebooks')
+        os.makedirs(notebooks_dir)
+        paths = generate_corpus(notebooks_dir, args.notebooks, args.notebook_kb, vocab)
+        source_mb = sum(os.path.getsize(path) for path in paths) / 1024 / 1024
+        print(f"{len(paths)} notebooks, {source_mb:.1f} MB of source")
+
+        site_dir = os.path.join(tmp, 'site')
+        start = time.perf_counter()
+        sizes = build_search_index(paths, site_dir)
+        print(f"Index built in {time.perf_counter() - start:.2f}s")
+        shard_report(site_dir, sizes)
+
+        if not shutil.which('node'):
+            print("node is not installed; skipped query latency")
+            return
+        script_path = os.path.join(tmp, 'search.js')
+        harness_path = os.path.join(tmp, 'harness.js')
+        queries_path = os.path.join(tmp, 'queries.json')
+        with open(script_path, 'w') as f:
+            f.write(SEARCH_SCRIPT)
+        with open(harness_path, 'w') as f:
+            f.write(NODE_HARNESS)
+        with open(queries_path, 'w') as f:
+            json.dump(sample_queries(rng, vocab, args.queries), f)
+        result = subprocess.run(['node', harness_path, script_path, site_dir, SEARCH_INDEX, queries_path],
+                                check=True, capture_output=True, text=True)
+        for mode, stats in json.loads(result.stdout).items():
+            print(f"{mode:>5} queries: median {stats['median_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, "
+                  f"max {stats['max_ms']:.2f} ms, {stats['mean_hits']:.1f} results on average")
+
+
+if __name__ == '__main__':
+    main()
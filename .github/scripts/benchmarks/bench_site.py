@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark site page generation for many notebooks: every page carrying a
+sidebar link to every notebook, as pages were built before nav.json, versus
+the shared navigation, where each page holds an empty placeholder and the
+list is written once. Reports build time and total size of the pages.
+
+Usage: python3 .github/scripts/benchmarks/bench_site.py [--notebooks 1000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from navigation import build_nav_tree, write_nav  # noqa: E402
+from site_templates import SiteTemplate, display_name, nav_widget  # noqa: E402
+
+BODY = '<div class="cell"><p>' + 'Notebook body text. ' * 200 + '</p></div>\n'
+
+
+def embedded_sidebar(names, site_dir):
+    template = SiteTemplate(site_dir)
+    total = 0
+    for name in names:
+        links = ''.join(f'            <a href="{nb}.html" class="nav-link{" active" if nb == name else ""}">'
+                        f'{display_name(nb)}</a>\n' for nb in names)
+        page = template.render_notebook_page(name, '', BODY).replace(nav_widget('{id}.html', name), links)
+        total += len(page.encode('utf-8'))
+    return total
+
+
+def shared_navigation(names, site_dir):
+    template = SiteTemplate(site_dir)
+    total = 0
+    for name in names:
+        total += len(template.render_notebook_page(name, '', BODY).encode('utf-8'))
+    write_nav(site_dir, build_nav_tree((name, display_name(name), '') for name in names))
+    return total + os.path.getsize(os.path.join(site_dir, 'nav.json'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark site page generation')
+    parser.add_argument('--notebooks', type=int, default=1000)
+    args = parser.parse_args()
+
+    names = [f'notebook_{i:05d}_analysis' for i in range(args.notebooks)]
+    for label, func in [('embedded sidebar', embedded_sidebar), ('shared navigation', shared_navigation)]:
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as site_dir:
+            total = func(names, site_dir)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>18}: {len(names)} pages in {elapsed:.2f}s, {total / (1024 * 1024):.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Measure the initial download of the single-page site as the notebook count
+grows: the old builder embedded every notebook in index.html, the lazy site
+ships the shell and manifest and fetches sections on navigation.
+
+Usage: python3 .github/scripts/benchmarks/bench_spa.py [--counts 10 100 500] [--notebook-kb 200]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_databricks_notebook  # noqa: E402
+from convert_notebooks import parse_databricks_notebook  # noqa: E402
+from build_site import MANIFEST_NAME, write_manifest, write_section, write_shell, write_shell_assets  # noqa: E402
+
+
+def synthetic_fragment(tmp, kb):
+    """One converted notebook fragment of roughly `kb` KB of source"""
+    path = generate_databricks_notebook(os.path.join(tmp, 'source.py'), kb * 1024, seed=kb)
+    cells = parse_databricks_notebook(path)
+    return ''.join(f'<div class="cell"><pre><code>{cell.content}</code></pre></div>\n' for cell in cells)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark initial page weight of the site')
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--notebook-kb', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fragment = synthetic_fragment(tmp, args.notebook_kb)
+        print(f"{'notebooks':>9}  {'embedded (old)':>15}  {'lazy shell':>11}  {'manifest':>9}")
+        for count in args.counts:
+            notebooks = {f'notebook_{i:04d}': fragment + f'<!-- {i} -->' for i in range(count)}
+            site_dir = os.path.join(tmp, f'site_{count}')
+            os.makedirs(site_dir)
+            manifest = write_manifest(site_dir, [write_section(site_dir, name, notebooks[name])
+                                                 for name in sorted(notebooks)])
+            write_shell(site_dir, '<h1>Readme</h1>', write_shell_assets(site_dir))
+            shell = os.path.getsize(os.path.join(site_dir, 'index.html'))
+            manifest_bytes = os.path.getsize(os.path.join(site_dir, MANIFEST_NAME))
+            embedded = shell + sum(entry['bytes'] for entry in manifest['sections'])
+            print(f"{count:>9}  {embedded / 1024 / 1024:>12.1f} MB  {shell / 1024:>8.1f} KB  "
+                  f"{manifest_bytes / 1024:>6.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
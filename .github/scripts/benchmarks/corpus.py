@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Synthetic notebook generator for the benchmarks.
+Produces Databricks .py notebooks and HTML exports of a requested size with
+a repeatable mix of markdown, code, log output and data-heavy cells, and
+.py or .ipynb notebooks with a given cell count, markdown/code mix and share
+of %sql/%scala/%r/%sh cells.
+"""
+
+import json
+import base64
+import random
+
+MARKDOWN_BLOCKS = [
+    '# MAGIC %md\n# MAGIC ## Overview\n# MAGIC\n# MAGIC This accelerator shows how to **ingest**, `transform` and serve data.\n',
+    '# MAGIC %md\n# MAGIC | Column | Type | Notes |\n# MAGIC |--------|------|-------|\n# MAGIC | id | bigint | primary key |\n# MAGIC | ts | timestamp | event time |\n',
+    '# MAGIC %md\n# MAGIC - Step one\n# MAGIC - Step two\n# MAGIC - Step three\n',
+]
+
+CODE_BLOCKS = [
+    'import pandas as pd\nimport numpy as np\n\ndf = pd.DataFrame({"a": np.arange(10)})\ndisplay(df)\n',
+    '# DBTITLE 1,Load source table\ndf = spark.read.table("main.default.events")\ndf = df.filter("ts > current_date() - 7")\n',
+    '# MAGIC %sql\n# MAGIC SELECT id, count(*) AS n\n# MAGIC FROM main.default.events\n# MAGIC GROUP BY id\n',
+]
+
+
+def data_cell(rng, size):
+    """Build a code cell embedding roughly `size` bytes of literal data"""
+    rows = []
+    written = 0
+    while written < size:
+        row = f'    ({rng.randint(0, 10**9)}, "{rng.random():.12f}", "payload-{rng.randint(0, 10**6)}"),\n'
+        rows.append(row)
+        written += len(row)
+    return 'rows = [\n' + ''.join(rows) + ']\n'
+
+
+def generate_databricks_notebook(path, target_bytes, seed=0, data_ratio=0.5):
+    """Write a synthetic Databricks .py notebook of about `target_bytes` to `path`"""
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w') as f:
+        f.write('# Databricks notebook source\n')
+        first = True
+        while written < target_bytes:
+            if not first:
+                f.write('\n# COMMAND ----------\n\n')
+            first = False
+            roll = rng.random()
+            if roll < data_ratio:
+                block = data_cell(rng, rng.randint(4 * 1024, 64 * 1024))
+            elif roll < data_ratio + (1 - data_ratio) / 2:
+                block = rng.choice(MARKDOWN_BLOCKS)
+            else:
+                block = rng.choice(CODE_BLOCKS)
+            f.write(block)
+            written += len(block)
+    return path
+
+
+EXPORT_HEAD = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{name}</title>
+<style>
+.cell {{ margin: 0 0 12px 0; }}
+.ansiout {{ white-space: pre-wrap; }}
+</style>
+<style type="text/css">
+.output_png img {{ max-width: 100%; }}
+</style>
+</head>
+<body class="databricks-export">
+'''
+
+
+def export_block(rng, size):
+    """One exported cell: markdown text, a log output or an inline PNG"""
+    roll = rng.random()
+    if roll < 0.3:
+        return f'<div class="cell"><h2>Section {rng.randint(0, 999)}</h2><p>{"Lorem ipsum dolor sit amet. " * 8}</p></div>\n'
+    if roll < 0.6:
+        lines = ''.join(f'INFO step {i}: processed {rng.randint(0, 10**6)} rows\n' for i in range(size // 40))
+        return f'<div class="cell"><pre class="ansiout">{lines}</pre></div>\n'
+    data = base64.b64encode(rng.randbytes(size * 3 // 4)).decode('ascii')
+    return f'<div class="cell output_png"><img src="data:image/png;base64,{data}"></div>\n'
+
+
+def generate_export_html(path, target_bytes, seed=0, name='synthetic'):
+    """Write a synthetic Databricks HTML export of about `target_bytes` to `path`"""
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        f.write(EXPORT_HEAD.format(name=name))
+        written = 0
+        while written < target_bytes:
+            block = export_block(rng, rng.randint(8 * 1024, 256 * 1024))
+            f.write(block)
+            written += len(block)
+        f.write('</body>\n</html>\n')
+    return path
+
+
+def write_export_payload(html_path, payload_path, chunk_size=3 * 1024 * 1024):
+    """Wrap an HTML file as a /workspace/export JSON response, encoding in chunks"""
+    with open(html_path, 'rb') as src, open(payload_path, 'wb') as out:
+        out.write(b'{"file_type": "html", "content": "')
+        for chunk in iter(lambda: src.read(chunk_size), b''):
+            out.write(base64.b64encode(chunk))
+        out.write(b'"}')
+    return payload_path
+
+
+# Languages used for magic cells (%sql, %scala, ...) in generated notebooks
+MAGIC_LANGUAGES = ('sql', 'scala', 'r', 'sh')
+
+WORDS = ('data pipeline table stream model feature batch delta lakehouse schema query '
+         'partition cluster job metric customer event sensor forecast training score').split()
+
+CODE_TEMPLATES = {
+    'python': ['df_{i} = spark.read.table("main.bench.{word}_{i}")',
+               'df_{i} = df_{i}.filter(F.col("{word}") > {n}).withColumn("{word}_score", F.lit({n}))',
+               'display(df_{i}.groupBy("{word}").count())',
+               'result_{i} = [{{"id": {n}, "name": "{word}"}} for _ in range(10)]'],
+    'sql': ['SELECT {word}, count(*) AS n FROM main.bench.{word}_{i}',
+            'WHERE {word}_id > {n} AND status = \'active\'',
+            'GROUP BY {word} ORDER BY n DESC LIMIT {n}'],
+    'scala': ['val df{i} = spark.table("main.bench.{word}_{i}")',
+              'df{i}.filter($"{word}" > {n}).groupBy("{word}").count().show()'],
+    'r': ['df_{i} <- SparkR::sql("SELECT * FROM main.bench.{word}_{i}")',
+          'summary(head(df_{i}, {n}))'],
+    'sh': ['ls -la /dbfs/tmp/{word}_{i} | head -n {n}',
+           'echo "{word} {n}"'],
+}
+
+
+def markdown_lines(rng, count):
+    lines = [f'## {rng.choice(WORDS).title()} {rng.choice(WORDS)}', '']
+    while len(lines) < count:
+        roll = rng.random()
+        if roll < 0.3:
+            lines.append(f'- **{rng.choice(WORDS)}**: `{rng.choice(WORDS)}_{rng.randint(0, 99)}`')
+        elif roll < 0.4:
+            lines += ['| name | value |', '|------|-------|', f'| {rng.choice(WORDS)} | {rng.randint(0, 999)} |']
+        else:
+            lines.append(' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))).capitalize() + '.')
+    return lines[:count]
+
+
+def code_lines(rng, language, count, i):
+    templates = CODE_TEMPLATES[language]
+    return [rng.choice(templates).format(i=i, word=rng.choice(WORDS), n=rng.randint(1, 1000))
+            for _ in range(count)]
+
+
+def generate_cells(cells=50, markdown_ratio=0.3, magic_ratio=0.2, languages=MAGIC_LANGUAGES,
+                   cell_lines=10, seed=0):
+    """A repeatable list of (type, language, lines) cells
+
+    `markdown_ratio` of the cells are markdown; of the code cells,
+    `magic_ratio` are in one of `languages` and the rest are Python.
+    """
+    rng = random.Random(seed)
+    generated = []
+    for i in range(cells):
+        lines = max(1, int(rng.gauss(cell_lines, cell_lines / 3)))
+        if rng.random() < markdown_ratio:
+            generated.append(('markdown', 'markdown', markdown_lines(rng, lines)))
+        else:
+            language = rng.choice(languages) if languages and rng.random() < magic_ratio else 'python'
+            generated.append(('code', language, code_lines(rng, language, lines, i)))
+    return generated
+
+
+def write_databricks_py(path, cells):
+    """Write cells as a Databricks .py notebook (magic cells as # MAGIC lines)"""
+    blocks = []
+    for cell_type, language, lines in cells:
+        if cell_type == 'markdown':
+            blocks.append('# MAGIC %md\n' + ''.join(f'# MAGIC {line}'.rstrip() + '\n' for line in lines))
+        elif language == 'python':
+            blocks.append(''.join(f'{line}\n' for line in lines))
+        else:
+            blocks.append(f'# MAGIC %{language}\n' + ''.join(f'# MAGIC {line}\n' for line in lines))
+    with open(path, 'w') as f:
+        f.write('# Databricks notebook source\n' + '\n# COMMAND ----------\n\n'.join(blocks))
+    return path
+
+
+def ipynb_outputs(rng, lines):
+    """Outputs for an executed code cell: a log stream, a result or a small PNG"""
+    roll = rng.random()
+    if roll < 0.4:
+        return [{'output_type': 'stream', 'name': 'stdout',
+                 'text': [f'{line} -> {rng.randint(0, 10**6)} rows\n' for line in lines]}]
+    if roll < 0.7:
+        return [{'output_type': 'execute_result', 'execution_count': 1, 'metadata': {},
+                 'data': {'text/plain': [f'DataFrame[{rng.choice(WORDS)}: bigint]']}}]
+    if roll < 0.8:
+        data = base64.b64encode(rng.randbytes(2048)).decode('ascii')
+        return [{'output_type': 'display_data', 'metadata': {}, 'data': {'image/png': data, 'text/plain': ['<Figure>']}}]
+    return []
+
+
+def write_ipynb(path, cells, seed=0):
+    """Write cells as an executed Jupyter notebook (magic cells start with %%language)"""
+    rng = random.Random(seed)
+    notebook_cells = []
+    for cell_type, language, lines in cells:
+        if language not in ('python', 'markdown'):
+            lines = [f'%%{language}'] + lines
+        source = [line + '\n' for line in lines[:-1]] + lines[-1:]
+        if cell_type == 'markdown':
+            notebook_cells.append({'cell_type': 'markdown', 'metadata': {}, 'source': source})
+        else:
+            notebook_cells.append({'cell_type': 'code', 'execution_count': 1, 'metadata': {},
+                                   'source': source, 'outputs': ipynb_outputs(rng, lines)})
+    notebook = {
+        'cells': notebook_cells,
+        'metadata': {'kernelspec': {'name': 'python3', 'display_name': 'Python 3', 'language': 'python'},
+                     'language_info': {'name': 'python'}},
+        'nbformat': 4,
+        'nbformat_minor': 5,
+    }
+    with open(path, 'w') as f:
+        json.dump(notebook, f, indent=1)
+    return path
+
+
+def generate_notebook(path, cells=50, markdown_ratio=0.3, magic_ratio=0.2, languages=MAGIC_LANGUAGES,
+                      cell_lines=10, seed=0):
+    """Write a .py or .ipynb notebook (by the extension of `path`) from generate_cells"""
+    generated = generate_cells(cells, markdown_ratio, magic_ratio, languages, cell_lines, seed)
+    if path.endswith('.ipynb'):
+        return write_ipynb(path, generated, seed)
+    return write_databricks_py(path, generated)
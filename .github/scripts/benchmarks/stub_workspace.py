@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Local stub of the Databricks workspace API for benchmarks and manual runs.
+Serves /api/2.0/workspace/list and /api/2.0/workspace/export from an
+in-memory tree, with optional latency and injected 429/503 responses.
+Notebooks export as HTML; folders export as a zip of notebook sources
+(format=SOURCE), optionally as a direct download.
+
+Usage: python3 .github/scripts/benchmarks/stub_workspace.py --notebooks 200 --port 8765
+"""
+
+import io
+import json
+import time
+import base64
+import zipfile
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def notebook_html(name, paragraphs=20):
+    """A small HTML document shaped like a Databricks HTML export"""
+    body = ''.join(f'<p>Paragraph {i} of {name}</p>\n' for i in range(paragraphs))
+    return (f'<!DOCTYPE html><html><head><title>{name}</title>'
+            f'<style>.cell {{ margin: 0; }}</style></head>'
+            f'<body><h1>{name}</h1>\n{body}</body></html>')
+
+
+def notebook_source(name, paragraphs=20):
+    """Databricks .py source matching notebook_html()"""
+    cells = [f'# MAGIC %md\n# MAGIC # {name}'] + [f'print("Paragraph {i} of {name}")' for i in range(paragraphs)]
+    return '# Databricks notebook source\n' + '\n\n# COMMAND ----------\n\n'.join(cells) + '\n'
+
+
+class StubWorkspace:
+    """In-memory workspace tree: path -> object metadata plus HTML content"""
+
+    def __init__(self, latency=0.0, rate_limit_every=0, retry_after=0, archive_limit=0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        # Folder exports larger than this many bytes are refused, as the real API does
+        self.archive_limit = archive_limit
+        # Paths whose list and export requests answer 500
+        self.failing_paths = set()
+        # The next this many requests are refused with retry_status
+        self.refuse_next = 0
+        self.retry_status = 429
+        self.objects = {}
+        self.children_of = {}
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    def _add(self, obj):
+        path = obj['path']
+        if path not in self.objects:
+            parent = path.rsplit('/', 1)[0]
+            self.children_of.setdefault(parent, []).append(path)
+        self.objects[path] = obj
+
+    def add_notebook(self, path, html, modified_at=None, source=None):
+        """Add or replace a notebook, creating any missing parent folders"""
+        modified_at = modified_at or int(time.time() * 1000)
+        with self._lock:
+            existing = self.objects.get(path)
+            object_id = existing['object_id'] if existing else len(self.objects) + 1
+            self._add({
+                'path': path,
+                'object_type': 'NOTEBOOK',
+                'object_id': object_id,
+                'language': 'PYTHON',
+                'modified_at': modified_at,
+                'html': html,
+                'source': source if source is not None else notebook_source(path.rsplit('/', 1)[-1]),
+            })
+            # Missing folders are created; existing ones keep their modified_at,
+            # as in a real workspace, where nested edits do not touch it
+            parent = path.rsplit('/', 1)[0]
+            while parent and parent not in self.objects:
+                self._add({'path': parent, 'object_type': 'DIRECTORY',
+                           'object_id': len(self.objects) + 1, 'modified_at': modified_at})
+                parent = parent.rsplit('/', 1)[0]
+
+    def children(self, path):
+        return [self.objects[p] for p in self.children_of.get(path.rstrip('/'), [])]
+
+    def source_archive(self, directory):
+        """Zip of every notebook source under `directory`, in a folder named after it"""
+        folder = directory.rstrip('/').rsplit('/', 1)[-1]
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for path, obj in sorted(self.objects.items()):
+                if obj['object_type'] == 'NOTEBOOK' and path.startswith(directory.rstrip('/') + '/'):
+                    relative = path[len(directory.rstrip('/')) + 1:]
+                    archive.writestr(f'{folder}/{relative}.py', obj['source'])
+        return buf.getvalue()
+
+    def next_request(self):
+        """Count a request and report whether it should be rate limited"""
+        with self._lock:
+            self.request_count += 1
+            count = self.request_count
+            if self.refuse_next:
+                self.refuse_next -= 1
+                return True
+        return self.rate_limit_every and count % self.rate_limit_every == 0
+
+
+def public(obj):
+    return {k: v for k, v in obj.items() if k not in ('html', 'source')}
+
+
+def make_handler(workspace):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if workspace.latency:
+                time.sleep(workspace.latency)
+            if workspace.next_request():
+                # retry_after may be seconds or an HTTP date; None sends no header
+                headers = {} if workspace.retry_after is None else {'Retry-After': str(workspace.retry_after)}
+                self.send_json(workspace.retry_status, {'error_code': 'REQUEST_LIMIT_EXCEEDED'}, headers)
+                return
+
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            path = params.get('path', '')
+            if path in workspace.failing_paths:
+                self.send_json(500, {'error_code': 'INTERNAL_ERROR'})
+                return
+
+            if url.path == '/api/2.0/workspace/list':
+                if path not in workspace.objects and path != '/':
+                    self.send_json(404, {'error_code': 'RESOURCE_DOES_NOT_EXIST'})
+                    return
+                self.send_json(200, {'objects': [public(o) for o in workspace.children(path)]})
+            elif url.path == '/api/2.0/workspace/export':
+                obj = workspace.objects.get(path)
+                if obj and obj['object_type'] == 'DIRECTORY':
+                    self.send_archive(path, params)
+                    return
+                if not obj or obj['object_type'] != 'NOTEBOOK':
+                    self.send_json(404, {'error_code': 'RESOURCE_DOES_NOT_EXIST'})
+                    return
+                if params.get('format') == 'SOURCE':
+                    content = base64.b64encode(obj['source'].encode('utf-8')).decode('ascii')
+                    self.send_json(200, {'content': content, 'file_type': 'py'})
+                    return
+                content = base64.b64encode(obj['html'].encode('utf-8')).decode('ascii')
+                self.send_json(200, {'content': content, 'file_type': 'html'})
+            else:
+                self.send_json(404, {'error_code': 'ENDPOINT_NOT_FOUND'})
+
+        def send_archive(self, path, params):
+            if params.get('format') != 'SOURCE':
+                self.send_json(400, {'error_code': 'INVALID_PARAMETER_VALUE',
+                                     'message': 'The stub exports folders in SOURCE format only'})
+                return
+            data = workspace.source_archive(path)
+            if workspace.archive_limit and len(data) > workspace.archive_limit:
+                self.send_json(400, {'error_code': 'MAX_NOTEBOOK_SIZE_EXCEEDED',
+                                     'message': 'Export exceeds the size limit'})
+                return
+            if params.get('direct_download') != 'true':
+                self.send_json(200, {'content': base64.b64encode(data).decode('ascii'), 'file_type': 'zip'})
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/zip')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def start_stub_server(workspace, port=0):
+    """Start the stub in a daemon thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(workspace))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def populate(workspace, count, root='/Workspace/Users/stub@example.com/accelerator'):
+    """Add `count` generated notebooks under `root`; returns their paths"""
+    paths = []
+    for i in range(count):
+        path = f'{root}/notebook_{i:04d}'
+        workspace.add_notebook(path, notebook_html(f'notebook_{i:04d}'))
+        paths.append(path)
+    return paths
+
+
+def populate_tree(workspace, count, fanout=10, per_directory=50,
+                  root='/Workspace/Users/stub@example.com'):
+    """Spread `count` notebooks across a nested directory tree; returns their paths"""
+    paths = []
+    for i in range(count):
+        directory_number = i // per_directory
+        parts = []
+        while True:
+            parts.append(f'dir_{directory_number % fanout}')
+            directory_number //= fanout
+            if not directory_number:
+                break
+        path = f"{root}/{'/'.join(reversed(parts))}/notebook_{i:06d}"
+        workspace.add_notebook(path, notebook_html(f'notebook_{i:06d}', paragraphs=2))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a stub Databricks workspace API')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--notebooks', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds added to every request')
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='Answer every Nth request with 429')
+    args = parser.parse_args()
+
+    workspace = StubWorkspace(args.latency, args.rate_limit_every)
+    populate(workspace, args.notebooks)
+    server, url = start_stub_server(workspace, args.port)
+    print(f"Stub workspace with {args.notebooks} notebooks at {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
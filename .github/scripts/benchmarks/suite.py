@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the publish pipeline, with results that can be compared
+across commits. Each case runs in a fresh subprocess on a generated corpus
+and reports wall-clock time over several repeats, peak RSS, and the peak of
+Python allocations (tracemalloc, from one extra run so it does not slow the
+timed ones):
+
+  parse_py        parse_databricks_notebook on a generated .py notebook
+  index_py        NotebookCells over the same notebook: kinds, languages and titles, no text
+  convert_py      convert_to_html_fragment on the same notebook
+  convert_ipynb   convert_to_html_fragment on an executed .ipynb notebook
+  wrapper         create_wrapper_html on a generated HTML export
+  export          export main() against the stub workspace API, from scratch
+  export_rerun    export main() again with nothing changed in the workspace
+
+Results are written as JSON with the commit they were measured on; pass an
+earlier file as --compare to print the change per case and exit non-zero
+when a case got slower (or bigger) by more than --threshold.
+
+Usage: python3 .github/scripts/benchmarks/suite.py [--quick] [--cases parse_py,export]
+                                                   [--output results.json] [--compare baseline.json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_export_html, generate_notebook  # noqa: E402
+from bench_export_memory import peak_rss_mb  # noqa: E402
+
+SCHEMA_VERSION = 1
+
+CONFIGS = {
+    'full': {
+        'repeat': 5,
+        'cells': 400,
+        'cell_lines': 10,
+        'markdown_ratio': 0.3,
+        'magic_ratio': 0.2,
+        'export_mb': 8,
+        'export_notebooks': 20,
+        'export_kb': 512,
+    },
+    'quick': {
+        'repeat': 3,
+        'cells': 100,
+        'cell_lines': 10,
+        'markdown_ratio': 0.3,
+        'magic_ratio': 0.2,
+        'export_mb': 2,
+        'export_notebooks': 5,
+        'export_kb': 128,
+    },
+}
+
+# Compared between runs; a case regresses when either grows past the threshold
+COMPARED_METRICS = ('median_s', 'peak_rss_mb')
+
+
+def notebook_case(workdir, config, ext):
+    return generate_notebook(os.path.join(workdir, f'bench_notebook{ext}'), cells=config['cells'],
+                             markdown_ratio=config['markdown_ratio'], magic_ratio=config['magic_ratio'],
+                             cell_lines=config['cell_lines'], seed=0)
+
+
+def setup_parse_py(workdir, config):
+    from convert_notebooks import parse_databricks_notebook
+    path = notebook_case(workdir, config, '.py')
+    return (lambda: parse_databricks_notebook(path)), os.path.getsize(path)
+
+
+def setup_index_py(workdir, config):
+    from notebook_cells import NotebookCells
+    path = notebook_case(workdir, config, '.py')
+
+    def run():
+        with NotebookCells.open(path) as cells:
+            return [(cells.kind(i), cells.language(i), cells.title(i)) for i in range(len(cells))]
+    return run, os.path.getsize(path)
+
+
+def _convert_setup(ext):
+    def setup(workdir, config):
+        from convert_notebooks import convert_to_html_fragment, render_markdown
+        path = notebook_case(workdir, config, ext)
+
+        def run():
+            # Every repeat renders from scratch, as a fresh build would
+            render_markdown.cache_clear()
+            return convert_to_html_fragment(path)
+        return run, os.path.getsize(path)
+    return setup
+
+
+def setup_wrapper(workdir, config):
+    os.chdir(workdir)   # stylesheet and output assets are written under ./site
+    from export_databricks_notebooks import create_wrapper_html, get_site_template
+    path = generate_export_html(os.path.join(workdir, 'export.html'), int(config['export_mb'] * 1024 * 1024))
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    def run():
+        get_site_template.cache_clear()
+        return create_wrapper_html('bench_notebook', html)
+    return run, len(html.encode('utf-8'))
+
+
+def _export_workspace(workdir, config):
+    """Local notebooks plus a stub workspace serving an export for each; returns the server"""
+    from stub_workspace import StubWorkspace, start_stub_server
+    os.makedirs(os.path.join(workdir, 'notebooks'))
+    workspace = StubWorkspace()
+    total = 0
+    for i in range(config['export_notebooks']):
+        name = f'notebook_{i:03d}'
+        generate_notebook(os.path.join(workdir, 'notebooks', f'{name}.py'), cells=config['cells'] // 4,
+                          markdown_ratio=config['markdown_ratio'], magic_ratio=config['magic_ratio'], seed=i)
+        html_path = generate_export_html(os.path.join(workdir, f'{name}.export.html'),
+                                         config['export_kb'] * 1024, seed=i, name=name)
+        with open(html_path, encoding='utf-8') as f:
+            html = f.read()
+        os.remove(html_path)
+        workspace.add_notebook(f'/Workspace/Users/bench@example.com/{name}', html, modified_at=1000 + i)
+        total += len(html)
+    server, url = start_stub_server(workspace)
+    # The export module reads its settings at import time
+    os.environ.update(DATABRICKS_HOST=url, DATABRICKS_TOKEN='bench', GITHUB_REPOSITORY='bench/blueprint')
+    os.chdir(workdir)
+    return total
+
+
+def _run_export():
+    import export_databricks_notebooks as export
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        return export.main([])
+
+
+def setup_export(workdir, config):
+    total = _export_workspace(workdir, config)
+
+    def run():
+        for path in ('site', '.cache'):
+            shutil.rmtree(path, ignore_errors=True)
+        return _run_export()
+    return run, total
+
+
+def setup_export_rerun(workdir, config):
+    total = _export_workspace(workdir, config)
+    _run_export()
+    return _run_export, total
+
+
+CASES = {
+    'parse_py': setup_parse_py,
+    'index_py': setup_index_py,
+    'convert_py': _convert_setup('.py'),
+    'convert_ipynb': _convert_setup('.ipynb'),
+    'wrapper': setup_wrapper,
+    'export': setup_export,
+    'export_rerun': setup_export_rerun,
+}
+
+
+def child(case, config):
+    """Run one case in this process and print its measurements as JSON"""
+    config = json.loads(config)
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        try:
+            run, input_bytes = CASES[case](workdir, config)
+            run()   # warm up imports, lexers and the Markdown instance
+            runs = []
+            for _ in range(config['repeat']):
+                start = time.perf_counter()
+                run()
+                runs.append(time.perf_counter() - start)
+            rss = peak_rss_mb()
+            tracemalloc.start()
+            run()
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            os.chdir(cwd)
+    print(json.dumps({
+        'runs_s': [round(seconds, 6) for seconds in runs],
+        'median_s': round(statistics.median(runs), 6),
+        'min_s': round(min(runs), 6),
+        'peak_rss_mb': round(rss, 1),
+        'traced_peak_mb': round(traced_peak / 1024 / 1024, 2),
+        'input_bytes': input_bytes,
+        'mb_per_s': round(input_bytes / 1024 / 1024 / statistics.median(runs), 2),
+    }))
+
+
+def git_revision():
+    def git(*args):
+        result = subprocess.run(['git', *args], cwd=SCRIPTS_DIR, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else None
+    commit = git('rev-parse', 'HEAD')
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return commit, bool(status)
+
+
+def run_suite(cases, config_name):
+    config = CONFIGS[config_name]
+    commit, dirty = git_revision()
+    results = {}
+    for case in cases:
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', case, json.dumps(config)],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"{case}: failed\n{result.stderr}")
+            results[case] = {'error': result.stderr.strip().splitlines()[-1:]}
+            continue
+        results[case] = json.loads(result.stdout.strip().splitlines()[-1])
+        stats = results[case]
+        print(f"{case:>14}: median {stats['median_s'] * 1000:9.1f} ms, min {stats['min_s'] * 1000:9.1f} ms, "
+              f"{stats['mb_per_s']:7.1f} MB/s, peak RSS {stats['peak_rss_mb']:6.0f} MB, "
+              f"traced peak {stats['traced_peak_mb']:6.1f} MB")
+    return {
+        'schema': SCHEMA_VERSION,
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'config_name': config_name,
+        'config': config,
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print the change per case against `baseline`; returns the regressed cases"""
+    if baseline.get('config') != current['config']:
+        print(f"Warning: baseline was measured with a different config ({baseline.get('config_name')})")
+    print(f"\nAgainst {(baseline.get('commit') or 'unknown')[:12]}"
+          f"{' (dirty)' if baseline.get('dirty') else ''}, threshold {threshold:.0%}:")
+    regressed = []
+    for case, stats in current['results'].items():
+        before = baseline.get('results', {}).get(case)
+        if 'error' in stats or not before or 'error' in before:
+            print(f"{case:>14}: not comparable")
+            continue
+        changes = []
+        for metric in COMPARED_METRICS:
+            ratio = stats[metric] / before[metric] if before[metric] else 1.0
+            flag = ' REGRESSION' if ratio > 1 + threshold else ''
+            changes.append(f"{metric} {before[metric]:g} -> {stats[metric]:g} ({ratio - 1:+.1%}){flag}")
+            if flag and case not in regressed:
+                regressed.append(case)
+        print(f"{case:>14}: {', '.join(changes)}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the publish pipeline benchmark suite')
+    parser.add_argument('--quick', action='store_true', help='Smaller corpus and fewer repeats')
+    parser.add_argument('--cases', default=','.join(CASES), help=f"Comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Results JSON from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative growth in a compared metric that counts as a regression (default: 0.10)')
+    parser.add_argument('--child', nargs=2, metavar=('CASE', 'CONFIG'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    results = run_suite(cases, 'quick' if args.quick else 'full')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Pieces of the single-page documentation site: the shell page, its assets,
+section fragments and the manifest. publish_site.py builds the site from
+them; running this script does the same (it is kept as an alias).
+The shell page carries only the README and a small script. Each notebook is
+written to its own content-hashed fragment file listed in manifest.json, and
+is fetched the first time it is opened (or hovered), so the initial download
+does not grow with the number of notebooks. The manifest also carries the
+navigation tree (notebooks grouped by folder), rendered by the same script
+as the exported pages. A sharded search index over the notebook sources
+backs the sidebar search box.
+"""
+
+import os
+import json
+from urllib.parse import quote
+
+import markdown
+
+from highlight import highlight_css
+from navigation import build_nav_tree, write_nav_script
+from search_index import write_search_script
+from site_templates import (
+    FONTS_URL, NAV_CSS, SEARCH_CSS, write_hashed_asset, stylesheet_link, site_title, display_name,
+    render_header, search_widget,
+)
+
+MANIFEST_NAME = 'manifest.json'
+
+SPA_CSS = '''
+* { box-sizing: border-box; }
+body { 
+    font-family: 'DM Sans', sans-serif; 
+    margin: 0; 
+    padding: 0; 
+    background: #FFFFFF; 
+    color: #1B3139; 
+    line-height: 1.6;
+}
+
+.header { 
+    background: #FFFFFF; 
+    padding: 16px 32px; 
+    border-bottom: 2px solid #FF3621; 
+    display: flex; 
+    align-items: center; 
+    gap: 24px; 
+    position: fixed; 
+    top: 0; 
+    width: 100%; 
+    z-index: 1000; 
+    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+}
+
+.logo { height: 28px; }
+.title { font-size: 20px; font-weight: 700; flex: 1; color: #1B3139; }
+.github-link { 
+    background: #FF3621; 
+    color: white; 
+    padding: 8px 16px; 
+    border-radius: 6px; 
+    text-decoration: none; 
+    font-weight: 600; 
+    font-size: 14px;
+}
+
+.main-container { 
+    display: flex; 
+    margin-top: 72px; 
+    min-height: calc(100vh - 72px); 
+}
+
+.sidebar { 
+    width: 280px; 
+    background: #F5F5F5; 
+    padding: 24px 16px; 
+    position: fixed; 
+    left: 0; 
+    top: 72px; 
+    height: calc(100vh - 72px); 
+    overflow-y: auto; 
+    border-right: 1px solid #E3E3E3; 
+}
+
+.sidebar h3 { 
+    font-size: 14px; 
+    font-weight: 600; 
+    margin: 0 0 16px 8px; 
+    color: #1B3139; 
+    text-transform: uppercase; 
+    letter-spacing: 0.5px; 
+}
+
+.content { 
+    flex: 1; 
+    padding: 32px; 
+    margin-left: 280px; 
+    background: #FFFFFF; 
+}
+
+.content-section { 
+    display: none; 
+    background: #FFFFFF; 
+    border-radius: 12px; 
+    border: 1px solid #E3E3E3; 
+    padding: 32px; 
+    margin: 0 auto; 
+    max-width: 1200px; 
+    box-shadow: 0 4px 12px rgba(0,0,0,0.05); 
+}
+
+.content-section.active { display: block; }
+
+.nav-link { 
+    display: block; 
+    padding: 8px 12px; 
+    margin: 2px 0; 
+    text-decoration: none; 
+    color: #1B3139; 
+    border-radius: 6px; 
+    font-weight: 500; 
+    font-size: 14px; 
+    transition: all 0.2s; 
+    cursor: pointer;
+    border-left: 3px solid transparent; 
+}
+
+.nav-link:hover { 
+    background: #FFFFFF; 
+    border-left-color: #FF3621; 
+    transform: translateX(2px); 
+}
+
+.nav-link.active { 
+    background: #FF3621; 
+    color: white; 
+    font-weight: 600; 
+    border-left-color: #E33417; 
+}
+
+/* Content containment - prevent overflow */
+.content-section { 
+    overflow-x: auto; 
+    word-wrap: break-word; 
+    word-break: break-word; 
+}
+
+.content-section img { 
+    max-width: 100%; 
+    height: auto; 
+    display: block; 
+    margin: 16px auto; 
+    border-radius: 4px; 
+    box-shadow: 0 2px 8px rgba(0,0,0,0.1); 
+}
+
+.content-section table { 
+    width: 100%; 
+    max-width: 100%; 
+    overflow-x: auto; 
+    display: block; 
+    white-space: nowrap; 
+    border-collapse: collapse; 
+    margin: 16px 0; 
+}
+
+.content-section pre { 
+    overflow-x: auto; 
+    max-width: 100%; 
+    white-space: pre-wrap; 
+    word-wrap: break-word; 
+}
+
+/* Notebook styling */
+.cell { margin: 16px 0; }
+.text_cell_render h1 { font-size: 28px; color: #1B3139; font-weight: 600; margin: 24px 0 16px 0; }
+.text_cell_render h2 { font-size: 22px; color: #1B3139; font-weight: 600; margin: 20px 0 12px 0; }
+.text_cell_render h3 { font-size: 18px; color: #1B3139; font-weight: 600; margin: 16px 0 8px 0; }
+.text_cell_render p { margin: 0 0 16px 0; }
+.text_cell_render code { 
+    background: #F5F5F5; 
+    padding: 2px 6px; 
+    border-radius: 3px; 
+    font-family: 'Monaco', 'Consolas', monospace; 
+}
+
+.input_area, .highlight { 
+    background: #f8f9fa; 
+    border: 1px solid #E3E3E3; 
+    border-radius: 8px; 
+    margin: 8px 0; 
+    overflow-x: auto; 
+}
+
+.input_area pre, .highlight pre { 
+    margin: 0; 
+    padding: 16px; 
+    background: transparent; 
+    border: none; 
+    font-family: 'Monaco', 'Consolas', monospace; 
+    font-size: 14px; 
+    overflow-x: auto; 
+}
+
+/* Syntax highlighting for both .py and .ipynb */
+.language-python, .highlight { background: transparent !important; }
+
+/* Nested highlight blocks */
+.highlight .highlight { background: #f8f9fa !important; border: 1px solid #E3E3E3 !important; }
+
+/* Output areas */
+.output_area { 
+    margin: 8px 0; 
+    padding: 8px; 
+    background: #f8f9fa; 
+    border-left: 3px solid #FF3621; 
+    border-radius: 4px; 
+    overflow-x: auto; 
+}
+
+/* Stderr and error outputs of .ipynb cells */
+.output_stderr { background: #FDEDED; }
+.output_error pre { color: #B42318; }
+
+/* Mobile responsiveness */
+@media (max-width: 768px) {
+    .sidebar { 
+        width: 100%; 
+        height: auto; 
+        position: relative; 
+        top: 0; 
+    }
+    .content { 
+        margin-left: 0; 
+        padding: 16px; 
+    }
+    .main-container { flex-direction: column; }
+}
+
+.section-status {
+    color: #5A6F77;
+    font-style: italic;
+}
+'''
+
+# Navigation, lazy section loading and hover prefetch for the shell page
+SPA_SCRIPT = '''(function () {
+    const sections = new Map();   // section id -> manifest entry
+    const requests = new Map();   // section id -> Promise of fragment HTML
+    const elements = new Map();   // section id -> rendered content element
+    const content = document.getElementById('content');
+    const nav = document.getElementById('notebook-nav');
+
+    function load(id) {
+        if (!requests.has(id)) {
+            const request = fetch(sections.get(id).src).then(response => {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.text();
+            });
+            // Forget failed requests so the next navigation retries
+            request.catch(() => requests.delete(id));
+            requests.set(id, request);
+        }
+        return requests.get(id);
+    }
+
+    function sectionElement(id) {
+        if (!elements.has(id)) {
+            const element = document.createElement('div');
+            element.className = 'content-section';
+            content.appendChild(element);
+            elements.set(id, element);
+        }
+        return elements.get(id);
+    }
+
+    // Scripts inserted through innerHTML never run, so each one is replaced
+    // by a fresh copy; external scripts are awaited so that inline scripts
+    // after them (plotly, bokeh, ...) find the library they load
+    function runScripts(element) {
+        return Array.from(element.querySelectorAll('script')).reduce((previous, old) => previous.then(() => {
+            const script = document.createElement('script');
+            Array.from(old.attributes).forEach(attr => script.setAttribute(attr.name, attr.value));
+            script.text = old.text;
+            const loaded = script.src ? new Promise(resolve => {
+                script.onload = script.onerror = resolve;
+            }) : null;
+            old.replaceWith(script);
+            return loaded;
+        }), Promise.resolve());
+    }
+
+    function render(id, element) {
+        if (element.dataset.loaded) {
+            return;
+        }
+        element.innerHTML = '<p class="section-status">Loading…</p>';
+        load(id).then(html => {
+            element.innerHTML = html;
+            element.dataset.loaded = 'true';
+            runScripts(element);
+        }, () => {
+            element.innerHTML = '<p class="section-status">This notebook could not be loaded.</p>';
+        });
+    }
+
+    function showSection(id) {
+        if (id !== 'readme' && !sections.has(id)) {
+            id = 'readme';
+        }
+        document.querySelectorAll('.content-section').forEach(section => section.classList.remove('active'));
+        document.querySelectorAll('.nav-link').forEach(link => {
+            link.classList.toggle('active', link.dataset.section === id);
+            if (link.dataset.section === id) {
+                SiteNav.openTo(link);
+            }
+        });
+        const element = id === 'readme' ? document.getElementById('readme') : sectionElement(id);
+        element.classList.add('active');
+        if (id !== 'readme') {
+            render(id, element);
+        }
+    }
+
+    function prefetch(event) {
+        const link = event.target.closest('[data-section]');
+        if (link && sections.has(link.dataset.section)) {
+            load(link.dataset.section).catch(() => {});
+        }
+    }
+
+    function route() {
+        showSection(decodeURIComponent(location.hash.slice(1)) || 'readme');
+    }
+
+    function buildNav(manifest) {
+        if (!manifest.sections.length) {
+            return;
+        }
+        const heading = document.createElement('h3');
+        heading.style.marginTop = '30px';
+        heading.textContent = '📓 Notebooks';
+        nav.appendChild(heading);
+        manifest.sections.forEach(entry => sections.set(entry.id, entry));
+        SiteNav.render(nav, manifest.nav, {link: '#{id}', prefix: '📓 '});
+    }
+
+    nav.addEventListener('mouseover', prefetch);
+    nav.addEventListener('focusin', prefetch);
+    nav.addEventListener('touchstart', prefetch, {passive: true});
+    window.addEventListener('hashchange', route);
+
+    fetch(MANIFEST_URL)
+        .then(response => response.json())
+        .then(buildNav)
+        .catch(() => {})
+        .then(route);
+})();
+'''
+
+
+def load_readme_html(path='README.md'):
+    """Render README.md, or return an empty string if there is none"""
+    if not os.path.exists(path):
+        return ""
+    with open(path, 'r') as f:
+        return markdown.markdown(f.read())
+
+
+def write_section(site_dir, name, content, group=''):
+    """Write one notebook fragment; returns its manifest entry
+
+    `group` is the folder the notebook is listed under in the navigation.
+    """
+    href = write_hashed_asset(site_dir, f'sections/{name}', content, ext='html')
+    return {
+        'id': name,
+        'title': display_name(name),
+        'src': quote(href),
+        'bytes': len(content.encode('utf-8')),
+        'group': group,
+    }
+
+
+def write_manifest(site_dir, entries):
+    """Write the section manifest and navigation tree the shell page loads on startup"""
+    nav = build_nav_tree((entry['id'], entry['title'], entry['group']) for entry in entries)
+    manifest = {'version': 1, 'sections': entries, 'nav': nav}
+    with open(os.path.join(site_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    return manifest
+
+
+def render_shell(title, readme_html, stylesheet_href, nav_href, script_href, search_href):
+    """The shell page: header, search box, README and an empty notebook navigation"""
+    return f'''<!DOCTYPE html>
+<html>
+<head>
+    <title>{title}</title>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <link rel="preload" href="{MANIFEST_NAME}" as="fetch" crossorigin="anonymous">
+    <link href="{FONTS_URL}" rel="stylesheet">
+{stylesheet_link(stylesheet_href)}</head>
+<body>
+{render_header(title)}
+    <div class="main-container">
+        <div class="sidebar">
+{search_widget('#{id}')}            <h3>📚 Documentation</h3>
+            <a class="nav-link active" href="#readme" data-section="readme">Overview</a>
+            <div id="notebook-nav" class="notebook-nav"></div>
+        </div>
+        
+        <div id="content" class="content">
+            <!-- README Section -->
+            <div id="readme" class="content-section active">
+                {readme_html}
+            </div>
+        </div>
+    </div>
+    
+    <script src="{nav_href}"></script>
+    <script src="{script_href}"></script>
+    <script src="{search_href}" defer></script>
+</body>
+</html>'''
+
+
+def write_shell_assets(site_dir):
+    """Write the shell's stylesheet and scripts; returns (stylesheet, nav, script, search script) hrefs"""
+    # Code is highlighted at build time; ship the token styles with the site CSS
+    stylesheet_href = write_hashed_asset(
+        site_dir, 'spa', SPA_CSS + SEARCH_CSS + NAV_CSS + '\n' + highlight_css() + '\n')
+    script = SPA_SCRIPT.replace('MANIFEST_URL', json.dumps(MANIFEST_NAME))
+    script_href = write_hashed_asset(site_dir, 'spa', script, ext='js')
+    return stylesheet_href, write_nav_script(site_dir), script_href, write_search_script(site_dir)
+
+
+def write_shell(site_dir, readme_html, asset_hrefs):
+    """Write index.html around the README, linking the hrefs from write_shell_assets"""
+    with open(os.path.join(site_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(render_shell(site_title(), readme_html, *asset_hrefs))
+
+
+def main():
+    """Same as publish_site.py, with the same arguments"""
+    from publish_site import main as publish_main
+    publish_main()
+
+
+if __name__ == '__main__':
+    main()
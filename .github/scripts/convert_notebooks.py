@@ -2,115 +2,286 @@
 
 import os
 import re
-import markdown
-import glob
+import json
 import html
+import markdown
+from functools import lru_cache
+from typing import NamedTuple
+
+from highlight import CellHighlighter, highlight_salt
+from instrumentation import stage
+from notebook_cells import NotebookCells
+
+
+# Bump when the fragment markup changes so cached fragments are invalidated
+CONVERTER_VERSION = '3'
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'nl2br', 'toc']
+# Rendered markdown cells kept per process; notebooks repeat many boilerplate cells
+MARKDOWN_CACHE_SIZE = 4096
+
+# Local notebook formats picked up from the notebooks/ directory
+NOTEBOOKS_DIR = 'notebooks'
+NOTEBOOK_PATTERNS = [f'{NOTEBOOKS_DIR}/*.py', f'{NOTEBOOKS_DIR}/*.ipynb']
+
+# Preferred representation when a Jupyter output offers several; outputs
+# with none of these are skipped with a warning
+OUTPUT_MIME_ORDER = ['text/html', 'application/javascript', 'image/svg+xml', 'image/png', 'image/jpeg',
+                     'image/gif', 'text/latex', 'text/markdown', 'text/plain']
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+
+class Output(NamedTuple):
+    """One output of an executed .ipynb code cell
+
+    `type` is 'stdout', 'stderr', 'text', 'html', 'javascript', 'latex', 'svg',
+    'image' or 'error'; images carry base64 `content` and their `mime` type.
+    """
+    type: str
+    content: str
+    mime: str = ''
+
+
+class Cell(NamedTuple):
+    """A single notebook cell"""
+    type: str
+    content: str
+    title: str = ''
+    outputs: tuple = ()
+    language: str = 'python'
+
+
+_markdown = None
+
+def _markdown_renderer():
+    """This process's Markdown instance, created once with all extensions loaded"""
+    global _markdown
+    if _markdown is None:
+        _markdown = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return _markdown
+
+
+@lru_cache(maxsize=MARKDOWN_CACHE_SIZE)
+def render_markdown(text):
+    """Render one markdown cell; same output as markdown.markdown(text, extensions=...)"""
+    md = _markdown_renderer()
+    md.reset()
+    return md.convert(text)
+
+
+def iter_mapped_cells(f):
+    """Yield cells from a Databricks .py notebook file handle
+
+    The file is memory-mapped and indexed by NotebookCells, and each cell's
+    text is decoded from the mapping just before it is yielded. Code cells
+    carry the language of their %magic.
+    """
+    with NotebookCells.map(f) as cells:
+        for i in range(len(cells)):
+            yield Cell(cells.kind(i), cells.text(i), cells.title(i), language=cells.language(i))
 
 
 def parse_databricks_notebook(filepath):
     """Parse a Databricks .py notebook format into cells"""
     with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Split by COMMAND ----------
-    sections = re.split(r'# COMMAND ----------', content)
-    cells = []
-    
-    for section in sections:
-        if not section.strip():
-            continue
-            
-        # Check if this is a markdown cell
-        if '# MAGIC %md' in section:
-            # Extract markdown content
-            lines = section.split('\n')
-            md_lines = []
-            for line in lines:
-                if line.startswith('# MAGIC %md'):
-                    # Remove '# MAGIC %md'
-                    md_lines.append(line[11:].strip())
-                elif line.startswith('# MAGIC '):
-                    # Remove '# MAGIC '
-                    md_lines.append(line[8:])
-                elif line.startswith('# MAGIC'):
-                    # Remove '# MAGIC'
-                    md_lines.append(line[7:])
-            
-            md_content = '\n'.join(md_lines)
-            cells.append({'type': 'markdown', 'content': md_content})
-        else:
-            # This is a code cell
-            # Remove any leading comments that aren't actual code
-            lines = section.split('\n')
-            code_lines = []
-            for line in lines:
-                if not line.startswith('# DBTITLE'):
-                    code_lines.append(line)
-            
-            code_content = '\n'.join(code_lines).strip()
-            if code_content:
-                cells.append({'type': 'code', 'content': code_content})
-    
-    return cells
+        return list(iter_mapped_cells(f))
+
+
+def _ipynb_text(value):
+    """Jupyter stores multi-line strings either whole or as a list of lines"""
+    if isinstance(value, list):
+        return ''.join(value)
+    return value or ''
 
 
-def convert_to_html_fragment(filepath):
-    """Convert Databricks .py notebook to HTML fragment with syntax highlighting"""
+def _ipynb_outputs(outputs, skipped):
+    """Yield an Output for each renderable output of a code cell
+
+    The MIME types of outputs that cannot be rendered are added to `skipped`.
+    """
+    for output in outputs:
+        output_type = output.get('output_type')
+        if output_type == 'stream':
+            kind = 'stderr' if output.get('name') == 'stderr' else 'stdout'
+            yield Output(kind, ANSI_ESCAPE.sub('', _ipynb_text(output.get('text'))))
+        elif output_type in ('execute_result', 'display_data'):
+            data = output.get('data', {})
+            mime = next((mime for mime in OUTPUT_MIME_ORDER if mime in data), None)
+            if mime is None:
+                skipped.update(data)
+                continue
+            content = _ipynb_text(data[mime])
+            if mime == 'text/html':
+                yield Output('html', content, mime)
+            elif mime == 'application/javascript':
+                yield Output('javascript', content, mime)
+            elif mime == 'text/latex':
+                yield Output('latex', content, mime)
+            elif mime == 'image/svg+xml':
+                yield Output('svg', content, mime)
+            elif mime.startswith('image/'):
+                yield Output('image', ''.join(content.split()), mime)
+            elif mime == 'text/markdown':
+                yield Output('html', render_markdown(content), mime)
+            else:
+                yield Output('text', ANSI_ESCAPE.sub('', content), mime)
+        elif output_type == 'error':
+            traceback = '\n'.join(output.get('traceback', []))
+            yield Output('error', ANSI_ESCAPE.sub('', traceback)
+                         or f"{output.get('ename', 'Error')}: {output.get('evalue', '')}")
+
+
+def iter_ipynb_cells(f):
+    """Yield cells, with code cell outputs, from a Jupyter .ipynb file handle
+
+    Code cells take the language of the notebook kernel. Raw cells are
+    skipped, as in nbconvert's HTML export.
+    """
+    notebook = json.load(f)
+    metadata = notebook.get('metadata', {})
+    language = (metadata.get('kernelspec', {}).get('language')
+                or metadata.get('language_info', {}).get('name')
+                or 'python').lower()
+
+    skipped = set()
+    for cell in notebook.get('cells', []):
+        source = _ipynb_text(cell.get('source'))
+        if cell.get('cell_type') == 'markdown':
+            if source.strip():
+                yield Cell('markdown', source)
+        elif cell.get('cell_type') == 'code':
+            outputs = tuple(_ipynb_outputs(cell.get('outputs', []), skipped))
+            if source.strip() or outputs:
+                yield Cell('code', source.strip(), outputs=outputs, language=language)
+    if skipped:
+        print(f"Skipped outputs of {getattr(f, 'name', 'notebook')} with no renderable type: "
+              f"{', '.join(sorted(skipped))}")
+
+
+# Cell readers by notebook file extension
+CELL_READERS = {
+    '.py': iter_mapped_cells,
+    '.ipynb': iter_ipynb_cells,
+}
+
+
+def render_output(output):
+    """nbconvert-style markup for one code cell output"""
+    if output.type in ('stdout', 'stderr', 'text'):
+        stream = f' output_stream output_{output.type}' if output.type != 'text' else ''
+        body = f'<div class="output_subarea output_text{stream}">\n<pre>{html.escape(output.content)}</pre>\n</div>'
+    elif output.type == 'error':
+        body = f'<div class="output_subarea output_text output_error">\n<pre>{html.escape(output.content)}</pre>\n</div>'
+    elif output.type == 'html':
+        body = f'<div class="output_subarea output_html rendered_html">\n{output.content}\n</div>'
+    elif output.type == 'javascript':
+        body = (f'<div class="output_subarea output_javascript">\n'
+                f'<script type="text/javascript">\n{output.content}\n</script>\n</div>')
+    elif output.type == 'latex':
+        body = f'<div class="output_subarea output_latex">\n{output.content}\n</div>'
+    elif output.type == 'svg':
+        body = f'<div class="output_subarea output_svg">\n{output.content}\n</div>'
+    else:
+        body = (f'<div class="output_subarea output_{output.mime.split("/")[-1]}">\n'
+                f'<img src="data:{output.mime};base64,{output.content}">\n</div>')
+    return f'<div class="output_area">\n{body}\n</div>'
+
+
+def render_outputs(outputs):
+    if not outputs:
+        return ''
+    areas = '\n'.join(render_output(output) for output in outputs)
+    return f'\n<div class="output_wrapper">\n<div class="output">\n{areas}\n</div>\n</div>'
+
+
+def convert_to_html_fragment(filepath, cell_cache=None):
+    """Convert a .py or .ipynb notebook to HTML fragment with syntax highlighting
+
+    Code cells are highlighted at build time; pass a FragmentCache as
+    `cell_cache` to reuse the markup of cells that were highlighted before.
+    """
+    highlight_code = CellHighlighter(cell_cache)
     filename = os.path.basename(filepath)
-    name_without_ext = os.path.splitext(filename)[0]
+    name_without_ext, ext = os.path.splitext(filename)
+    iter_cells = CELL_READERS[ext]
     
-    cells = parse_databricks_notebook(filepath)
     html_content = []
     
-    for i, cell in enumerate(cells):
-        if cell['type'] == 'markdown':
-            # Convert markdown to HTML using nbconvert structure
-            md_html = markdown.markdown(
-                cell['content'], 
-                extensions=['fenced_code', 'tables', 'nl2br', 'toc']
-            )
-            html_content.append(f'''<div class="cell border-box-sizing text_cell rendered">
+    with open(filepath, 'r', encoding='utf-8') as f, stage('convert', name_without_ext) as span:
+        if span.enabled:
+            span.add_bytes(os.path.getsize(filepath))
+        for cell in iter_cells(f):
+            if cell.type == 'markdown':
+                # Convert markdown to HTML using nbconvert structure
+                with span.part('markdown'):
+                    md_html = render_markdown(cell.content)
+                html_content.append(f'''<div class="cell border-box-sizing text_cell rendered">
 <div class="inner_cell">
 <div class="text_cell_render border-box-sizing rendered_html">
 {md_html}
 </div>
 </div>
 </div>''')
-        elif cell['type'] == 'code':
-            # Create code cell with proper syntax highlighting for Python
-            escaped_code = html.escape(cell['content'])
-            html_content.append(f'''<div class="cell border-box-sizing code_cell rendered">
+            elif cell.type == 'code':
+                # Highlight in the cell's language (%sql, %scala, %r, ...)
+                with span.part('highlight'):
+                    code_html = highlight_code(cell.content, cell.language)
+                with span.part('outputs'):
+                    outputs_html = render_outputs(cell.outputs)
+                html_content.append(f'''<div class="cell border-box-sizing code_cell rendered">
 <div class="input">
 <div class="inner_cell">
 <div class="input_area">
-<div class="highlight hl-ipython3">
-<pre class="language-python"><code class="language-python">{escaped_code}</code></pre>
-</div>
-</div>
+{code_html}
 </div>
 </div>
+</div>{outputs_html}
 </div>''')
     
     # Return just the content fragment (no full HTML document)
     fragment_content = '\n'.join(html_content)
     
-    # Write fragment to temp file for the main script to read
-    temp_path = f"temp_{name_without_ext}_fragment.html"
-    with open(temp_path, 'w') as f:
-        f.write(fragment_content)
-    
     return name_without_ext, fragment_content
 
 
-if __name__ == "__main__":
-    # Process all .py files in notebooks directory
-    notebook_data = {}
-    for py_file in glob.glob('notebooks/*.py'):
-        name, fragment = convert_to_html_fragment(py_file)
-        notebook_data[name] = fragment
-        print(f"Converted {py_file} to HTML fragment")
-    
-    # Write notebook data to a JSON file for the main script
-    import json
-    with open('notebook_fragments.json', 'w') as f:
-        json.dump(notebook_data, f)
\ No newline at end of file
+def cache_salt():
+    """Versions that change the rendered output, mixed into every cache key"""
+    return (f"{CONVERTER_VERSION}|markdown-{markdown.__version__}|{','.join(MARKDOWN_EXTENSIONS)}"
+            f"|{highlight_salt()}")
+
+
+def lookup_fragment(cache, path):
+    """(cache key, cached fragment or None) for a notebook source; (None, None) without a cache"""
+    if not cache:
+        return None, None
+    with stage('cache.lookup', os.path.splitext(os.path.basename(path))[0]) as span:
+        key = cache.key_for_file(path)
+        fragment = cache.get(key)
+        if fragment is not None:
+            span.add_bytes(len(fragment))
+            print(f"Reused cached fragment for {path}")
+    return key, fragment
+
+
+def store_fragment(cache, key, path, name, fragment):
+    """Record a freshly rendered fragment in `cache` under the key lookup_fragment() gave"""
+    if cache:
+        with stage('cache.store', name, len(fragment)):
+            cache.put(key, fragment)
+    print(f"Converted {path} to HTML fragment")
+
+
+def convert_notebook(path, cache=None, cell_cache=None):
+    """Convert one notebook in this process, reusing `cache`
+
+    Returns (name, fragment), or None if the notebook failed to convert.
+    """
+    key, fragment = lookup_fragment(cache, path)
+    if fragment is not None:
+        return os.path.splitext(os.path.basename(path))[0], fragment
+    try:
+        name, fragment = convert_to_html_fragment(path, cell_cache)
+    except Exception as e:
+        print(f"Failed to convert {path}: {e}")
+        return None
+    store_fragment(cache, key, path, name, fragment)
+    return name, fragment
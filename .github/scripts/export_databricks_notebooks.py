@@ -2,67 +2,67 @@
 """
 Export notebooks from Databricks workspace as HTML with consistent styling.
 This script fetches executed notebooks from Databricks and wraps them with
-consistent branding and navigation.
+consistent branding and navigation. The notebook list is written once to
+site/nav.json, grouped by workspace folder, rather than into every page.
 """
 
 import os
 import json
-import requests
-import re
-import base64
+import io
+import argparse
 import glob
+import mmap
+import zipfile
+import hashlib
+from functools import lru_cache, partial
 from pathlib import Path
+from typing import NamedTuple, Optional
+
+from workspace_client import WorkspaceClient
+from workspace_discovery import discover_notebooks, DEFAULT_INDEX_CACHE
+from archive_export import ARCHIVE_FORMAT, archive_directory, archive_members, is_below, render_member
+from export_manifest import ExportManifest, DEFAULT_MANIFEST_PATH
+from stream_utils import read_range
+from html_extract import scan_html
+from large_outputs import OutputRewriter, limits_from_env
+from navigation import build_nav_tree, notebook_group, write_nav, write_nav_script
+import instrumentation
+from instrumentation import stage
+from pipeline import Stage, run_pipeline
+from postprocess_site import postprocess_site, postprocess_enabled
+from search_index import build_search_index, notebook_sources, write_search_script
+from site_templates import SiteTemplate, COLORS, display_name  # noqa: F401 (COLORS re-exported)
 
 # Configuration
 DATABRICKS_HOST = os.environ.get('DATABRICKS_HOST', 'https://e2-demo-field-eng.cloud.databricks.com')
 DATABRICKS_TOKEN = os.environ.get('DATABRICKS_TOKEN', '')
+# Number of notebooks exported concurrently over the pooled session
+EXPORT_CONCURRENCY = int(os.environ.get('DATABRICKS_EXPORT_CONCURRENCY', '8'))
+# 'html' exports each notebook with its results; 'archive' fetches the whole
+# folder as one source archive and renders the notebooks locally (no outputs)
+EXPORT_MODE = os.environ.get('DATABRICKS_EXPORT_MODE', 'html')
+# Folder exported in archive mode (default: the deepest folder holding every notebook)
+EXPORT_DIRECTORY = os.environ.get('DATABRICKS_EXPORT_DIRECTORY', '')
+# Workspace folder searched for notebooks matching the local notebooks/ files
+WORKSPACE_ROOT = os.environ.get('DATABRICKS_WORKSPACE_ROOT', '/Workspace/Users')
+WORKSPACE_INDEX_CACHE = os.environ.get('DATABRICKS_WORKSPACE_INDEX_CACHE', DEFAULT_INDEX_CACHE)
+EXPORT_MANIFEST = os.environ.get('DATABRICKS_EXPORT_MANIFEST', DEFAULT_MANIFEST_PATH)
+# Worker processes wrapping exported notebooks into pages
+WRAP_PROCESSES = int(os.environ.get('SITE_WRAP_PROCESSES', str(os.cpu_count() or 1)))
+# Inline image and long output thresholds (SITE_INLINE_IMAGE_BYTES, SITE_TEXT_OUTPUT_BYTES, ...)
+OUTPUT_LIMITS = limits_from_env()
 
-# Databricks brand colors
-COLORS = {
-    'primary': '#FF3621',
-    'text': '#1B3139',
-    'bg': '#FFFFFF', 
-    'light_bg': '#F5F5F5',
-    'border': '#E3E3E3'
-}
+# Bump when the page markup changes so unchanged notebooks are re-wrapped
+WRAPPER_VERSION = '6'
 
-def list_workspace_notebooks():
-    """List all notebooks in the workspace"""
-    headers = {'Authorization': f'Bearer {DATABRICKS_TOKEN}'}
-    
-    # You can customize this path based on your workspace structure
-    workspace_path = '/Workspace/Users'
-    
-    response = requests.get(
-        f"{DATABRICKS_HOST}/api/2.0/workspace/list",
-        headers=headers,
-        params={'path': workspace_path}
-    )
-    
-    if response.status_code == 200:
-        return response.json().get('objects', [])
-    return []
+_client = None
 
-def export_notebook_html(notebook_path):
-    """Export a single notebook as HTML"""
-    headers = {'Authorization': f'Bearer {DATABRICKS_TOKEN}'}
-    
-    response = requests.get(
-        f"{DATABRICKS_HOST}/api/2.0/workspace/export",
-        headers=headers,
-        params={
-            'path': notebook_path,
-            'format': 'HTML'
-        }
-    )
-    
-    if response.status_code == 200:
-        data = response.json()
-        html_content = base64.b64decode(data['content']).decode('utf-8')
-        return html_content
-    else:
-        print(f"Failed to export {notebook_path}: {response.status_code}")
-        return None
+def get_client():
+    """Return the shared, connection-pooled workspace client"""
+    global _client
+    if _client is None:
+        _client = WorkspaceClient(DATABRICKS_HOST, DATABRICKS_TOKEN, max_workers=EXPORT_CONCURRENCY)
+    return _client
 
 def find_notebooks_in_workspace():
     """Find notebooks based on local notebook files"""
@@ -81,281 +81,257 @@ def find_notebooks_in_workspace():
     
     return local_notebooks
 
-def create_wrapper_html(notebook_name, notebook_html, all_notebooks):
+def extract_notebook_html(f):
+    """Return (style_content, (body_start, body_end)) for an exported notebook file
+
+    Styles are concatenated with a newline after each; the body range falls
+    back to the whole file when the export has no <body>.
+    """
+    extract = scan_html(f)
+    style_content = b''.join(read_range(f, start, end) + b'\n' for start, end in extract.styles)
+    return style_content.decode('utf-8'), extract.body or (0, extract.size)
+
+def create_wrapper_html(notebook_name, notebook_html, template=None):
     """Create consistent wrapper for notebook HTML"""
-    # Extract body content
-    body_match = re.search(r'<body[^>]*>(.*?)</body>', notebook_html, re.DOTALL)
-    body_content = body_match.group(1) if body_match else notebook_html
-    
-    # Extract styles
-    style_content = ""
-    style_matches = re.findall(r'<style[^>]*>(.*?)</style>', notebook_html, re.DOTALL)
-    for style in style_matches:
-        style_content += style + "\n"
-    
-    repo_name = os.environ.get('GITHUB_REPOSITORY', '').split('/')[-1]
-    title = ' '.join(word.capitalize() for word in repo_name.split('-')) + ' Accelerator'
-    display_name = notebook_name.replace('_', ' ').title()
+    data = notebook_html.encode('utf-8')
+    style_content, (body_start, body_end) = extract_notebook_html(io.BytesIO(data))
     
-    html = f'''<!DOCTYPE html>
-<html>
-<head>
-    <title>{display_name} - {title}</title>
-    <link href="https://fonts.googleapis.com/css2?family=DM+Sans:wght@400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        /* Reset and base styles */
-        * {{
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'DM Sans', -apple-system, BlinkMacSystemFont, sans-serif !important;
-            margin: 0;
-            padding: 0;
-            background: {COLORS['bg']};
-            color: {COLORS['text']};
-            font-size: 14px;
-            line-height: 1.6;
-        }}
-        
-        /* Header */
-        .header {{
-            background: {COLORS['bg']};
-            padding: 20px 40px;
-            border-bottom: 1px solid {COLORS['border']};
-            display: flex;
-            align-items: center;
-            gap: 20px;
-            position: fixed;
-            top: 0;
-            width: 100%;
-            z-index: 1000;
-        }}
-        
-        .logo {{ height: 24px; }}
-        
-        .title {{
-            font-size: 24px;
-            font-weight: 600;
-            flex: 1;
-            text-align: center;
-            color: {COLORS['text']};
-        }}
-        
-        .github-link {{
-            background: {COLORS['light_bg']};
-            padding: 8px 16px;
-            border-radius: 6px;
-            text-decoration: none;
-            color: {COLORS['text']};
-            font-weight: 500;
-            transition: all 0.2s;
-        }}
-        
-        .github-link:hover {{
-            background: {COLORS['border']};
-        }}
-        
-        /* Layout */
-        .main-container {{
-            display: flex;
-            margin-top: 80px;
-            min-height: calc(100vh - 80px);
-        }}
-        
-        .sidebar {{
-            width: 280px;
-            background: {COLORS['light_bg']};
-            padding: 30px 20px;
-            position: fixed;
-            left: 0;
-            top: 80px;
-            height: calc(100vh - 80px);
-            overflow-y: auto;
-        }}
-        
-        .sidebar h3 {{
-            font-size: 16px;
-            font-weight: 600;
-            margin: 0 0 20px 12px;
-            color: {COLORS['text']};
-        }}
-        
-        .content {{
-            flex: 1;
-            padding: 20px;
-            margin-left: 280px;
-        }}
-        
-        .notebook-container {{
-            background: {COLORS['bg']};
-            border-radius: 8px;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-            padding: 40px;
-            margin: 0 auto;
-            max-width: 1200px;
-        }}
-        
-        /* Navigation */
-        .nav-link {{
-            display: block;
-            padding: 10px 12px;
-            margin: 4px 0;
-            text-decoration: none;
-            color: {COLORS['text']};
-            border-radius: 4px;
-            font-weight: 400;
-            transition: all 0.2s;
-        }}
-        
-        .nav-link:hover {{
-            background: {COLORS['bg']};
-        }}
-        
-        .nav-link.active {{
-            background: {COLORS['primary']};
-            color: {COLORS['bg']};
-            font-weight: 500;
-        }}
-        
-        /* Databricks notebook overrides */
-        .notebook-container h1,
-        .notebook-container h2,
-        .notebook-container h3,
-        .notebook-container h4,
-        .notebook-container h5,
-        .notebook-container h6 {{
-            font-family: 'DM Sans', sans-serif !important;
-            color: {COLORS['text']} !important;
-            font-weight: 600 !important;
-            margin-top: 24px;
-            margin-bottom: 16px;
-        }}
-        
-        .notebook-container p,
-        .notebook-container div,
-        .notebook-container span {{
-            font-family: 'DM Sans', sans-serif !important;
-        }}
-        
-        .notebook-container code,
-        .notebook-container pre {{
-            font-family: 'Monaco', 'Menlo', 'Consolas', monospace !important;
-            background-color: {COLORS['light_bg']} !important;
-            border: 1px solid {COLORS['border']} !important;
-            border-radius: 4px !important;
-        }}
-        
-        .notebook-container pre {{
-            padding: 16px !important;
-            overflow-x: auto !important;
-        }}
-        
-        .notebook-container code {{
-            padding: 2px 6px !important;
-        }}
-        
-        /* Output areas */
-        .ansiout,
-        .output_area,
-        div[class*="output"] {{
-            font-family: 'Monaco', 'Consolas', monospace !important;
-            background: {COLORS['light_bg']} !important;
-            border: 1px solid {COLORS['border']} !important;
-            border-radius: 4px !important;
-            padding: 10px !important;
-            margin: 10px 0 !important;
-            overflow-x: auto !important;
-        }}
-        
-        /* Tables */
-        .notebook-container table {{
-            border-collapse: collapse;
-            margin: 16px 0;
-            font-family: 'DM Sans', sans-serif !important;
-        }}
-        
-        .notebook-container th,
-        .notebook-container td {{
-            border: 1px solid {COLORS['border']};
-            padding: 8px 12px;
-            text-align: left;
-        }}
-        
-        .notebook-container th {{
-            background: {COLORS['light_bg']};
-            font-weight: 600;
-        }}
-        
-        /* Original Databricks styles (scoped) */
-        .notebook-container {{
-            {style_content}
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <img src="https://databricks-prod-cloudfront.cloud.databricks.com/static/811f68f9f55e3a5330b6e6ae1e54c07fc5ec7224f15be529de3400226e2eca3a/db-nav-logo.svg" 
-             class="logo" alt="Databricks">
-        <div class="title">{title}</div>
-        <a href="{os.environ.get('GITHUB_SERVER_URL', '')}/{os.environ.get('GITHUB_REPOSITORY', '')}" 
-           class="github-link">View on GitHub</a>
-    </div>
-    <div class="main-container">
-        <div class="sidebar">
-            <h3>📚 Documentation</h3>
-            <a href="index.html" class="nav-link">Overview</a>
-            <h3 style="margin-top: 30px;">📓 Notebooks</h3>
-'''
-    
-    # Add notebook links
-    for nb in sorted(all_notebooks):
-        nb_display = nb.replace('_', ' ').title()
-        active = 'active' if nb == notebook_name else ''
-        html += f'            <a href="{nb}.html" class="nav-link {active}">{nb_display}</a>\n'
-    
-    html += f'''
-        </div>
-        <div class="content">
-            <div class="notebook-container">
-                {body_content}
-            </div>
-        </div>
-    </div>
-</body>
-</html>'''
-    
-    return html
+    template = template or get_site_template()
+    body = io.BytesIO()
+    OutputRewriter(template.site_dir, OUTPUT_LIMITS).copy_body(data, body_start, body_end, body)
+    return template.render_notebook_page(notebook_name, style_content, body.getvalue().decode('utf-8'))
+
+def write_wrapper_html(notebook_name, source_path, out, template=None):
+    """Stream the wrapped page for an exported notebook file into binary file `out`
+
+    Produces the same page as create_wrapper_html, but only the extracted
+    styles are held in memory; the body is copied through in ranges of the
+    memory-mapped export, with large outputs moved to site assets.
+    Returns the paths of the stylesheet, image and output assets the page
+    links to.
+    """
+    with open(source_path, 'rb') as f:
+        with stage('extract', notebook_name) as span:
+            style_content, (body_start, body_end) = extract_notebook_html(f)
+            if span.enabled:
+                span.add_bytes(os.fstat(f.fileno()).st_size)
+        
+        template = template or get_site_template()
+        before, after = template.notebook_page_parts(notebook_name, style_content)
+        out.write(''.join(before).encode('utf-8'))
+        output_assets = []
+        if body_end > body_start:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data, \
+                    stage('outputs', notebook_name, body_end - body_start):
+                output_assets = OutputRewriter(template.site_dir, OUTPUT_LIMITS).copy_body(data, body_start, body_end, out)
+        out.write(''.join(after).encode('utf-8'))
+        hrefs = template.notebook_assets(style_content) + output_assets
+        return [os.path.join(template.site_dir, href) for href in hrefs]
+
+@lru_cache(maxsize=1)
+def get_site_template():
+    """SiteTemplate for the build, created once and reused across pages"""
+    return SiteTemplate(search_script=write_search_script('site'), nav_script=write_nav_script('site'))
+
+def page_key(notebook_name, content_hash, template):
+    """Hash of every input that affects a wrapped notebook page
+
+    The other notebooks are not among them: the sidebar is filled in from
+    nav.json, so adding or removing a notebook re-wraps no other page.
+    """
+    parts = [
+        WRAPPER_VERSION,
+        template.stylesheet,
+        template.search_script or '',
+        template.nav_script or '',
+        repr(tuple(OUTPUT_LIMITS)),
+        notebook_name,
+        content_hash,
+        os.environ.get('GITHUB_SERVER_URL', ''),
+        os.environ.get('GITHUB_REPOSITORY', ''),
+    ]
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+class PageJob(NamedTuple):
+    """A notebook page to write, from a fresh export or the cached one"""
+    notebook: str
+    obj: dict
+    source_path: str
+    content_hash: Optional[str] = None
+    fetched: bool = True
+    member: Optional[str] = None   # the notebook's file in a folder archive
 
-def main():
+    @property
+    def output_path(self):
+        return f'site/{self.notebook}.html'
+
+def export_job(job):
+    """Pipeline stage: stream the notebook's export to its staging file"""
+    content_hash = get_client().export_html_to_file(job.obj['path'], job.source_path)
+    if not content_hash:
+        if os.path.exists(job.source_path):
+            os.remove(job.source_path)
+        return None
+    return job._replace(content_hash=content_hash)
+
+def archive_job(archive_path, job):
+    """Pipeline stage (worker process): render the notebook from the folder archive"""
+    if job.member is None:
+        return export_job(job)
+    try:
+        content_hash = render_member(archive_path, job.member, job.notebook, job.source_path)
+    except Exception as e:
+        print(f"Failed to render {job.notebook} from the archive: {e}")
+        return None
+    return job._replace(content_hash=content_hash)
+
+def fetch_archive(manifest, jobs):
+    """Download the folder archive for the jobs still to fetch
+
+    Returns the archive path and the jobs with their archive members set, or
+    (None, jobs) if the archive could not be exported; notebooks missing from
+    the archive are left to the per-notebook HTML export.
+    """
+    paths = [job.obj['path'] for job in jobs if job.content_hash is None]
+    directory = EXPORT_DIRECTORY or archive_directory(paths)
+    if not EXPORT_DIRECTORY and not is_below(directory, WORKSPACE_ROOT):
+        # e.g. notebooks found under two users' folders: the archive would be all of them
+        print(f"The notebooks to export only share {directory}, which is not below {WORKSPACE_ROOT}; "
+              "set DATABRICKS_EXPORT_DIRECTORY to the accelerator's folder to export it as one archive")
+        print("Falling back to one HTML export per notebook")
+        return None, jobs
+    archive_path = manifest.staging_path('archive')
+    print(f"Exporting {directory} as one {ARCHIVE_FORMAT} archive...")
+    if not get_client().export_directory_to_file(directory, archive_path, ARCHIVE_FORMAT):
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
+        print("Falling back to one HTML export per notebook")
+        return None, jobs
+    try:
+        members = archive_members(archive_path, directory, paths)
+    except zipfile.BadZipFile as e:
+        print(f"Unreadable archive of {directory}: {e}; falling back to one HTML export per notebook")
+        os.remove(archive_path)
+        return None, jobs
+    for path in paths:
+        if path not in members:
+            print(f"{path} is not in the archive; exporting it as HTML")
+    return archive_path, [job._replace(member=members.get(job.obj['path'])) for job in jobs]
+
+def wrap_job(job):
+    """Pipeline stage (worker process): write the page; returns (job, linked assets)"""
+    try:
+        return job, write_notebook_page(job.notebook, job.source_path, job.output_path)
+    except Exception as e:
+        print(f"Failed to write page for {job.notebook}: {e}")
+        return None
+
+def write_notebook_page(notebook_name, source_path, output_path, template=None):
+    """Wrap an exported notebook file and write it to the site; returns linked assets"""
+    with open(output_path, 'wb') as out:
+        return write_wrapper_html(notebook_name, source_path, out, template)
+
+def write_navigation(exported, workspace_paths):
+    """Write nav.json for the exported notebooks, grouped by workspace folder
+
+    Groups are the folders below the deepest one holding every notebook, so
+    a flat accelerator gets a flat list.
+    """
+    root = archive_directory([workspace_paths[notebook] for notebook in exported])
+    tree = build_nav_tree((notebook, display_name(notebook), notebook_group(workspace_paths[notebook], root))
+                          for notebook in exported)
+    return write_nav('site', tree)
+
+def main(argv=None):
     """Main export function"""
+    parser = argparse.ArgumentParser(description='Export workspace notebooks to the HTML site')
+    parser.add_argument('--export-mode', choices=['html', 'archive'], default=EXPORT_MODE,
+                        help='One HTML export per notebook, or one source archive of the folder '
+                             f'(default: DATABRICKS_EXPORT_MODE or {EXPORT_MODE})')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    with instrumentation.instrumented('export_databricks_notebooks', args.timings, args.profile, args.profile_dir):
+        return export_site(args.export_mode)
+
+def export_site(export_mode=EXPORT_MODE):
+    """Export, wrap and index every local notebook found in the workspace"""
     os.makedirs('site', exist_ok=True)
     
     # Find notebooks to export
     notebooks = find_notebooks_in_workspace()
     print(f"Found {len(notebooks)} notebooks to export")
     
-    # For now, use a mapping of local to workspace paths
-    # In production, this could be automated or configured
-    notebook_mappings = {
-        'notebook1': '/path/to/workspace/notebook1',
-        'notebook2': '/path/to/workspace/notebook2',
-    }
+    # Map local notebook names to workspace paths by walking the workspace
+    with stage('discover'):
+        index = discover_notebooks(get_client(), WORKSPACE_ROOT, cache_path=WORKSPACE_INDEX_CACHE)
     
-    exported = []
+    to_export = []
     for notebook in notebooks:
-        workspace_path = notebook_mappings.get(notebook)
-        if workspace_path:
-            print(f"Exporting {notebook} from {workspace_path}...")
-            html = export_notebook_html(workspace_path)
-            if html:
-                wrapped = create_wrapper_html(notebook, html, notebooks)
-                with open(f'site/{notebook}.html', 'w') as f:
-                    f.write(wrapped)
-                exported.append(notebook)
-                print(f"Successfully exported {notebook}")
+        obj = index.get(notebook)
+        if obj:
+            to_export.append((notebook, obj))
+        else:
+            print(f"No workspace notebook named {notebook} under {WORKSPACE_ROOT}")
+    
+    manifest = ExportManifest(EXPORT_MANIFEST)
+    template = get_site_template()
+    done = set()
+    unchanged = 0
+    
+    # Notebooks unchanged in the workspace are re-wrapped from the cached export,
+    # and only when the page inputs changed
+    jobs = []
+    for notebook, obj in to_export:
+        if not manifest.is_current(notebook, obj, export_mode):
+            jobs.append(PageJob(notebook, obj, manifest.staging_path(notebook)))
+            continue
+        content_hash = manifest.content_hash(notebook)
+        if manifest.page_is_current(notebook, page_key(notebook, content_hash, template)):
+            done.add(notebook)
         else:
-            print(f"No workspace mapping for {notebook}")
+            # Linked only once run_pipeline hands the re-wrapped page back
+            jobs.append(PageJob(notebook, obj, manifest.export_path(notebook), content_hash, fetched=False))
+        unchanged += 1
+    
+    fetching = sum(1 for job in jobs if job.fetched)
+    archive_path = None
+    if export_mode == 'archive' and fetching:
+        archive_path, jobs = fetch_archive(manifest, jobs)
+    if archive_path:
+        print(f"Rendering {fetching} notebooks from the archive and wrapping {len(jobs)} pages in "
+              f"{WRAP_PROCESSES} processes ({unchanged} unchanged)...")
+        fetch_stage = Stage('render', partial(archive_job, archive_path), workers=WRAP_PROCESSES,
+                            processes=True, when=lambda job: job.content_hash is None)
+    else:
+        print(f"Exporting {fetching} notebooks with {EXPORT_CONCURRENCY} concurrent requests and wrapping "
+              f"{len(jobs)} pages in {WRAP_PROCESSES} processes ({unchanged} unchanged)...")
+        fetch_stage = Stage('export', export_job, workers=EXPORT_CONCURRENCY,
+                            when=lambda job: job.content_hash is None)
+    # Exports stream to disk on threads while pages are wrapped in worker
+    # processes; both stages run at once, a bounded number of notebooks apart
+    stages = [
+        fetch_stage,
+        Stage('wrap', wrap_job, workers=WRAP_PROCESSES, processes=True),
+    ]
+    for job, assets in run_pipeline(jobs, stages):
+        if job.fetched:
+            mode = 'archive' if archive_path and job.member else 'html'
+            manifest.record_export_file(job.notebook, job.obj, job.source_path, job.content_hash, mode)
+            print(f"Successfully exported {job.notebook} from {job.obj['path']}")
+        manifest.record_page(job.notebook, page_key(job.notebook, job.content_hash, template),
+                             job.output_path, assets)
+        done.add(job.notebook)
+    for job in jobs:
+        if job.fetched and job.notebook not in done and os.path.exists(job.source_path):
+            os.remove(job.source_path)
+    if archive_path:
+        os.remove(archive_path)
+    exported = [notebook for notebook in notebooks if notebook in done]
+    
+    with stage('manifest'):
+        manifest.retain(notebooks)
+        manifest.save()
     
     # Create index.html
     import markdown
@@ -365,200 +341,24 @@ def main():
         with open('README.md', 'r') as f:
             readme_content = markdown.markdown(f.read())
     
-    repo_name = os.environ.get('GITHUB_REPOSITORY', '').split('/')[-1]
-    title = ' '.join(word.capitalize() for word in repo_name.split('-')) + ' Accelerator'
-    
-    index_html = f'''<!DOCTYPE html>
-<html>
-<head>
-    <title>{title}</title>
-    <link href="https://fonts.googleapis.com/css2?family=DM+Sans:wght@400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        body {{
-            font-family: 'DM Sans', sans-serif;
-            margin: 0;
-            padding: 0;
-            background: {COLORS['bg']};
-            color: {COLORS['text']};
-        }}
-        
-        .header {{
-            background: {COLORS['bg']};
-            padding: 20px 40px;
-            border-bottom: 1px solid {COLORS['border']};
-            display: flex;
-            align-items: center;
-            gap: 20px;
-            position: fixed;
-            top: 0;
-            width: 100%;
-            z-index: 1000;
-            box-sizing: border-box;
-        }}
-        
-        .logo {{ height: 24px; }}
-        
-        .title {{
-            font-size: 24px;
-            font-weight: 600;
-            flex: 1;
-            text-align: center;
-            color: {COLORS['text']};
-        }}
-        
-        .github-link {{
-            background: {COLORS['light_bg']};
-            padding: 8px 16px;
-            border-radius: 6px;
-            text-decoration: none;
-            color: {COLORS['text']};
-            font-weight: 500;
-            transition: all 0.2s;
-        }}
-        
-        .github-link:hover {{
-            background: {COLORS['border']};
-        }}
-        
-        .main-container {{
-            display: flex;
-            margin-top: 80px;
-            min-height: calc(100vh - 80px);
-        }}
-        
-        .sidebar {{
-            width: 280px;
-            background: {COLORS['light_bg']};
-            padding: 30px 20px;
-            position: fixed;
-            left: 0;
-            top: 80px;
-            height: calc(100vh - 80px);
-            overflow-y: auto;
-            box-sizing: border-box;
-        }}
-        
-        .sidebar h3 {{
-            font-size: 16px;
-            font-weight: 600;
-            margin: 0 0 20px 12px;
-            color: {COLORS['text']};
-        }}
-        
-        .content {{
-            flex: 1;
-            padding: 20px;
-            margin-left: 280px;
-        }}
-        
-        .content-container {{
-            background: {COLORS['bg']};
-            padding: 40px;
-            border-radius: 8px;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-            margin: 0 auto;
-            max-width: 900px;
-        }}
-        
-        .nav-link {{
-            display: block;
-            padding: 10px 12px;
-            margin: 4px 0;
-            text-decoration: none;
-            color: {COLORS['text']};
-            border-radius: 4px;
-            font-weight: 400;
-            transition: all 0.2s;
-        }}
-        
-        .nav-link:hover {{
-            background: {COLORS['bg']};
-        }}
-        
-        .nav-link.active {{
-            background: {COLORS['primary']};
-            color: {COLORS['bg']};
-            font-weight: 500;
-        }}
-        
-        h1, h2, h3 {{
-            color: {COLORS['text']};
-            font-weight: 600;
-        }}
-        
-        h1 {{ font-size: 32px; margin: 0 0 24px 0; }}
-        h2 {{ font-size: 24px; margin: 32px 0 16px 0; }}
-        h3 {{ font-size: 18px; margin: 24px 0 12px 0; }}
-        
-        p {{ line-height: 1.6; margin: 0 0 16px 0; }}
-        
-        code {{
-            background: {COLORS['light_bg']};
-            padding: 2px 6px;
-            border-radius: 3px;
-            font-family: 'Monaco', 'Consolas', monospace;
-            font-size: 14px;
-        }}
-        
-        pre {{
-            background: {COLORS['light_bg']};
-            padding: 16px;
-            border-radius: 6px;
-            overflow-x: auto;
-            margin: 16px 0;
-        }}
-        
-        ul, ol {{
-            margin: 0 0 16px 0;
-            padding-left: 24px;
-            line-height: 1.6;
-        }}
-        
-        a {{
-            color: {COLORS['primary']};
-            text-decoration: none;
-        }}
-        
-        a:hover {{
-            text-decoration: underline;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <img src="https://databricks-prod-cloudfront.cloud.databricks.com/static/811f68f9f55e3a5330b6e6ae1e54c07fc5ec7224f15be529de3400226e2eca3a/db-nav-logo.svg" 
-             class="logo" alt="Databricks">
-        <div class="title">{title}</div>
-        <a href="{os.environ.get('GITHUB_SERVER_URL', '')}/{os.environ.get('GITHUB_REPOSITORY', '')}" 
-           class="github-link">View on GitHub</a>
-    </div>
-    <div class="main-container">
-        <div class="sidebar">
-            <h3>📚 Documentation</h3>
-            <a href="index.html" class="nav-link active">Overview</a>
-'''
+    with stage('index'):
+        index_html = template.render_index_page(readme_content, exported)
+        with open('site/index.html', 'w') as f:
+            f.write(index_html)
     
-    if exported:
-        index_html += '            <h3 style="margin-top: 30px;">📓 Notebooks</h3>\n'
-        for nb in sorted(exported):
-            nb_display = nb.replace('_', ' ').title()
-            index_html += f'            <a href="{nb}.html" class="nav-link">{nb_display}</a>\n'
+    print(f"Created index.html with {len(exported)} notebooks")
     
-    index_html += f'''
-        </div>
-        <div class="content">
-            <div class="content-container">
-                {readme_content}
-            </div>
-        </div>
-    </div>
-</body>
-</html>'''
+    with stage('navigation'):
+        write_navigation(exported, {notebook: obj['path'] for notebook, obj in to_export})
     
-    with open('site/index.html', 'w') as f:
-        f.write(index_html)
+    # Search covers the exported pages, indexed from the local notebook sources
+    with stage('search_index'):
+        build_search_index(notebook_sources(exported), 'site')
     
-    print(f"Created index.html with {len(exported)} notebooks")
+    # Minify the site unless SKIP_SITE_POSTPROCESS is set; SITE_PRECOMPRESS adds .gz/.br siblings
+    if postprocess_enabled():
+        with stage('postprocess'):
+            postprocess_site('site')
     return len(exported)
 
 if __name__ == '__main__':
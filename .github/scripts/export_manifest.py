@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Manifest of previously exported notebooks.
+For each notebook it records the workspace object_id and modified_at seen at
+export time, how it was exported ('html', or 'archive' for a page rendered
+from a folder's source archive, which has no cell outputs), the SHA-256 of
+the exported HTML, and a key describing the page written from it. Raw
+exports are kept by content hash so a page can be re-wrapped without
+calling the export API again.
+"""
+
+import os
+import json
+import tempfile
+
+DEFAULT_MANIFEST_PATH = '.cache/export_manifest.json'
+DEFAULT_EXPORTS_DIR = '.cache/exports'
+
+# Export modes whose cached exports a run in each mode can reuse: an HTML
+# export has everything an archive render has, plus the outputs
+REUSABLE_EXPORT_MODES = {
+    'html': {'html'},
+    'archive': {'archive', 'html'},
+}
+
+
+def _atomic_write(path, text):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class ExportManifest:
+    """JSON manifest of notebook name -> export and page metadata"""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH, exports_dir=DEFAULT_EXPORTS_DIR):
+        self.path = path
+        self.exports_dir = exports_dir
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f).get('notebooks', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def _raw_path(self, content_hash):
+        return os.path.join(self.exports_dir, f'{content_hash}.html')
+
+    def is_current(self, name, obj, export_mode='html'):
+        """True if the workspace object is unchanged since the last export
+        and that export can stand in for one made in `export_mode`"""
+        entry = self.entries.get(name)
+        return bool(
+            entry
+            and entry.get('export_mode') in REUSABLE_EXPORT_MODES[export_mode]
+            and entry.get('workspace_path') == obj['path']
+            and entry.get('object_id') == obj.get('object_id')
+            and entry.get('modified_at') == obj.get('modified_at')
+            and obj.get('modified_at')
+            and os.path.exists(self._raw_path(entry['content_hash']))
+        )
+
+    def page_is_current(self, name, page_key):
+        """True if the page and its assets on disk were written from the same inputs"""
+        entry = self.entries.get(name)
+        return bool(
+            entry
+            and entry.get('page_key') == page_key
+            and os.path.exists(entry.get('output_path', ''))
+            and all(os.path.exists(path) for path in entry.get('assets', []))
+        )
+
+    def content_hash(self, name):
+        return self.entries[name]['content_hash']
+
+    def export_path(self, name):
+        """Path of the cached raw export for a notebook"""
+        return self._raw_path(self.content_hash(name))
+
+    def staging_path(self, name):
+        """Temporary file a fresh export can be streamed into"""
+        os.makedirs(self.exports_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.exports_dir, prefix=f'{name}.', suffix='.tmp')
+        os.close(fd)
+        return path
+
+    def _record(self, name, obj, content_hash, export_mode):
+        entry = self.entries.setdefault(name, {})
+        entry.update({
+            'workspace_path': obj['path'],
+            'object_id': obj.get('object_id'),
+            'modified_at': obj.get('modified_at'),
+            'export_mode': export_mode,
+            'content_hash': content_hash,
+        })
+
+    def record_export_file(self, name, obj, staged_path, content_hash, export_mode='html'):
+        """Adopt a streamed export from `staged_path` as the cached raw export"""
+        raw_path = self._raw_path(content_hash)
+        if os.path.exists(raw_path):
+            os.remove(staged_path)
+        else:
+            os.replace(staged_path, raw_path)
+        self._record(name, obj, content_hash, export_mode)
+        return raw_path
+
+    def record_page(self, name, page_key, output_path, assets=()):
+        entry = self.entries.setdefault(name, {})
+        entry.update({'page_key': page_key, 'output_path': output_path, 'assets': list(assets)})
+
+    def retain(self, names):
+        """Forget notebooks that are no longer part of the site"""
+        names = set(names)
+        self.entries = {name: entry for name, entry in self.entries.items() if name in names}
+
+    def save(self):
+        """Write the manifest and drop raw exports no entry refers to"""
+        _atomic_write(self.path, json.dumps({'notebooks': self.entries}, indent=2, sort_keys=True))
+        referenced = {f"{entry['content_hash']}.html" for entry in self.entries.values()
+                      if 'content_hash' in entry}
+        if os.path.isdir(self.exports_dir):
+            for filename in os.listdir(self.exports_dir):
+                if filename.endswith(('.html', '.tmp')) and filename not in referenced:
+                    os.remove(os.path.join(self.exports_dir, filename))
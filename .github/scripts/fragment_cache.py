@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for rendered notebook fragments and cells.
+Entries are keyed by the SHA-256 of the source plus a version salt, so any
+change to the notebook or the converter produces a fresh entry.
+"""
+
+import os
+import hashlib
+import tempfile
+
+DEFAULT_CACHE_DIR = '.cache/notebook_fragments'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class FragmentCache:
+    """Directory of fragment files with a size cap and LRU eviction"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, salt=''):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.salt = salt.encode('utf-8')
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for_file(self, filepath):
+        """Hash the notebook source together with the version salt"""
+        digest = hashlib.sha256(self.salt)
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def key_for_text(self, text):
+        """Hash a piece of source text (e.g. one cell) together with the version salt"""
+        return hashlib.sha256(self.salt + b'\0' + text.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.html')
+
+    def get(self, key):
+        """Return the cached fragment for `key`, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                fragment = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        # Bump the mtime so eviction treats this entry as recently used
+        os.utime(path)
+        self.hits += 1
+        return fragment
+
+    def put(self, key, fragment):
+        """Store a fragment atomically"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(fragment)
+        os.replace(tmp_path, self._path(key))
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.html'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            evicted += 1
+        return evicted
+
+    def summary(self):
+        return f"Fragment cache: {self.hits} hits, {self.misses} misses"
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Build-time syntax highlighting for notebook code cells.
+Cells are highlighted with Pygments in the language named by their %magic
+(or the notebook's language when there is none), so the published pages need no highlighting
+JavaScript. Highlighted markup can be cached by cell content hash.
+"""
+
+import html
+
+import pygments
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+DEFAULT_CELL_CACHE_DIR = '.cache/highlighted_cells'
+PYGMENTS_STYLE = 'default'
+CSS_CLASS = 'highlight'
+
+# Databricks (%name) and Jupyter (%%name) cell magics and the Pygments
+# lexer used for their body
+MAGIC_LANGUAGES = {
+    'python': 'python',
+    'sql': 'sql',
+    'scala': 'scala',
+    'r': 'r',
+    'sh': 'bash',
+    'bash': 'bash',
+    'pip': 'bash',
+    'fs': 'bash',
+    'html': 'html',
+    'javascript': 'javascript',
+    'js': 'javascript',
+}
+DEFAULT_LANGUAGE = 'python'
+
+_FORMATTER = HtmlFormatter(nowrap=True)
+_LEXERS = {}
+
+
+def _lexer(language):
+    if language not in _LEXERS:
+        try:
+            _LEXERS[language] = get_lexer_by_name(language, stripnl=False, ensurenl=False)
+        except ClassNotFound:
+            _LEXERS[language] = get_lexer_by_name('text', stripnl=False, ensurenl=False)
+    return _LEXERS[language]
+
+
+def strip_magic_prefix(line):
+    """A '# MAGIC' line of a Databricks cell without that prefix; other lines as they are"""
+    if line.startswith('# MAGIC '):
+        return line[8:]
+    if line.startswith('# MAGIC'):
+        return line[7:]
+    return line
+
+
+def split_magic(code, language=DEFAULT_LANGUAGE):
+    """Split a code cell into (magic, language, source)
+
+    For a Databricks cell starting with '# MAGIC %<name>' the MAGIC prefixes
+    are removed, `magic` is '%<name>' and `source` is the rest of the cell
+    starting with any arguments on the magic line. Jupyter '%%<name>' cell
+    magics are split the same way. Other cells return ('', language, code).
+    """
+    if code.startswith('# MAGIC %'):
+        first, newline, rest = code.partition('\n')
+        magic, _, arguments = strip_magic_prefix(first).partition(' ')
+        body = '\n'.join(strip_magic_prefix(line) for line in rest.split('\n'))
+    elif code.startswith('%%'):
+        first, newline, body = code.partition('\n')
+        magic, _, arguments = first.partition(' ')
+    else:
+        return '', language, code
+    language = MAGIC_LANGUAGES.get(magic.lstrip('%').lower(), 'text')
+    return magic, language, arguments + newline + body
+
+
+def highlight_cell(code, language=DEFAULT_LANGUAGE):
+    """Highlighted HTML for one code cell in `language` unless a magic overrides it"""
+    magic, language, source = split_magic(code, language)
+    spans = highlight(source, _lexer(language), _FORMATTER) if source else ''
+    if spans.endswith('\n') and not source.endswith('\n'):
+        spans = spans[:-1]
+    if magic:
+        separator = '' if source.startswith('\n') or not source else ' '
+        spans = f'<span class="gp">{html.escape(magic)}</span>{separator}{spans}'
+    return (f'<div class="{CSS_CLASS} hl-{language}">\n'
+            f'<pre><code class="language-{language}">{spans}</code></pre>\n'
+            f'</div>')
+
+
+def highlight_css():
+    """Stylesheet for the token classes emitted by highlight_cell"""
+    return HtmlFormatter(style=PYGMENTS_STYLE).get_style_defs(f'.{CSS_CLASS}')
+
+
+def highlight_salt():
+    """Versions that change highlighted output, for cache keys"""
+    return f"pygments-{pygments.__version__}|{PYGMENTS_STYLE}"
+
+
+class CellHighlighter:
+    """Highlight cells, reusing cached markup for cells seen before"""
+
+    def __init__(self, cache=None):
+        self.cache = cache
+
+    def __call__(self, code, language=DEFAULT_LANGUAGE):
+        if self.cache is None:
+            return highlight_cell(code, language)
+        key = self.cache.key_for_text(f'{language}\0{code}')
+        cell_html = self.cache.get(key)
+        if cell_html is None:
+            cell_html = highlight_cell(code, language)
+            self.cache.put(key, cell_html)
+        return cell_html
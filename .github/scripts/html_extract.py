@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Single-pass extraction of <style> and <body> positions from exported HTML.
+A small tokenizer walks the document once in chunks, understanding comments,
+quoted attribute values and script/style raw text, so markup that merely
+appears inside a script string or a comment is never mistaken for a tag.
+It reports byte offsets; callers copy the ranges they need straight from
+the source file.
+"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from stream_utils import CHUNK_SIZE
+
+# Enough lookahead to classify any tag we care about ('</script' is longest)
+LOOKAHEAD = 16
+
+_TAG_NAME = re.compile(rb'</?([A-Za-z][A-Za-z0-9-]*)')
+_QUOTE_OR_END = re.compile(rb'["\'>]')
+_RAW_TEXT_END = {
+    b'script': re.compile(rb'</script', re.IGNORECASE),
+    b'style': re.compile(rb'</style', re.IGNORECASE),
+}
+
+# Tokenizer states
+_TEXT = 0
+_TAG = 1
+_COMMENT = 2
+_RAW_TEXT = 3
+
+
+def _follows_equals(buf, i):
+    """True if the byte before position i, ignoring whitespace, is '='"""
+    i -= 1
+    while i >= 0 and buf[i] in b' \t\r\n\f':
+        i -= 1
+    return i < 0 or buf[i] == 0x3D
+
+
+class HTMLExtract(NamedTuple):
+    """Byte ranges of the style element contents and of the body content"""
+    styles: List[Tuple[int, int]]
+    body: Optional[Tuple[int, int]]
+    size: int
+
+
+def scan_html(f, chunk_size=CHUNK_SIZE):
+    """Tokenize a binary file once and locate styles and the body"""
+    styles = []
+    body_start = body_end = None
+
+    buf = b''
+    base = 0            # file offset of buf[0]
+    pos = 0             # scan position within buf
+    state = _TEXT
+    tag_name = b''      # lowercased name of the tag being read in _TAG
+    closing = False     # whether that tag is an end tag
+    quote = None        # open attribute quote inside a tag
+    raw_name = b''      # element whose raw text is being skipped
+    raw_start = 0
+    eof = False
+
+    while True:
+        if state == _TEXT:
+            i = buf.find(b'<', pos)
+            if i < 0:
+                pos = len(buf)
+            elif len(buf) - i < LOOKAHEAD and not eof:
+                pos = i
+            else:
+                if buf.startswith(b'<!--', i):
+                    state, pos = _COMMENT, i + 4
+                    continue
+                match = _TAG_NAME.match(buf, i)
+                if match:
+                    tag_name = match.group(1).lower()
+                    closing = buf[i + 1:i + 2] == b'/'
+                    if closing and tag_name == b'body' and body_start is not None and body_end is None:
+                        body_end = base + i
+                    state, quote, pos = _TAG, None, match.end()
+                elif buf[i + 1:i + 2] in (b'!', b'?', b'/'):
+                    # Declarations, processing instructions and bogus end tags
+                    tag_name, closing = b'', True
+                    state, quote, pos = _TAG, None, i + 2
+                else:
+                    pos = i + 1
+                continue
+
+        elif state == _TAG:
+            if quote is not None:
+                j = buf.find(quote, pos)
+                if j < 0:
+                    pos = len(buf)
+                else:
+                    quote, pos = None, j + 1
+                    continue
+            else:
+                match = _QUOTE_OR_END.search(buf, pos)
+                if match is None:
+                    pos = len(buf)
+                elif match.group() != b'>':
+                    # Quotes only delimit attribute values, i.e. after '='
+                    if _follows_equals(buf, match.start()):
+                        quote = match.group()
+                    pos = match.end()
+                    continue
+                else:
+                    pos = match.end()
+                    state = _TEXT
+                    if not closing:
+                        if tag_name == b'body' and body_start is None:
+                            body_start = base + pos
+                        elif tag_name in _RAW_TEXT_END:
+                            state, raw_name, raw_start = _RAW_TEXT, tag_name, base + pos
+                    continue
+
+        elif state == _COMMENT:
+            j = buf.find(b'-->', pos)
+            if j < 0:
+                pos = max(pos, len(buf) - 2)
+            else:
+                state, pos = _TEXT, j + 3
+                continue
+
+        elif state == _RAW_TEXT:
+            match = _RAW_TEXT_END[raw_name].search(buf, pos)
+            if match is None:
+                pos = max(pos, len(buf) - len(raw_name) - 1)
+            else:
+                if raw_name == b'style':
+                    styles.append((raw_start, base + match.start()))
+                tag_name, closing = raw_name, True
+                state, quote, pos = _TAG, None, match.end()
+                continue
+
+        # Everything before pos is consumed; refill the buffer
+        if eof:
+            break
+        buf = buf[pos:]
+        base += pos
+        pos = 0
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf += chunk
+
+    size = base + len(buf)
+    body = None
+    if body_start is not None:
+        body = (body_start, body_end if body_end is not None else size)
+    return HTMLExtract(styles, body, size)
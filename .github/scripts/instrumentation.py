@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Timers and byte counters for the publish pipeline.
+Code marks its stages with `with stage('name', notebook) as span:`; while
+no recorder is enabled this returns a shared no-op span, so instrumented
+code pays a function call per stage and nothing else. With --timings a
+summary of the slowest stages and notebooks is printed at the end of the
+run; --profile also writes a cProfile dump and a Chrome trace-event JSON
+(open it in chrome://tracing or https://ui.perfetto.dev). cProfile only
+sees the thread it was enabled on, so pipeline workers profile their own
+work and the dump merges those profiles with the main thread's; its times
+add up across workers and can exceed the wall clock.
+"""
+
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+
+DEFAULT_PROFILE_DIR = 'profile'
+SUMMARY_ROWS = 10
+
+
+class Record(NamedTuple):
+    """One timed stage; `start` is None for parts aggregated inside a span"""
+    name: str
+    notebook: Optional[str]
+    start: Optional[float]
+    duration: float
+    nbytes: int
+    pid: int
+    tid: int
+    args: Optional[dict] = None
+
+
+class _NullSpan:
+    """Stands in for a Span while instrumentation is off"""
+    enabled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_bytes(self, nbytes):
+        pass
+
+    def part(self, name):
+        return self
+
+    def add_part(self, name, seconds):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Part:
+    __slots__ = ('span', 'name', 'start')
+
+    def __init__(self, span, name):
+        self.span = span
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.span.add_part(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Span:
+    """A stage being timed; parts (e.g. per-cell work) are summed into it and
+    reported as 'stage/part' rows rather than separate trace events"""
+    enabled = True
+
+    def __init__(self, recorder, name, notebook, nbytes):
+        self.recorder = recorder
+        self.name = name
+        self.notebook = notebook
+        self.nbytes = nbytes
+        self.parts = {}
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        duration = time.perf_counter() - self.start
+        args = {f'{part}_ms': round(seconds * 1000, 3) for part, seconds in self.parts.items()}
+        if exc_type is not None:
+            args['error'] = exc_type.__name__
+        self.recorder.add(Record(self.name, self.notebook, self.start, duration, self.nbytes,
+                                 os.getpid(), threading.get_ident(), args or None))
+        for part, seconds in self.parts.items():
+            self.recorder.add(Record(f'{self.name}/{part}', self.notebook, None, seconds, 0,
+                                     os.getpid(), threading.get_ident()))
+        return False
+
+    def add_bytes(self, nbytes):
+        self.nbytes += nbytes
+
+    def part(self, name):
+        return _Part(self, name)
+
+    def add_part(self, name, seconds):
+        self.parts[name] = self.parts.get(name, 0.0) + seconds
+
+
+class _WorkerStats:
+    """cProfile stats from a worker thread or process, in the form pstats loads"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class Recorder:
+    """Collects stage records from this process, its threads and merged workers"""
+
+    def __init__(self, profile=False):
+        self.records = []   # list.append is atomic, so threads need no lock
+        self.profile = profile
+        self.profiles = []   # raw cProfile stats of worker threads and processes
+        self.started = time.perf_counter()
+
+    def add(self, record):
+        self.records.append(record)
+
+    def merge(self, records, profiles=()):
+        self.records.extend(Record(*record) for record in records)
+        self.profiles.extend(profiles)
+
+    def profiler(self):
+        """A cProfile.Profile for one worker thread with --profile, else None"""
+        return cProfile.Profile() if self.profile else None
+
+    def add_profile(self, profiler):
+        """Keep a worker's profile for the dump"""
+        profiler.create_stats()
+        self.profiles.append(profiler.stats)
+
+    def write_profile(self, path, profiler):
+        """Dump `profiler`'s stats merged with every worker profile"""
+        stats = pstats.Stats(profiler)
+        for worker_stats in self.profiles:
+            stats.add(_WorkerStats(worker_stats))
+        stats.dump_stats(path)
+
+    def stage_totals(self):
+        """name -> [calls, seconds, bytes, slowest call]"""
+        totals = defaultdict(lambda: [0, 0.0, 0, 0.0])
+        for record in self.records:
+            total = totals[record.name]
+            total[0] += 1
+            total[1] += record.duration
+            total[2] += record.nbytes
+            total[3] = max(total[3], record.duration)
+        return totals
+
+    def notebook_totals(self):
+        """notebook -> {stage: seconds}, top-level stages only"""
+        totals = defaultdict(lambda: defaultdict(float))
+        for record in self.records:
+            if record.notebook is not None and record.start is not None:
+                totals[record.notebook][record.name] += record.duration
+        return totals
+
+    def summary(self, rows=SUMMARY_ROWS):
+        """Stage and slowest-notebook tables as text
+
+        A row named 'stage/part' is the time spent on that part within the
+        stage, so it is already included in the stage's own row.
+        """
+        elapsed = time.perf_counter() - self.started
+        lines = [f"Instrumented run: {elapsed:.2f}s wall clock, {len(self.records)} records"]
+        stages = sorted(self.stage_totals().items(), key=lambda item: item[1][1], reverse=True)
+        width = max([len(name) for name, _ in stages] + [12])
+        lines.append(f"{'stage':<{width}} {'calls':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9} "
+                     f"{'MB':>9} {'MB/s':>8}")
+        for name, (calls, seconds, nbytes, slowest) in stages:
+            rate = f'{nbytes / 1024 / 1024 / seconds:8.1f}' if nbytes and seconds else f'{"-":>8}'
+            size = f'{nbytes / 1024 / 1024:9.1f}' if nbytes else f'{"-":>9}'
+            lines.append(f"{name:<{width}} {calls:>7} {seconds:>9.2f} {seconds / calls * 1000:>9.1f} "
+                         f"{slowest * 1000:>9.1f} {size} {rate}")
+
+        notebooks = sorted(self.notebook_totals().items(), key=lambda item: sum(item[1].values()),
+                           reverse=True)[:rows]
+        if notebooks:
+            width = max(len(name) for name, _ in notebooks)
+            lines.append('')
+            lines.append(f"{'slowest notebooks':<{width}} {'total s':>9}  stages")
+            for name, by_stage in notebooks:
+                top = sorted(by_stage.items(), key=lambda item: item[1], reverse=True)[:3]
+                breakdown = ', '.join(f'{stage} {seconds:.2f}s' for stage, seconds in top)
+                lines.append(f"{name:<{width}} {sum(by_stage.values()):>9.2f}  {breakdown}")
+        return '\n'.join(lines)
+
+    def trace_events(self, process_name):
+        """Records as Chrome trace events, in microseconds from the start of the run"""
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': process_name}}]
+        for record in self.records:
+            if record.start is None:
+                continue
+            args = dict(record.args or {})
+            if record.notebook is not None:
+                args['notebook'] = record.notebook
+            if record.nbytes:
+                args['bytes'] = record.nbytes
+            events.append({
+                'name': record.name,
+                'cat': record.name.split('.')[0],
+                'ph': 'X',
+                'ts': round((record.start - self.started) * 1e6, 1),
+                'dur': round(record.duration * 1e6, 1),
+                'pid': record.pid,
+                'tid': record.tid,
+                'args': args,
+            })
+        return events
+
+    def write_trace(self, path, process_name='publish'):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(process_name), 'displayTimeUnit': 'ms'}, f)
+
+
+_recorder = None
+
+
+def active():
+    """The enabled Recorder, or None"""
+    return _recorder
+
+
+def enable(profile=False):
+    """Start recording into a fresh Recorder (also used in worker processes)"""
+    global _recorder
+    _recorder = Recorder(profile)
+    return _recorder
+
+
+def disable():
+    """Stop recording; returns the Recorder that was active"""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder
+
+
+def stage(name, notebook=None, nbytes=0):
+    """Context manager timing one stage, optionally for one notebook"""
+    if _recorder is None:
+        return NULL_SPAN
+    return Span(_recorder, name, notebook, nbytes)
+
+
+@contextmanager
+def profiling(profiler):
+    """Run the enclosed code under `profiler` (one per thread) unless it is None"""
+    if profiler is None:
+        yield
+        return
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+
+def add_arguments(parser):
+    """Add --timings, --profile and --profile-dir to an argparse parser"""
+    parser.add_argument('--timings', action='store_true',
+                        help='Print per-stage and per-notebook timings at the end of the run')
+    parser.add_argument('--profile', action='store_true',
+                        help='Also write a cProfile dump and a Chrome trace (implies --timings)')
+    parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR,
+                        help=f'Where --profile writes its files (default: {DEFAULT_PROFILE_DIR})')
+
+
+@contextmanager
+def instrumented(run_name, timings=False, profile=False, profile_dir=DEFAULT_PROFILE_DIR):
+    """Record the enclosed run if asked to, then print the summary and write profiles
+
+    Writes <profile_dir>/<run_name>.prof and <run_name>.trace.json with --profile.
+    """
+    if not (timings or profile):
+        yield None
+        return
+    recorder = enable(profile)
+    profiler = cProfile.Profile() if profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield recorder
+    finally:
+        if profiler:
+            profiler.disable()
+        disable()
+        print(recorder.summary())
+        if profiler:
+            os.makedirs(profile_dir, exist_ok=True)
+            prof_path = os.path.join(profile_dir, f'{run_name}.prof')
+            trace_path = os.path.join(profile_dir, f'{run_name}.trace.json')
+            recorder.write_profile(prof_path, profiler)
+            recorder.write_trace(trace_path, run_name)
+            print(f"Wrote {prof_path} (python -m pstats) and {trace_path} (chrome://tracing)")
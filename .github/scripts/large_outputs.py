@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Keep exported notebook pages small without dropping any output.
+While a notebook body is copied into its page, inline base64 images are
+decoded to content-hashed files under site/assets/images/ (shared by every
+notebook that embeds the same image), every <img> gets loading="lazy", and
+text outputs over a size limit are cut to a preview that links to the full
+output, written to site/assets/outputs/. The body is read from a buffer
+(normally an mmap of the export) and written out in ranges, so large
+outputs are never copied into Python strings.
+"""
+
+import os
+import re
+import mmap
+import base64
+import hashlib
+import tempfile
+from typing import NamedTuple
+
+from stream_utils import CHUNK_SIZE
+
+IMAGES_DIR = 'assets/images'
+OUTPUTS_DIR = 'assets/outputs'
+
+IMAGE_EXTENSIONS = {
+    b'image/png': 'png',
+    b'image/jpeg': 'jpg',
+    b'image/jpg': 'jpg',
+    b'image/gif': 'gif',
+    b'image/webp': 'webp',
+    b'image/svg+xml': 'svg',
+}
+
+# <pre> elements with one of these classes hold cell output rather than code
+TEXT_OUTPUT_CLASSES = {b'ansiout', b'output_text', b'output_stream', b'output_stdout', b'output_stderr'}
+
+
+class OutputLimits(NamedTuple):
+    """Thresholds for the output pass; a limit of 0 turns that step off"""
+    # Inline images with at least this many bytes of base64 are moved to files
+    inline_image_bytes: int = 2 * 1024
+    # Text outputs longer than this are truncated...
+    text_output_bytes: int = 64 * 1024
+    # ...to a preview of about this many bytes
+    text_preview_bytes: int = 16 * 1024
+    lazy_images: bool = True
+
+
+def limits_from_env(environ=os.environ):
+    """OutputLimits overridden by SITE_INLINE_IMAGE_BYTES, SITE_TEXT_OUTPUT_BYTES,
+    SITE_TEXT_PREVIEW_BYTES and SITE_LAZY_IMAGES"""
+    defaults = OutputLimits()
+    return OutputLimits(
+        inline_image_bytes=int(environ.get('SITE_INLINE_IMAGE_BYTES', defaults.inline_image_bytes)),
+        text_output_bytes=int(environ.get('SITE_TEXT_OUTPUT_BYTES', defaults.text_output_bytes)),
+        text_preview_bytes=int(environ.get('SITE_TEXT_PREVIEW_BYTES', defaults.text_preview_bytes)),
+        lazy_images=environ.get('SITE_LAZY_IMAGES', '1').lower() not in ('0', 'false', 'no'),
+    )
+
+
+# Elements the pass rewrites, plus the ones whose contents must be skipped
+_ELEMENT = re.compile(rb'<!--|<(img|pre|script|style)\b', re.IGNORECASE)
+_RAW_TEXT_END = {
+    b'script': re.compile(rb'</script', re.IGNORECASE),
+    b'style': re.compile(rb'</style', re.IGNORECASE),
+}
+_PRE_END = re.compile(rb'</pre', re.IGNORECASE)
+# One attribute inside a start tag; values are located by span, never copied.
+# A '/' that does not end the tag is skipped like whitespace, as browsers do
+_ATTRIBUTE = re.compile(rb'''[\s/]*([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?''')
+_TAG_END = re.compile(rb'[\s/]*>')
+_DATA_URI = re.compile(rb'data:(image/[\w.+-]+);base64,', re.IGNORECASE)
+_BASE64_WHITESPACE = b' \t\r\n\f'
+# Pages of a mapped export are handed back to the OS once this much has been written out
+_RELEASE_BYTES = 8 * 1024 * 1024
+
+
+def _parse_tag(buf, pos, end):
+    """Parse the attributes of a start tag from `pos`; returns ({name: (start, end)}, tag end)"""
+    attributes = {}
+    while pos < end:
+        closing = _TAG_END.match(buf, pos, end)
+        if closing:
+            return attributes, closing.end()
+        match = _ATTRIBUTE.match(buf, pos, end)
+        if not match or match.end() == pos:
+            break
+        group = next((g for g in (2, 3, 4) if match.start(g) >= 0), None)
+        span = match.span(group) if group else (match.end(), match.end())
+        attributes.setdefault(match.group(1).lower(), span)
+        pos = match.end()
+    return None, pos
+
+
+def _write_hashed(site_dir, directory, ext, write):
+    """Write through `write(file, digest)` to a temp file, then move it to a
+    content-hashed name; returns the site-relative href"""
+    target_dir = os.path.join(site_dir, directory)
+    os.makedirs(target_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=target_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f, digest)
+        href = f'{directory}/{digest.hexdigest()[:16]}.{ext}'
+        path = os.path.join(site_dir, href)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return href
+
+
+def _decode_base64(view, start, end, out, digest):
+    """Decode base64 bytes [start, end) of `view` into `out` in chunks"""
+    pending = b''
+    for pos in range(start, end, CHUNK_SIZE):
+        pending += bytes(view[pos:min(pos + CHUNK_SIZE, end)]).translate(None, _BASE64_WHITESPACE)
+        usable = len(pending) - len(pending) % 4
+        decoded = base64.b64decode(pending[:usable], validate=True)
+        digest.update(decoded)
+        out.write(decoded)
+        pending = pending[usable:]
+    if pending:
+        decoded = base64.b64decode(pending + b'=' * (-len(pending) % 4), validate=True)
+        digest.update(decoded)
+        out.write(decoded)
+
+
+def _copy_view(view, start, end, out, digest=None):
+    for pos in range(start, end, CHUNK_SIZE):
+        chunk = view[pos:min(pos + CHUNK_SIZE, end)]
+        if digest is not None:
+            digest.update(chunk)
+        out.write(chunk)
+
+
+def _preview_end(buf, start, end, preview):
+    """Where to cut a text output: the last line break in the preview, else a
+    point that does not split a tag, an entity or a UTF-8 sequence"""
+    limit = min(start + preview, end)
+    newline = buf.rfind(b'\n', start, limit)
+    if newline > start:
+        return newline + 1
+    cut = limit
+    tag = buf.rfind(b'<', start, cut)
+    if tag >= 0 and buf.rfind(b'>', tag, cut) < 0:
+        cut = tag
+    entity = buf.rfind(b'&', start, cut)
+    if entity >= 0 and buf.rfind(b';', entity, cut) < 0:
+        cut = entity
+    while cut > start and buf[cut] & 0xC0 == 0x80:
+        cut -= 1
+    return cut
+
+
+def _format_size(size):
+    return f'{size / 1024 / 1024:.1f} MB' if size >= 1024 * 1024 else f'{size / 1024:.0f} KB'
+
+
+class OutputRewriter:
+    """Copies notebook bodies into pages, moving large outputs to site assets"""
+
+    def __init__(self, site_dir, limits=None):
+        self.site_dir = site_dir
+        self.limits = limits or OutputLimits()
+
+    def copy_body(self, buf, start, end, out):
+        """Write bytes [start, end) of `buf` to `out` with outputs rewritten
+
+        Returns the site-relative hrefs of the assets the body now links to.
+        """
+        assets = []
+        with memoryview(buf) as view:
+            self._copy_body(buf, view, start, end, out, assets)
+        return assets
+
+    def _copy_body(self, buf, view, start, end, out, assets):
+        copied = start
+        pos = start
+        # Without this, every page of a mapped export stays resident until it is closed
+        can_release = hasattr(buf, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+        released = start - start % mmap.PAGESIZE
+        while True:
+            if pos - copied >= CHUNK_SIZE:
+                _copy_view(view, copied, pos, out)
+                copied = pos
+            if can_release and copied - released >= _RELEASE_BYTES:
+                boundary = copied - copied % mmap.PAGESIZE
+                buf.madvise(mmap.MADV_DONTNEED, released, boundary - released)
+                released = boundary
+            match = _ELEMENT.search(buf, pos, end)
+            if not match:
+                break
+            name = (match.group(1) or b'').lower()
+            if not name:
+                comment_end = buf.find(b'-->', match.end(), end)
+                pos = end if comment_end < 0 else comment_end + 3
+                continue
+            attributes, tag_end = _parse_tag(buf, match.end(), end)
+            if attributes is None:
+                pos = tag_end
+                continue
+            if name in _RAW_TEXT_END:
+                raw_end = _RAW_TEXT_END[name].search(buf, tag_end, end)
+                pos = end if raw_end is None else raw_end.end()
+            elif name == b'img':
+                _copy_view(view, copied, match.start(), out)
+                self._write_img(buf, view, match.start(), tag_end, attributes, out, assets)
+                copied = pos = tag_end
+            else:
+                pre_end = _PRE_END.search(buf, tag_end, end)
+                content_end = end if pre_end is None else pre_end.start()
+                if self._is_large_output(buf, attributes, tag_end, content_end):
+                    _copy_view(view, copied, tag_end, out)
+                    self._write_truncated(buf, view, tag_end, content_end, attributes, out, assets)
+                    copied = content_end
+                pos = content_end
+        _copy_view(view, copied, end, out)
+
+    def _write_img(self, buf, view, tag_start, tag_end, attributes, out, assets):
+        """Write an <img> tag, with an inline image replaced by an asset link"""
+        limits = self.limits
+        src = attributes.get(b'src')
+        href = None
+        if src and limits.inline_image_bytes:
+            uri = _DATA_URI.match(buf, src[0], src[1])
+            ext = uri and IMAGE_EXTENSIONS.get(uri.group(1).lower())
+            if ext and src[1] - uri.end() >= limits.inline_image_bytes:
+                try:
+                    href = _write_hashed(self.site_dir, IMAGES_DIR, ext,
+                                         lambda f, digest: _decode_base64(view, uri.end(), src[1], f, digest))
+                    assets.append(href)
+                except ValueError as e:
+                    # Leave malformed data inline rather than lose the image
+                    print(f"Could not externalize inline image: {e}")
+        if href:
+            out.write(buf[tag_start:src[0]])
+            out.write(href.encode('utf-8'))
+            cursor = src[1]
+        else:
+            cursor = tag_start
+        if limits.lazy_images and b'loading' not in attributes:
+            # Before any '/' and whitespace that close the tag, but after the
+            # last attribute: an unquoted value may end in '/'
+            close = tag_end - 1
+            last = max([cursor] + [span[1] for span in attributes.values()])
+            while close > last and buf[close - 1:close] in b'/ \t\r\n\f':
+                close -= 1
+            _copy_view(view, cursor, close, out)
+            out.write(b' loading="lazy"')
+            cursor = close
+        _copy_view(view, cursor, tag_end, out)
+
+    def _is_large_output(self, buf, attributes, start, end):
+        limit = self.limits.text_output_bytes
+        if not limit or end - start <= limit:
+            return False
+        span = attributes.get(b'class')
+        return bool(span) and not TEXT_OUTPUT_CLASSES.isdisjoint(buf[span[0]:span[1]].lower().split())
+
+    def _write_truncated(self, buf, view, start, end, attributes, out, assets):
+        """Write a preview of a text output followed by a link to all of it"""
+        span = attributes[b'class']
+        css_class = bytes(buf[span[0]:span[1]])
+
+        def write_full(f, digest):
+            digest.update(css_class + b'\0')
+            f.write(b'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>Full output</title>\n'
+                    b'</head>\n<body>\n<pre class="' + css_class + b'">')
+            _copy_view(view, start, end, f, digest)
+            f.write(b'</pre>\n</body>\n</html>\n')
+
+        href = _write_hashed(self.site_dir, OUTPUTS_DIR, 'html', write_full)
+        assets.append(href)
+        cut = _preview_end(buf, start, end, self.limits.text_preview_bytes)
+        _copy_view(view, start, cut, out)
+        out.write(f'\n<a class="output-more" href="{href}" target="_blank" rel="noopener">'
+                  f'Output truncated at {_format_size(cut - start)} of {_format_size(end - start)}. '
+                  f'Show full output</a>\n'.encode('utf-8'))
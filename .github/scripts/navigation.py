@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Notebook navigation, built once per build and rendered in the browser.
+Rather than every page carrying a link to every other notebook (quadratic
+in the number of notebooks), the notebook list is a JSON tree grouped by
+the folder each notebook lives in. It is written once to site/nav.json (the
+single-page site carries it in its manifest), and a small shared script
+renders it into the sidebar placeholder of each page. Pages therefore do
+not change when notebooks are added or removed, and nav.json itself is only
+rewritten when the tree does.
+"""
+
+import os
+import json
+import posixpath
+
+from site_templates import SITE_DIR, NAV_INDEX, display_name, write_hashed_asset
+
+
+def notebook_group(path, root):
+    """Folder of `path` relative to `root` ('' at the top), in / form"""
+    relative = posixpath.relpath(posixpath.dirname(path.replace(os.sep, '/')), root.replace(os.sep, '/'))
+    return '' if relative in ('.', '') or relative.startswith('..') else relative
+
+
+def build_nav_tree(entries):
+    """Nest (id, title, group) entries into {'notebooks': [[id, title]], 'groups': [...]}
+
+    Each group is {'title', 'notebooks', 'groups'}; groups and notebooks are
+    sorted by name, so the tree only depends on which notebooks exist.
+    """
+    root = {'notebooks': [], 'groups': {}}
+    for notebook_id, title, group in sorted(entries, key=lambda entry: (entry[2], entry[0])):
+        node = root
+        for part in filter(None, group.split('/')):
+            node = node['groups'].setdefault(part, {'notebooks': [], 'groups': {}})
+        node['notebooks'].append([notebook_id, title])
+    return _finish_group(root)
+
+
+def _finish_group(node, name=None):
+    group = {'notebooks': node['notebooks'],
+             'groups': [_finish_group(child, part) for part, child in sorted(node['groups'].items())]}
+    if name is not None:
+        group = {'title': display_name(name), **group}
+    return group
+
+
+def write_nav(site_dir, tree):
+    """Write nav.json unless it already holds this tree; returns whether it was written"""
+    text = json.dumps({'version': 1, 'tree': tree}, ensure_ascii=False, separators=(',', ':'))
+    path = os.path.join(site_dir, NAV_INDEX)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return True
+
+
+def write_nav_script(site_dir=SITE_DIR):
+    """Write the navigation script as a hashed asset; returns its href"""
+    return write_hashed_asset(site_dir, 'nav', NAV_SCRIPT, ext='js')
+
+
+# SiteNav.render() turns a nav tree into links (groups as <details>, the
+# current notebook's groups open); pages with a [data-nav] element get it
+# filled from nav.json on load.
+NAV_SCRIPT = '''(function () {
+    function renderTree(tree, options) {
+        const fragment = document.createDocumentFragment();
+        let current = false;
+        (tree.notebooks || []).forEach(([id, title]) => {
+            const link = document.createElement('a');
+            link.className = 'nav-link' + (id === options.current ? ' active' : '');
+            link.href = options.link.replace('{id}', encodeURIComponent(id));
+            link.dataset.section = id;
+            link.textContent = (options.prefix || '') + title;
+            fragment.appendChild(link);
+            current = current || id === options.current;
+        });
+        (tree.groups || []).forEach(group => {
+            const details = document.createElement('details');
+            const summary = document.createElement('summary');
+            summary.textContent = group.title;
+            details.appendChild(summary);
+            const inner = renderTree(group, options);
+            details.appendChild(inner.fragment);
+            details.open = inner.current;
+            current = current || inner.current;
+            fragment.appendChild(details);
+        });
+        return {fragment, current};
+    }
+
+    function render(container, tree, options) {
+        container.appendChild(renderTree(tree, options).fragment);
+    }
+
+    function openTo(link) {
+        for (let group = link.closest('details'); group; group = group.parentElement.closest('details')) {
+            group.open = true;
+        }
+    }
+
+    globalThis.SiteNav = {render, openTo};
+    if (typeof document === 'undefined') {
+        return;
+    }
+    const nav = document.querySelector('[data-nav]');
+    if (!nav) {
+        return;
+    }
+    fetch(nav.dataset.nav)
+        .then(response => response.json())
+        .then(data => {
+            render(nav, data.tree, {link: nav.dataset.navLink, current: nav.dataset.current});
+            const active = nav.querySelector('.nav-link.active');
+            if (active) {
+                active.scrollIntoView({block: 'nearest'});
+            }
+        })
+        .catch(() => {});
+})();
+'''
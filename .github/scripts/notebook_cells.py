@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Compact cell model for Databricks .py notebooks.
+The source is memory-mapped and scanned once for cell boundaries. Each cell
+is kept as its kind, language and byte offsets in a few parallel arrays
+(34 bytes per cell, however long the cell is), and its text is only decoded
+when it is asked for. Scanning a corpus for cell counts, titles,
+languages or per-cell hashes therefore copies no cell text at all, and
+rendering holds one cell's text at a time.
+
+text(i) and title(i) return exactly what the line-by-line parser it
+replaced (iter_notebook_cells() in benchmarks/bench_parser.py) reads from
+the same file.
+"""
+
+import os
+import mmap
+import hashlib
+from array import array
+from contextlib import contextmanager
+
+from highlight import DEFAULT_LANGUAGE, split_magic, strip_magic_prefix
+
+MARKDOWN = 0
+CODE = 1
+KINDS = ('markdown', 'code')
+
+_HEADER = b'# Databricks notebook source'
+_SEPARATOR = b'# COMMAND ----------'
+_TITLE = b'# DBTITLE'
+_MARKDOWN_START = b'# MAGIC %md'
+# Code cells starting with these may name their language with a magic
+_MAGIC_STARTS = (b'# MAGIC %', b'%%')
+# Trailing whitespace allowed on the header and separator lines
+_BLANK = b' \t\r\f\v'
+
+
+def _markdown_line(line):
+    """A markdown cell line without its MAGIC prefix, or None for lines outside the cell"""
+    if line.startswith('# MAGIC %md'):
+        return line[11:].strip()
+    if line.startswith('# MAGIC'):
+        return strip_magic_prefix(line)
+    return None
+
+
+def _has_content(line):
+    """Whether a line is more than whitespace (as str.strip() sees it)"""
+    if line.isascii():
+        return bool(line.strip())
+    return bool(line.decode('utf-8', 'replace').strip())
+
+
+def _decode(data):
+    # Same newlines as reading the file in text mode
+    text = data.decode('utf-8')
+    return text.replace('\r\n', '\n').replace('\r', '\n') if '\r' in text else text
+
+
+class NotebookCells:
+    """Cells of a .py notebook as offsets into `data` (bytes, or an mmap of the file)
+
+    Cell i spans data[starts[i]:ends[i]] from its first line of content to
+    the next command separator; titles are kept as the offsets of their
+    # DBTITLE line.
+    """
+    __slots__ = ('data', 'kinds', 'languages', 'starts', 'ends', 'title_starts', 'title_ends', '_language_names')
+
+    def __init__(self, data):
+        self.data = data
+        self.kinds = bytearray()
+        self.languages = bytearray()   # index into _language_names
+        self.starts = array('q')
+        self.ends = array('q')
+        self.title_starts = array('q')   # -1 when the cell has no title
+        self.title_ends = array('q')
+        self._language_names = []
+        self._scan()
+
+    @classmethod
+    @contextmanager
+    def open(cls, filepath):
+        """Map `filepath` and index its cells; the mapping is closed on exit"""
+        with open(filepath, 'rb') as f:
+            with cls.map(f) as cells:
+                yield cells
+
+    @classmethod
+    @contextmanager
+    def map(cls, f):
+        """Index the cells of open file `f` (text or binary) through a read-only mapping"""
+        if os.fstat(f.fileno()).st_size == 0:
+            yield cls(b'')
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield cls(data)
+
+    def _line_end(self, pos):
+        end = self.data.find(b'\n', pos)
+        return len(self.data) if end < 0 else end
+
+    def _is_marker_line(self, pos, marker):
+        """Whether the line at `pos` is `marker` followed by nothing but whitespace"""
+        data = self.data
+        return (data[pos:pos + len(marker)] == marker
+                and not data[pos + len(marker):self._line_end(pos)].strip(_BLANK))
+
+    def _scan(self):
+        # Literal searches run at memchr speed over the mapping; only the
+        # few lines around each match are copied out
+        data = self.data
+        start = self._line_end(0) + 1 if self._is_marker_line(0, _HEADER) else 0
+        pos = data.find(_SEPARATOR, start)
+        while pos >= 0:
+            if (pos == 0 or data[pos - 1] == 0x0A) and self._is_marker_line(pos, _SEPARATOR):
+                self._add_cell(start, pos)
+                start = self._line_end(pos) + 1
+            pos = data.find(_SEPARATOR, pos + 1)
+        self._add_cell(start, len(data))
+
+    def _add_cell(self, start, end):
+        data = self.data
+        body = None
+        line = start
+        while line < end:
+            line_end = min(self._line_end(line), end)
+            first = data[line:line_end]
+            if not first.startswith(_TITLE) and _has_content(first):
+                body = line
+                break
+            line = line_end + 1
+        if body is None:
+            return
+        # The last title line counts, wherever it is in the cell
+        title = data.rfind(b'\n' + _TITLE, max(start - 1, 0), end)
+        if title >= 0:
+            title += 1
+        elif data[start:start + len(_TITLE)] == _TITLE:
+            title = start
+        if first.startswith(_MARKDOWN_START):
+            kind, language = MARKDOWN, 'markdown'
+        elif first.lstrip().startswith(_MAGIC_STARTS):
+            kind, language = CODE, split_magic(_decode(first).strip())[1]
+        else:
+            kind, language = CODE, DEFAULT_LANGUAGE
+        if language not in self._language_names:
+            self._language_names.append(language)
+        self.kinds.append(kind)
+        self.languages.append(self._language_names.index(language))
+        self.starts.append(body)
+        self.ends.append(end)
+        self.title_starts.append(title)
+        self.title_ends.append(min(self._line_end(title), end) if title >= 0 else -1)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def kind(self, i):
+        """'markdown' or 'code'"""
+        return KINDS[self.kinds[i]]
+
+    def language(self, i):
+        """Language of a code cell, from its %magic ('python' without one); 'markdown' otherwise"""
+        return self._language_names[self.languages[i]]
+
+    def title(self, i):
+        if self.title_starts[i] < 0:
+            return ''
+        return _decode(self.data[self.title_starts[i]:self.title_ends[i]]).partition(',')[2].strip()
+
+    def size(self, i):
+        """Bytes of source the cell spans"""
+        return self.ends[i] - self.starts[i]
+
+    def digest(self, i):
+        """SHA-256 of the cell's source bytes, hashed in place"""
+        with memoryview(self.data) as view, view[self.starts[i]:self.ends[i]] as cell:
+            return hashlib.sha256(cell).hexdigest()
+
+    def text(self, i):
+        """The cell's content, decoded from the source now"""
+        text = _decode(self.data[self.starts[i]:self.ends[i]])
+        if self.kinds[i] == CODE and self.title_starts[i] < self.starts[i]:
+            # No title line inside the cell: its lines are the source as is
+            return text.strip()
+        lines = [line for line in text.split('\n') if not line.startswith('# DBTITLE')]
+        if self.kinds[i] == MARKDOWN:
+            return '\n'.join(line for line in map(_markdown_line, lines) if line is not None)
+        return '\n'.join(lines).strip()
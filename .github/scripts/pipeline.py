@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Bounded-queue pipeline for the publish scripts.
+Items (notebooks) flow through a chain of stages, each run by its own
+workers: threads for network-bound work, or a process pool for CPU-bound
+work. Stages are joined by bounded queues, so a fast stage blocks once it
+is `capacity` items ahead of the next one and memory stays flat however
+many notebooks there are, while every stage keeps working at the same time;
+a run takes about as long as its slowest stage instead of the sum of all.
+
+Results come out in completion order. A stage function returning None
+drops the item; one that raises is reported and the item dropped too.
+"""
+
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, NamedTuple, Optional
+
+import instrumentation
+
+# Seconds between checks for a stopped pipeline while blocked on a queue
+_POLL = 0.1
+_DONE = object()
+
+
+class Stage(NamedTuple):
+    """One step of a pipeline
+
+    `func(item)` returns the item handed to the next stage. Items for which
+    `when(item)` is false skip the stage unchanged (e.g. cache hits skip
+    rendering). Process stages need a picklable top-level `func`.
+    """
+    name: str
+    func: Callable
+    workers: int = 1
+    processes: bool = False
+    capacity: int = 0   # queued items allowed ahead of the stage; 0 means 2 * workers
+    when: Optional[Callable] = None
+
+
+def _call_recorded(func, item, profile=False):
+    """func(item) in a pool worker, returning its timing records and profile as well"""
+    recorder = instrumentation.enable(profile)
+    profiler = recorder.profiler()
+    try:
+        with instrumentation.profiling(profiler):
+            result = func(item)
+        if profiler is not None:
+            recorder.add_profile(profiler)
+        return result, recorder.records, recorder.profiles
+    finally:
+        instrumentation.disable()
+
+
+class _Stopped(Exception):
+    pass
+
+
+class Pipeline:
+    """Runs items through stages on worker threads and process pools"""
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self._stop = threading.Event()
+        self._queues = [queue.Queue(stage.capacity or 2 * stage.workers) for stage in self.stages]
+        self._queues.append(queue.Queue(2 * self.stages[-1].workers))
+        self._pools = {}
+        self._threads = []
+
+    def run(self, items):
+        """Feed `items` through every stage; yields the last stage's results"""
+        recorder = instrumentation.active()
+        try:
+            for i, stage in enumerate(self.stages):
+                if stage.processes:
+                    # Spawned rather than forked: a fork would copy locks held by the other stages' threads
+                    self._pools[i] = ProcessPoolExecutor(max_workers=stage.workers,
+                                                         mp_context=multiprocessing.get_context('spawn'))
+                remaining = [stage.workers]
+                lock = threading.Lock()
+                for _ in range(stage.workers):
+                    self._start(self._work, i, remaining, lock, recorder)
+            self._start(self._feed, items)
+
+            output = self._queues[-1]
+            while True:
+                result = self._get(output)
+                if result is _DONE:
+                    break
+                yield result
+        finally:
+            # Also reached when the caller stops early: unblock and retire every worker
+            self._stop.set()
+            for thread in self._threads:
+                thread.join()
+            for pool in self._pools.values():
+                pool.shutdown(cancel_futures=True)
+
+    def _start(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+                return
+            except queue.Full:
+                pass
+        raise _Stopped
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                pass
+        raise _Stopped
+
+    def _feed(self, items):
+        try:
+            for item in items:
+                self._put(self._queues[0], item)
+        except _Stopped:
+            return
+        except Exception as e:
+            print(f"Pipeline input failed: {e}")
+        try:
+            self._put(self._queues[0], _DONE)
+        except _Stopped:
+            pass
+
+    def _work(self, i, remaining, lock, recorder):
+        stage = self.stages[i]
+        inbox, outbox = self._queues[i], self._queues[i + 1]
+        # Thread stages profile their own work; process stages only wait here
+        profiler = recorder.profiler() if recorder is not None and not stage.processes else None
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    # Let the stage's other workers see the end too; the last one passes it on
+                    self._put(inbox, _DONE)
+                    with lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    if last:
+                        self._put(outbox, _DONE)
+                    return
+                result = self._process(i, stage, item, recorder, profiler)
+                if result is not None:
+                    self._put(outbox, result)
+        except _Stopped:
+            return
+        finally:
+            if profiler is not None:
+                recorder.add_profile(profiler)
+
+    def _process(self, i, stage, item, recorder, profiler):
+        if stage.when is not None and not stage.when(item):
+            return item
+        try:
+            if not stage.processes:
+                with instrumentation.profiling(profiler):
+                    return stage.func(item)
+            pool = self._pools[i]
+            if recorder is None:
+                return pool.submit(stage.func, item).result()
+            # Workers record their own timings and profiles and send them back with the result
+            result, records, profiles = pool.submit(_call_recorded, stage.func, item, recorder.profile).result()
+            recorder.merge(records, profiles)
+            return result
+        except Exception as e:
+            print(f"Pipeline stage {stage.name} failed: {e}")
+            return None
+
+
+def run_pipeline(items, stages):
+    """Run `items` through `stages`, yielding results of the last stage as they finish"""
+    return Pipeline(stages).run(items)
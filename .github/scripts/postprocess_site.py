@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Post-processing stage for a built site directory.
+HTML and CSS files are minified in place (whitespace inside <pre>,
+<textarea> and <script> is left untouched) and a per-page size report is
+printed. Files are processed in parallel. Set SKIP_SITE_POSTPROCESS=1 (or
+pass --skip-postprocess to the builders) to leave the output as written,
+e.g. when debugging markup.
+
+Precompressed .gz and .br siblings of every text asset are opt-in
+(SITE_PRECOMPRESS=1 or --compress). They only help on hosts that serve such
+siblings as-is, e.g. nginx with gzip_static/brotli_static or a CDN bucket
+set up for it. GitHub Pages, where this site is deployed, compresses
+responses itself and would publish the siblings as plain files.
+"""
+
+import os
+import re
+import gzip
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # .br siblings are skipped without the brotli package
+    brotli = None
+
+from site_templates import SITE_DIR
+from stream_utils import CHUNK_SIZE
+
+MINIFIED_EXTENSIONS = {'.html', '.css'}
+COMPRESSED_EXTENSIONS = {'.html', '.css', '.js', '.json', '.svg', '.txt', '.xml'}
+# Larger files (e.g. big notebook exports) are compressed as a stream but not
+# minified, which would need the whole page in memory
+MINIFY_MAX_BYTES = 16 * 1024 * 1024
+# Brotli's top quality is ~35x slower than 9 for a few percent on large pages,
+# so it is only used for files up to BROTLI_MAX_QUALITY_BYTES
+BROTLI_MAX_QUALITY_BYTES = 256 * 1024
+
+# Comments and elements whose content must not be re-flowed; an unclosed
+# element is protected to the end of the document
+_HTML_PROTECTED = re.compile(
+    r'<!--.*?-->|<(pre|textarea|script|style)\b[^>]*>.*?(?:</\1\s*>|\Z)',
+    re.DOTALL | re.IGNORECASE)
+_STYLE_ELEMENT = re.compile(r'(<style\b[^>]*>)(.*?)(</style\s*>|\Z)', re.DOTALL | re.IGNORECASE)
+_NEWLINE_RUN = re.compile(r'[ \t\r\f]*\n\s*')
+
+_CSS_TOKENS = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[^"\'/]+|/', re.DOTALL)
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+
+def postprocess_enabled():
+    return os.environ.get('SKIP_SITE_POSTPROCESS', '').lower() not in ('1', 'true', 'yes')
+
+
+def precompress_enabled():
+    return os.environ.get('SITE_PRECOMPRESS', '').lower() in ('1', 'true', 'yes')
+
+
+def minify_css(css):
+    """Drop comments and redundant whitespace, leaving strings untouched"""
+    out = []
+    text = []
+
+    def flush():
+        chunk = _CSS_PUNCTUATION.sub(r'\1', _CSS_SPACE.sub(' ', ''.join(text)))
+        out.append(chunk.replace(': ', ':').replace(';}', '}'))
+        text.clear()
+
+    for token in _CSS_TOKENS.findall(css):
+        if token.startswith('/*'):
+            text.append(' ')
+        elif token[0] in '"\'':
+            flush()
+            out.append(token)
+        else:
+            text.append(token)
+    flush()
+    return ''.join(out).strip()
+
+
+def minify_html(html):
+    """Collapse indentation and line breaks between tags and drop comments
+
+    Any whitespace run containing a line break becomes a single newline,
+    which renders the same outside preformatted text. <pre>, <textarea> and
+    <script> are copied as they are; <style> contents go through minify_css.
+    Minifying twice gives the same output as minifying once.
+    """
+    out = []
+    text = []   # unprotected text, joined across dropped comments
+    pos = 0
+    for match in _HTML_PROTECTED.finditer(html):
+        text.append(html[pos:match.start()])
+        pos = match.end()
+        block = match.group(0)
+        if block.startswith('<!--'):
+            # Keep conditional comments, drop the rest
+            if not block.startswith('<!--[if'):
+                continue
+        elif match.group(1).lower() == 'style':
+            block = _STYLE_ELEMENT.sub(lambda m: m.group(1) + minify_css(m.group(2)) + m.group(3), block)
+        out.append(_NEWLINE_RUN.sub('\n', ''.join(text)))
+        out.append(block)
+        text = []
+    text.append(html[pos:])
+    out.append(_NEWLINE_RUN.sub('\n', ''.join(text)))
+    return ''.join(out).strip() + '\n'
+
+
+def _sibling_is_current(path, sibling):
+    return os.path.exists(sibling) and os.path.getmtime(sibling) >= os.path.getmtime(path)
+
+
+def _write_gzip(path, gz_path):
+    with open(path, 'rb') as src, open(gz_path, 'wb') as out:
+        # Empty name and mtime=0 keep the output identical across builds
+        with gzip.GzipFile(filename='', mode='wb', fileobj=out, compresslevel=9, mtime=0) as gz:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                gz.write(chunk)
+
+
+def _write_brotli(path, br_path):
+    quality = 11 if os.path.getsize(path) <= BROTLI_MAX_QUALITY_BYTES else 9
+    compressor = brotli.Compressor(quality=quality)
+    with open(path, 'rb') as src, open(br_path, 'wb') as out:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+            out.write(compressor.process(chunk))
+        out.write(compressor.finish())
+
+
+def process_file(path, minify=True, compress=True):
+    """Minify and compress one file; returns (path, original, minified, gzip, brotli) sizes"""
+    ext = os.path.splitext(path)[1].lower()
+    original = size = os.path.getsize(path)
+
+    if minify and ext in MINIFIED_EXTENSIONS and size <= MINIFY_MAX_BYTES:
+        with open(path, 'rb') as f:
+            data = f.read()
+        text = data.decode('utf-8')
+        minified = (minify_html(text) if ext == '.html' else minify_css(text)).encode('utf-8')
+        if minified != data:
+            with open(path, 'wb') as f:
+                f.write(minified)
+            size = len(minified)
+
+    gz_size = br_size = None
+    if compress and ext in COMPRESSED_EXTENSIONS:
+        gz_path = path + '.gz'
+        if not _sibling_is_current(path, gz_path):
+            _write_gzip(path, gz_path)
+        gz_size = os.path.getsize(gz_path)
+        if brotli is not None:
+            br_path = path + '.br'
+            if not _sibling_is_current(path, br_path):
+                _write_brotli(path, br_path)
+            br_size = os.path.getsize(br_path)
+    return path, original, size, gz_size, br_size
+
+
+def site_files(site_dir):
+    for root, _, filenames in os.walk(site_dir):
+        for filename in sorted(filenames):
+            if not filename.endswith(('.gz', '.br')):
+                yield os.path.join(root, filename)
+
+
+def _size(value):
+    return '-' if value is None else f'{value / 1024:.1f} KB'
+
+
+def print_size_report(results, site_dir):
+    """One row per HTML page, largest first, then totals over all files"""
+    pages = sorted((r for r in results if r[0].endswith('.html')), key=lambda r: r[1], reverse=True)
+    names = [os.path.relpath(r[0], site_dir) for r in pages]
+    width = max([len(name) for name in names] + [24])
+    print(f"{'page':<{width}} {'original':>11} {'minified':>11} {'gzip':>11} {'brotli':>11}")
+    for name, (_, original, minified, gz_size, br_size) in zip(names, pages):
+        print(f"{name:<{width}} {_size(original):>11} {_size(minified):>11} {_size(gz_size):>11} {_size(br_size):>11}")
+    original = sum(r[1] for r in results)
+    minified = sum(r[2] for r in results)
+    compressed = any(r[3] is not None for r in results)
+    gz_total = sum(r[3] if r[3] is not None else r[2] for r in results) if compressed else None
+    br_total = sum(r[4] if r[4] is not None else r[2] for r in results) if compressed and brotli else None
+    print(f"{f'total ({len(results)} files)':<{width}} {_size(original):>11} {_size(minified):>11} "
+          f"{_size(gz_total):>11} {_size(br_total):>11}")
+    if original:
+        saved = f"Minification saved {(original - minified) / original:.1%}"
+        if compressed:
+            saved += f"; gzip transfer is {gz_total / original:.1%} of the original size"
+        print(saved)
+
+
+def postprocess_site(site_dir=SITE_DIR, jobs=None, minify=True, compress=None, report=True):
+    """Minify, and precompress if asked, every file under `site_dir`; returns per-file sizes
+
+    `compress` defaults to SITE_PRECOMPRESS.
+    """
+    if compress is None:
+        compress = precompress_enabled()
+    paths = list(site_files(site_dir))
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as executor:
+            results = list(executor.map(process_file, paths, [minify] * len(paths), [compress] * len(paths)))
+    else:
+        results = [process_file(path, minify, compress) for path in paths]
+    if compress and brotli is None:
+        print("brotli is not installed; skipped .br files")
+    if report:
+        print_size_report(results, site_dir)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minify, and optionally precompress, a built site')
+    parser.add_argument('site_dir', nargs='?', default=SITE_DIR)
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--no-minify', action='store_true', help='Leave files unminified')
+    parser.add_argument('--compress', action='store_true',
+                        help='Write .gz/.br siblings for hosts that serve them (also SITE_PRECOMPRESS=1)')
+    args = parser.parse_args()
+    postprocess_site(args.site_dir, args.jobs, minify=not args.no_minify, compress=args.compress or None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Build the single-page site from the local notebooks in one pass.
+Cache lookups, rendering (in worker processes) and writing sections plus
+collecting search terms all run at once, with bounded queues in between,
+so a notebook is written as soon as it is rendered. This is the one build
+path: the CI workflow runs it, build_site.py is an alias for it, and the
+--watch preview does its first build through publish_notebooks().
+
+Usage: python3 .github/scripts/publish_site.py [--jobs N] [--watch [--port 8000]]
+"""
+
+import os
+import glob
+import argparse
+from functools import partial
+from typing import NamedTuple, Optional
+
+import instrumentation
+from build_site import load_readme_html, write_manifest, write_section, write_shell, write_shell_assets
+from convert_notebooks import (
+    NOTEBOOKS_DIR, NOTEBOOK_PATTERNS, cache_salt, convert_to_html_fragment, lookup_fragment, store_fragment,
+)
+from fragment_cache import FragmentCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from highlight import DEFAULT_CELL_CACHE_DIR, highlight_salt
+from instrumentation import stage
+from navigation import notebook_group
+from pipeline import Stage, run_pipeline
+from postprocess_site import postprocess_site, postprocess_enabled
+from search_index import notebook_terms, write_search_index
+from site_templates import SITE_DIR
+
+
+class NotebookJob(NamedTuple):
+    """A local notebook on its way to the site"""
+    path: str
+    name: str
+    key: Optional[str] = None
+    fragment: Optional[str] = None
+    rendered: bool = False
+    entry: Optional[dict] = None
+    terms: Optional[dict] = None
+
+
+def render_job(job, cell_cache=None):
+    """Pipeline stage (worker process): render the notebook's fragment"""
+    try:
+        name, fragment = convert_to_html_fragment(job.path, cell_cache)
+    except Exception as e:
+        print(f"Failed to convert {job.path}: {e}")
+        return None
+    return job._replace(name=name, fragment=fragment, rendered=True)
+
+
+def local_notebooks(patterns=NOTEBOOK_PATTERNS):
+    """Paths of the local .py and .ipynb notebooks, sorted"""
+    return sorted(path for pattern in patterns for path in glob.glob(pattern))
+
+
+def unique_notebooks(paths):
+    """Notebook name -> path, one path per name
+
+    A later path wins over an earlier one of the same name (notebooks/x.py
+    over notebooks/x.ipynb); the others are reported and left out of the build.
+    """
+    chosen = {}
+    for path in sorted(paths):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in chosen:
+            print(f"Skipping {chosen[name]}: {path} has the same notebook name")
+        chosen[name] = path
+    return chosen
+
+
+def write_notebook(site_dir, path, name, fragment):
+    """Write a notebook's section and read its search terms; returns (manifest entry, terms)"""
+    with stage('write', name, len(fragment)):
+        entry = write_section(site_dir, name, fragment, notebook_group(path, NOTEBOOKS_DIR))
+    try:
+        terms = notebook_terms(path)
+    except Exception as e:
+        print(f"Could not index {path}: {e}")
+        terms = {}
+    return entry, terms
+
+
+def publish_notebooks(paths, site_dir=SITE_DIR, jobs=1, cache=None, cell_cache=None):
+    """Convert `paths` and write their sections; returns name -> finished NotebookJob
+
+    The paths need distinct notebook names (see unique_notebooks). A notebook
+    missing from the result failed to convert.
+    """
+    os.makedirs(site_dir, exist_ok=True)
+
+    def lookup(job):
+        key, fragment = lookup_fragment(cache, job.path)
+        return job._replace(key=key, fragment=fragment)
+
+    def write(job):
+        if job.rendered:
+            store_fragment(cache, job.key, job.path, job.name, job.fragment)
+        entry, terms = write_notebook(site_dir, job.path, job.name, job.fragment)
+        # Drop the fragment here so finished notebooks do not pile up in memory
+        return job._replace(fragment=None, entry=entry, terms=terms)
+
+    stages = [
+        Stage('lookup', lookup),
+        Stage('render', partial(render_job, cell_cache=cell_cache), workers=max(1, jobs), processes=jobs > 1,
+              when=lambda job: job.fragment is None),
+        Stage('write', write),
+    ]
+    items = (NotebookJob(path, os.path.splitext(os.path.basename(path))[0]) for path in paths)
+    return {job.name: job for job in run_pipeline(items, stages)}
+
+
+def publish(site_dir=SITE_DIR, jobs=1, cache=None, cell_cache=None):
+    """Convert every local notebook and write the site; returns (written, failed) counts
+
+    Notebooks skipped for sharing another one's name are not counted as failed.
+    """
+    paths = unique_notebooks(local_notebooks())
+    finished = publish_notebooks(paths.values(), site_dir, jobs, cache, cell_cache)
+
+    with stage('manifest'):
+        write_manifest(site_dir, [finished[name].entry for name in sorted(finished)])
+    with stage('search_index'):
+        write_search_index({name: job.terms for name, job in finished.items()}, site_dir)
+    with stage('shell'):
+        write_shell(site_dir, load_readme_html(), write_shell_assets(site_dir))
+    return len(finished), len(paths) - len(finished)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert the local notebooks and build the single-page site')
+    parser.add_argument('--site-dir', default=SITE_DIR, help='Output directory')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes rendering notebooks (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-render every notebook, ignoring the fragment cache')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Fragment cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cell-cache-dir', default=DEFAULT_CELL_CACHE_DIR,
+                        help=f'Highlighted cell cache directory (default: {DEFAULT_CELL_CACHE_DIR})')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Evict least recently used entries beyond this size (per cache)')
+    parser.add_argument('--skip-postprocess', action='store_true',
+                        help='Leave the output unminified (also SKIP_SITE_POSTPROCESS=1)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Serve the site and rebuild on changes (local preview)')
+    parser.add_argument('--port', type=int, default=8000, help='Preview server port with --watch (default: 8000)')
+    parser.add_argument('--host', default='127.0.0.1', help='Preview server address with --watch')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.watch:
+        # Imported here: the preview server is not needed for a one-off build
+        from watch_site import watch
+        watch(args.site_dir, args.host, args.port, args.jobs, use_cache=not args.no_cache)
+        return
+
+    with instrumentation.instrumented('publish_site', args.timings, args.profile, args.profile_dir):
+        cache = cell_cache = None
+        if not args.no_cache:
+            max_bytes = args.cache_max_mb * 1024 * 1024
+            cache = FragmentCache(args.cache_dir, max_bytes, salt=cache_salt())
+            cell_cache = FragmentCache(args.cell_cache_dir, max_bytes, salt=highlight_salt())
+
+        written, failed = publish(args.site_dir, args.jobs, cache, cell_cache)
+        print(f"Created single-page application with {written} notebooks")
+        if failed:
+            print(f"{failed} notebooks failed to convert")
+
+        if cache:
+            with stage('cache.prune'):
+                cache.prune()
+                cell_cache.prune()
+            print(cache.summary())
+
+        if not args.skip_postprocess and postprocess_enabled():
+            with stage('postprocess'):
+                postprocess_site(args.site_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Build-time full-text search over notebook markdown and code cells.
+An inverted index is written to site/search/ as a small index.json (the
+notebook list and shard table) plus one shard per two-letter term prefix,
+with crowded prefixes split further, so the browser only downloads the
+shards a query touches. The widget script
+is shared by the single-page site and the exported pages.
+"""
+
+import os
+import re
+import json
+import glob
+from collections import Counter, defaultdict
+
+from convert_notebooks import CELL_READERS, NOTEBOOK_PATTERNS
+from site_templates import SITE_DIR, SEARCH_INDEX, display_name, write_hashed_asset
+
+# Terms are sharded by this many leading characters; shorter terms are not indexed
+SHARD_PREFIX_LENGTH = 2
+# Shards larger than this are split on one more character of the prefix
+SHARD_MAX_BYTES = 64 * 1024
+MAX_TERM_LENGTH = 32
+# Title words count as this many occurrences
+TITLE_WEIGHT = 5
+
+STOP_WORDS = frozenset('''
+    an and are as at be by for from has have if in into is it its of on or that
+    the this to was were will with not no but can all any we you your our
+'''.split())
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Yield index terms: lowercase words, plus the parts of snake_case names"""
+    for word in _WORD.findall(text.lower()):
+        parts = word.split('_') if '_' in word else ()
+        for term in (word.strip('_'), *parts):
+            if (SHARD_PREFIX_LENGTH <= len(term) <= MAX_TERM_LENGTH
+                    and term not in STOP_WORDS and not term.isdecimal()):
+                yield term
+
+
+def notebook_sources(names, patterns=NOTEBOOK_PATTERNS):
+    """Local notebook files for the given notebook names"""
+    names = set(names)
+    return [path for pattern in patterns for path in glob.glob(pattern)
+            if os.path.splitext(os.path.basename(path))[0] in names]
+
+
+def notebook_terms(path):
+    """Term frequencies over the markdown and code cells of a local notebook"""
+    reader = CELL_READERS[os.path.splitext(path)[1]]
+    terms = Counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        for cell in reader(f):
+            terms.update(tokenize(cell.content))
+    return terms
+
+
+class SearchIndexBuilder:
+    """Accumulates notebooks, then writes index.json and the term shards"""
+
+    def __init__(self):
+        self.docs = []
+        self.postings = defaultdict(list)   # term -> [doc, tf, doc, tf, ...]
+
+    def add(self, name, terms, title=None):
+        title = title or display_name(name)
+        terms = Counter(terms)
+        for term in tokenize(title):
+            terms[term] += TITLE_WEIGHT
+        doc = len(self.docs)
+        self.docs.append([name, title, sum(terms.values())])
+        for term, tf in terms.items():
+            self.postings[term] += [doc, tf]
+
+    def encoded_postings(self, term):
+        """Postings for `term` with document numbers as gaps from the previous one"""
+        postings = self.postings[term]
+        encoded = []
+        previous = 0
+        for i in range(0, len(postings), 2):
+            encoded += [postings[i] - previous, postings[i + 1]]
+            previous = postings[i]
+        return encoded
+
+    def shards(self):
+        """Shard prefix -> {term: delta-encoded postings}"""
+        terms = [(term, self.encoded_postings(term)) for term in sorted(self.postings)]
+        return dict(_split_shards(terms, SHARD_PREFIX_LENGTH))
+
+    def write(self, site_dir=SITE_DIR):
+        """Write the index; returns {shard file: size in bytes} including index.json"""
+        index_path = os.path.join(site_dir, SEARCH_INDEX)
+        search_dir = os.path.dirname(index_path)
+        os.makedirs(search_dir, exist_ok=True)
+        sizes = {}
+        shard_files = {}
+        for prefix, shard in self.shards().items():
+            filename = f'{prefix.encode("utf-8").hex()}.json'
+            shard_files[prefix] = filename
+            sizes[filename] = _write_json(os.path.join(search_dir, filename), shard)
+
+        lengths = [doc[2] for doc in self.docs]
+        index = {
+            'version': 2,
+            'avg_length': round(sum(lengths) / len(lengths), 2) if lengths else 0,
+            # The script tokenizes queries by the same rules as tokenize()
+            'tokenizer': {
+                'min_length': SHARD_PREFIX_LENGTH,
+                'max_length': MAX_TERM_LENGTH,
+                'stop_words': sorted(STOP_WORDS),
+            },
+            'docs': self.docs,
+            'shards': shard_files,
+        }
+        sizes[os.path.basename(index_path)] = _write_json(index_path, index)
+
+        # Shards from earlier builds (and their compressed copies) would otherwise be left behind
+        for filename in os.listdir(search_dir):
+            if filename.removesuffix('.gz').removesuffix('.br') not in sizes:
+                os.remove(os.path.join(search_dir, filename))
+        return sizes
+
+
+def _split_shards(terms, length):
+    """Group sorted (term, postings) pairs by prefix, splitting groups over SHARD_MAX_BYTES"""
+    group = []
+    for term, postings in terms:
+        if group and group[0][0][:length] != term[:length]:
+            yield from _shard_group(group, length)
+            group = []
+        group.append((term, postings))
+    if group:
+        yield from _shard_group(group, length)
+
+
+def _shard_group(group, length):
+    shard = dict(group)
+    splittable = length < MAX_TERM_LENGTH and any(len(term) > length for term in shard)
+    if splittable and len(json.dumps(shard, separators=(',', ':'))) > SHARD_MAX_BYTES:
+        yield from _split_shards(group, length + 1)
+    else:
+        yield group[0][0][:length], shard
+
+
+def _write_json(path, data):
+    text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return len(text.encode('utf-8'))
+
+
+def build_search_index(paths, site_dir=SITE_DIR):
+    """Index local notebook files (named by file stem); returns shard sizes"""
+    terms_by_name = {}
+    for path in sorted(paths):
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            terms_by_name[name] = notebook_terms(path)
+        except Exception as e:
+            print(f"Could not index {path}: {e}")
+    return write_search_index(terms_by_name, site_dir)
+
+
+def write_search_index(terms_by_name, site_dir=SITE_DIR):
+    """Index notebooks from {name: term frequencies}; returns shard sizes"""
+    builder = SearchIndexBuilder()
+    for name in sorted(terms_by_name):
+        builder.add(name, terms_by_name[name])
+    sizes = builder.write(site_dir)
+    print(f"Search index: {len(builder.docs)} notebooks, {len(builder.postings)} terms, "
+          f"{len(sizes) - 1} shards, {sum(sizes.values()) / 1024:.1f} KB")
+    return sizes
+
+
+def write_search_script(site_dir=SITE_DIR):
+    """Write the widget script as a hashed asset; returns its href"""
+    return write_hashed_asset(site_dir, 'search', SEARCH_SCRIPT, ext='js')
+
+
+# SiteSearch loads index.json and the shards a query needs, then ranks
+# notebooks with BM25; terms match as prefixes and every term must match.
+# Queries are tokenized like tokenize() above, with the length limits and
+# stop words index.json carries, so no query term is one that is never indexed.
+SEARCH_SCRIPT = '''(function () {
+    const K1 = 1.2;
+    const B = 0.75;
+
+    function tokenize(text, rules) {
+        const stopWords = new Set(rules.stop_words);
+        const terms = [];
+        for (const word of text.toLowerCase().match(/[\\p{L}\\p{N}_]+/gu) || []) {
+            const parts = word.includes('_') ? word.split('_') : [];
+            for (const term of [word.replace(/^_+|_+$/g, ''), ...parts]) {
+                const length = [...term].length;
+                if (length >= rules.min_length && length <= rules.max_length
+                        && !stopWords.has(term) && !/^\\p{Nd}+$/u.test(term)) {
+                    terms.push(term);
+                }
+            }
+        }
+        return terms;
+    }
+
+    class SiteSearch {
+        constructor(indexUrl, fetchJSON) {
+            this.indexUrl = indexUrl;
+            this.base = indexUrl.replace(/[^/]*$/, '');
+            this.fetchJSON = fetchJSON || (url => fetch(url).then(response => {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.json();
+            }));
+            this.index = null;
+            this.shards = new Map();
+        }
+
+        loadIndex() {
+            if (!this.index) {
+                this.index = this.fetchJSON(this.indexUrl);
+                this.index.catch(() => { this.index = null; });
+            }
+            return this.index;
+        }
+
+        loadShard(file) {
+            if (!this.shards.has(file)) {
+                this.shards.set(file, this.fetchJSON(this.base + file).catch(() => {
+                    this.shards.delete(file);
+                    return {};
+                }));
+            }
+            return this.shards.get(file);
+        }
+
+        // Terms starting with `term` live in shards whose prefix starts with
+        // it, or in the one shard whose prefix `term` itself starts with
+        loadTerm(index, term) {
+            const files = Object.keys(index.shards)
+                .filter(prefix => prefix.startsWith(term) || term.startsWith(prefix))
+                .map(prefix => this.loadShard(index.shards[prefix]));
+            return Promise.all(files).then(shards => Object.assign({}, ...shards));
+        }
+
+        async search(query, limit = 10) {
+            if (!query.trim()) {
+                return [];
+            }
+            const index = await this.loadIndex();
+            const terms = [...new Set(tokenize(query, index.tokenizer))];
+            if (!terms.length) {
+                return [];
+            }
+            const shards = await Promise.all(terms.map(term => this.loadTerm(index, term)));
+            const total = index.docs.length;
+            let scores = null;
+            terms.forEach((term, i) => {
+                const matches = new Map();
+                for (const [key, postings] of Object.entries(shards[i])) {
+                    if (!key.startsWith(term)) {
+                        continue;
+                    }
+                    const df = postings.length / 2;
+                    const idf = Math.log(1 + (total - df + 0.5) / (df + 0.5));
+                    // Whole-word matches rank above prefix matches
+                    const weight = key === term ? 1 : 0.5;
+                    let doc = 0;
+                    for (let p = 0; p < postings.length; p += 2) {
+                        doc += postings[p];
+                        const tf = postings[p + 1];
+                        const norm = 1 - B + B * index.docs[doc][2] / (index.avg_length || 1);
+                        const score = weight * idf * tf * (K1 + 1) / (tf + K1 * norm);
+                        matches.set(doc, (matches.get(doc) || 0) + score);
+                    }
+                }
+                if (scores === null) {
+                    scores = matches;
+                } else {
+                    for (const [doc, score] of scores) {
+                        if (matches.has(doc)) {
+                            scores.set(doc, score + matches.get(doc));
+                        } else {
+                            scores.delete(doc);
+                        }
+                    }
+                }
+            });
+            return [...scores]
+                .sort((a, b) => b[1] - a[1])
+                .slice(0, limit)
+                .map(([doc, score]) => ({id: index.docs[doc][0], title: index.docs[doc][1], score}));
+        }
+    }
+
+    SiteSearch.tokenize = tokenize;
+    globalThis.SiteSearch = SiteSearch;
+    if (typeof document === 'undefined') {
+        return;
+    }
+
+    function init() {
+        const widget = document.querySelector('[data-search-index]');
+        if (!widget) {
+            return;
+        }
+        const input = widget.querySelector('.search-input');
+        const results = widget.querySelector('.search-results');
+        const searcher = new SiteSearch(widget.dataset.searchIndex);
+        let latest = 0;
+        let timer = null;
+
+        function link(id) {
+            return widget.dataset.searchLink.replace('{id}', encodeURIComponent(id));
+        }
+
+        function show(hits, query) {
+            results.innerHTML = '';
+            if (!query.trim()) {
+                return;
+            }
+            if (!hits.length) {
+                const empty = document.createElement('div');
+                empty.className = 'search-empty';
+                empty.textContent = 'No matching notebooks';
+                results.appendChild(empty);
+                return;
+            }
+            hits.forEach(hit => {
+                const a = document.createElement('a');
+                a.href = link(hit.id);
+                a.textContent = hit.title;
+                results.appendChild(a);
+            });
+        }
+
+        function run() {
+            const query = input.value;
+            const current = ++latest;
+            searcher.search(query).then(hits => {
+                // Ignore answers to queries that have since been replaced
+                if (current === latest) {
+                    show(hits, query);
+                }
+            }).catch(() => show([], query));
+        }
+
+        input.addEventListener('input', () => {
+            clearTimeout(timer);
+            timer = setTimeout(run, 60);
+        });
+        input.addEventListener('focus', () => searcher.loadIndex().catch(() => {}), {once: true});
+        input.addEventListener('keydown', event => {
+            if (event.key === 'Escape') {
+                input.value = '';
+                show([], '');
+            } else if (event.key === 'Enter') {
+                const first = results.querySelector('a');
+                if (first) {
+                    first.click();
+                }
+            }
+        });
+        results.addEventListener('click', event => {
+            if (event.target.closest('a')) {
+                input.value = '';
+                show([], '');
+            }
+        });
+        // Only offer search when an index was built for this site
+        searcher.loadIndex().then(() => { widget.hidden = false; }, () => {});
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', init);
+    } else {
+        init();
+    }
+})();
+'''
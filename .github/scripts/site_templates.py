@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""
+Page templates for the exported notebook site.
+The CSS and static markup are rendered once at import, and SiteTemplate
+pre-renders everything that depends only on the build (title, header and
+sidebar), so each page only splices in its title, styles and body.
+Stylesheets are written to site/assets/ under content-hashed names and
+linked from the pages, so browsers cache them across the site. The notebook
+list is not part of the pages: the sidebar holds a placeholder the shared
+navigation script fills from nav.json (see navigation.py), so a page stays
+the same size and unchanged however many notebooks the site has. Pages get
+a sidebar search box when the build provides the search script.
+"""
+
+import os
+import hashlib
+import tempfile
+import textwrap
+
+# Databricks brand colors
+COLORS = {
+    'primary': '#FF3621',
+    'text': '#1B3139',
+    'bg': '#FFFFFF', 
+    'light_bg': '#F5F5F5',
+    'border': '#E3E3E3'
+}
+
+FONTS_URL = 'https://fonts.googleapis.com/css2?family=DM+Sans:wght@400;500;600;700&display=swap'
+LOGO_URL = 'https://databricks-prod-cloudfront.cloud.databricks.com/static/811f68f9f55e3a5330b6e6ae1e54c07fc5ec7224f15be529de3400226e2eca3a/db-nav-logo.svg'
+
+# Shared stylesheets, written once per build as content-hashed assets
+NOTEBOOK_PAGE_CSS = f'''        /* Reset and base styles */
+        * {{
+            box-sizing: border-box;
+        }}
+        
+        body {{
+            font-family: 'DM Sans', -apple-system, BlinkMacSystemFont, sans-serif !important;
+            margin: 0;
+            padding: 0;
+            background: {COLORS['bg']};
+            color: {COLORS['text']};
+            font-size: 14px;
+            line-height: 1.6;
+        }}
+        
+        /* Header */
+        .header {{
+            background: {COLORS['bg']};
+            padding: 20px 40px;
+            border-bottom: 1px solid {COLORS['border']};
+            display: flex;
+            align-items: center;
+            gap: 20px;
+            position: fixed;
+            top: 0;
+            width: 100%;
+            z-index: 1000;
+        }}
+        
+        .logo {{ height: 24px; }}
+        
+        .title {{
+            font-size: 24px;
+            font-weight: 600;
+            flex: 1;
+            text-align: center;
+            color: {COLORS['text']};
+        }}
+        
+        .github-link {{
+            background: {COLORS['light_bg']};
+            padding: 8px 16px;
+            border-radius: 6px;
+            text-decoration: none;
+            color: {COLORS['text']};
+            font-weight: 500;
+            transition: all 0.2s;
+        }}
+        
+        .github-link:hover {{
+            background: {COLORS['border']};
+        }}
+        
+        /* Layout */
+        .main-container {{
+            display: flex;
+            margin-top: 80px;
+            min-height: calc(100vh - 80px);
+        }}
+        
+        .sidebar {{
+            width: 280px;
+            background: {COLORS['light_bg']};
+            padding: 30px 20px;
+            position: fixed;
+            left: 0;
+            top: 80px;
+            height: calc(100vh - 80px);
+            overflow-y: auto;
+        }}
+        
+        .sidebar h3 {{
+            font-size: 16px;
+            font-weight: 600;
+            margin: 0 0 20px 12px;
+            color: {COLORS['text']};
+        }}
+        
+        .content {{
+            flex: 1;
+            padding: 20px;
+            margin-left: 280px;
+        }}
+        
+        .notebook-container {{
+            background: {COLORS['bg']};
+            border-radius: 8px;
+            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+            padding: 40px;
+            margin: 0 auto;
+            max-width: 1200px;
+        }}
+        
+        /* Navigation */
+        .nav-link {{
+            display: block;
+            padding: 10px 12px;
+            margin: 4px 0;
+            text-decoration: none;
+            color: {COLORS['text']};
+            border-radius: 4px;
+            font-weight: 400;
+            transition: all 0.2s;
+        }}
+        
+        .nav-link:hover {{
+            background: {COLORS['bg']};
+        }}
+        
+        .nav-link.active {{
+            background: {COLORS['primary']};
+            color: {COLORS['bg']};
+            font-weight: 500;
+        }}
+        
+        /* Databricks notebook overrides */
+        .notebook-container h1,
+        .notebook-container h2,
+        .notebook-container h3,
+        .notebook-container h4,
+        .notebook-container h5,
+        .notebook-container h6 {{
+            font-family: 'DM Sans', sans-serif !important;
+            color: {COLORS['text']} !important;
+            font-weight: 600 !important;
+            margin-top: 24px;
+            margin-bottom: 16px;
+        }}
+        
+        .notebook-container p,
+        .notebook-container div,
+        .notebook-container span {{
+            font-family: 'DM Sans', sans-serif !important;
+        }}
+        
+        .notebook-container code,
+        .notebook-container pre {{
+            font-family: 'Monaco', 'Menlo', 'Consolas', monospace !important;
+            background-color: {COLORS['light_bg']} !important;
+            border: 1px solid {COLORS['border']} !important;
+            border-radius: 4px !important;
+        }}
+        
+        .notebook-container pre {{
+            padding: 16px !important;
+            overflow-x: auto !important;
+        }}
+        
+        .notebook-container code {{
+            padding: 2px 6px !important;
+        }}
+        
+        /* Output areas */
+        .ansiout,
+        .output_area,
+        div[class*="output"] {{
+            font-family: 'Monaco', 'Consolas', monospace !important;
+            background: {COLORS['light_bg']} !important;
+            border: 1px solid {COLORS['border']} !important;
+            border-radius: 4px !important;
+            padding: 10px !important;
+            margin: 10px 0 !important;
+            overflow-x: auto !important;
+        }}
+        
+        /* Link to the full text of a truncated output */
+        .output-more {{
+            display: inline-block;
+            margin-top: 8px;
+            font-family: 'DM Sans', sans-serif !important;
+            font-weight: 500;
+            color: {COLORS['primary']};
+        }}
+        
+        /* Tables */
+        .notebook-container table {{
+            border-collapse: collapse;
+            margin: 16px 0;
+            font-family: 'DM Sans', sans-serif !important;
+        }}
+        
+        .notebook-container th,
+        .notebook-container td {{
+            border: 1px solid {COLORS['border']};
+            padding: 8px 12px;
+            text-align: left;
+        }}
+        
+        .notebook-container th {{
+            background: {COLORS['light_bg']};
+            font-weight: 600;
+        }}
+'''
+
+INDEX_PAGE_CSS = f'''        body {{
+            font-family: 'DM Sans', sans-serif;
+            margin: 0;
+            padding: 0;
+            background: {COLORS['bg']};
+            color: {COLORS['text']};
+        }}
+        
+        .header {{
+            background: {COLORS['bg']};
+            padding: 20px 40px;
+            border-bottom: 1px solid {COLORS['border']};
+            display: flex;
+            align-items: center;
+            gap: 20px;
+            position: fixed;
+            top: 0;
+            width: 100%;
+            z-index: 1000;
+            box-sizing: border-box;
+        }}
+        
+        .logo {{ height: 24px; }}
+        
+        .title {{
+            font-size: 24px;
+            font-weight: 600;
+            flex: 1;
+            text-align: center;
+            color: {COLORS['text']};
+        }}
+        
+        .github-link {{
+            background: {COLORS['light_bg']};
+            padding: 8px 16px;
+            border-radius: 6px;
+            text-decoration: none;
+            color: {COLORS['text']};
+            font-weight: 500;
+            transition: all 0.2s;
+        }}
+        
+        .github-link:hover {{
+            background: {COLORS['border']};
+        }}
+        
+        .main-container {{
+            display: flex;
+            margin-top: 80px;
+            min-height: calc(100vh - 80px);
+        }}
+        
+        .sidebar {{
+            width: 280px;
+            background: {COLORS['light_bg']};
+            padding: 30px 20px;
+            position: fixed;
+            left: 0;
+            top: 80px;
+            height: calc(100vh - 80px);
+            overflow-y: auto;
+            box-sizing: border-box;
+        }}
+        
+        .sidebar h3 {{
+            font-size: 16px;
+            font-weight: 600;
+            margin: 0 0 20px 12px;
+            color: {COLORS['text']};
+        }}
+        
+        .content {{
+            flex: 1;
+            padding: 20px;
+            margin-left: 280px;
+        }}
+        
+        .content-container {{
+            background: {COLORS['bg']};
+            padding: 40px;
+            border-radius: 8px;
+            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+            margin: 0 auto;
+            max-width: 900px;
+        }}
+        
+        .nav-link {{
+            display: block;
+            padding: 10px 12px;
+            margin: 4px 0;
+            text-decoration: none;
+            color: {COLORS['text']};
+            border-radius: 4px;
+            font-weight: 400;
+            transition: all 0.2s;
+        }}
+        
+        .nav-link:hover {{
+            background: {COLORS['bg']};
+        }}
+        
+        .nav-link.active {{
+            background: {COLORS['primary']};
+            color: {COLORS['bg']};
+            font-weight: 500;
+        }}
+        
+        h1, h2, h3 {{
+            color: {COLORS['text']};
+            font-weight: 600;
+        }}
+        
+        h1 {{ font-size: 32px; margin: 0 0 24px 0; }}
+        h2 {{ font-size: 24px; margin: 32px 0 16px 0; }}
+        h3 {{ font-size: 18px; margin: 24px 0 12px 0; }}
+        
+        p {{ line-height: 1.6; margin: 0 0 16px 0; }}
+        
+        code {{
+            background: {COLORS['light_bg']};
+            padding: 2px 6px;
+            border-radius: 3px;
+            font-family: 'Monaco', 'Consolas', monospace;
+            font-size: 14px;
+        }}
+        
+        pre {{
+            background: {COLORS['light_bg']};
+            padding: 16px;
+            border-radius: 6px;
+            overflow-x: auto;
+            margin: 16px 0;
+        }}
+        
+        ul, ol {{
+            margin: 0 0 16px 0;
+            padding-left: 24px;
+            line-height: 1.6;
+        }}
+        
+        a {{
+            color: {COLORS['primary']};
+            text-decoration: none;
+        }}
+        
+        a:hover {{
+            text-decoration: underline;
+        }}
+'''
+
+# Sidebar search box, shared with the single-page site
+SEARCH_CSS = f'''
+.search {{ margin: 0 0 20px 0; }}
+.search-input {{
+    width: 100%;
+    padding: 8px 12px;
+    border: 1px solid {COLORS['border']};
+    border-radius: 6px;
+    font: inherit;
+    font-size: 14px;
+}}
+.search-input:focus {{ outline: none; border-color: {COLORS['primary']}; }}
+.search-results a {{
+    display: block;
+    padding: 6px 12px;
+    color: {COLORS['text']};
+    text-decoration: none;
+    font-size: 14px;
+    border-radius: 6px;
+}}
+.search-results a:hover {{ background: {COLORS['bg']}; color: {COLORS['primary']}; }}
+.search-empty {{ padding: 6px 12px; font-size: 13px; color: #5A6F77; }}
+'''
+
+# Grouped notebook navigation, shared with the single-page site
+NAV_CSS = f'''
+.notebook-nav details {{ margin: 4px 0; }}
+.notebook-nav summary {{
+    cursor: pointer;
+    padding: 6px 12px;
+    font-size: 13px;
+    font-weight: 600;
+    color: {COLORS['text']};
+}}
+.notebook-nav details > .nav-link,
+.notebook-nav details > details {{ margin-left: 12px; }}
+'''
+
+SITE_DIR = 'site'
+ASSETS_DIR = 'assets'
+SEARCH_INDEX = 'search/index.json'
+NAV_INDEX = 'nav.json'
+
+
+def write_hashed_asset(site_dir, prefix, content, ext='css'):
+    """Write `content` to assets/<prefix>.<hash>.<ext> once; returns the site-relative href"""
+    data = content.encode('utf-8')
+    href = f'{ASSETS_DIR}/{prefix}.{hashlib.sha256(data).hexdigest()[:16]}.{ext}'
+    path = os.path.join(site_dir, href)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return href
+
+
+def stylesheet_link(href):
+    return f'    <link rel="stylesheet" href="{href}">\n'
+
+
+def site_title():
+    """Title derived from the GitHub repository name"""
+    repo_name = os.environ.get('GITHUB_REPOSITORY', '').split('/')[-1]
+    return ' '.join(word.capitalize() for word in repo_name.split('-')) + ' Accelerator'
+
+
+def display_name(notebook_name):
+    return notebook_name.replace('_', ' ').title()
+
+
+def search_widget(link_format):
+    """Sidebar search box; `link_format` turns a notebook id into a URL, e.g. '{id}.html'
+
+    It stays hidden until the search script has loaded the index.
+    """
+    return f'''            <div class="search" data-search-index="{SEARCH_INDEX}" data-search-link="{link_format}" hidden>
+                <input type="search" class="search-input" placeholder="Search notebooks" aria-label="Search notebooks">
+                <div class="search-results"></div>
+            </div>
+'''
+
+
+def nav_widget(link_format, current=''):
+    """Sidebar notebook list, filled in by the navigation script from nav.json
+
+    `link_format` turns a notebook id into a URL, e.g. '{id}.html'; the
+    `current` notebook is marked active and its groups opened.
+    """
+    return f'''            <nav id="notebook-nav" class="notebook-nav" data-nav="{NAV_INDEX}" data-nav-link="{link_format}" data-current="{current}"></nav>
+'''
+
+
+def render_header(title):
+    """Fixed page header with logo, title and GitHub link"""
+    return f'''    <div class="header">
+        <img src="{LOGO_URL}" 
+             class="logo" alt="Databricks">
+        <div class="title">{title}</div>
+        <a href="{os.environ.get('GITHUB_SERVER_URL', '')}/{os.environ.get('GITHUB_REPOSITORY', '')}" 
+           class="github-link">View on GitHub</a>
+    </div>
+'''
+
+
+class SiteTemplate:
+    """Static page shell for one build, rendered once and shared by every page"""
+
+    def __init__(self, site_dir=SITE_DIR, search_script=None, nav_script=None):
+        self.title = site_title()
+        self.site_dir = site_dir
+        self.search_script = search_script
+        self.nav_script = nav_script
+        self.stylesheet = write_hashed_asset(
+            site_dir, 'site', textwrap.dedent(NOTEBOOK_PAGE_CSS) + SEARCH_CSS + NAV_CSS)
+        self.index_stylesheet = write_hashed_asset(
+            site_dir, 'index', textwrap.dedent(INDEX_PAGE_CSS) + SEARCH_CSS + NAV_CSS)
+        # Notebook style blocks are deduplicated by content across pages
+        self.style_assets = {}
+        header = render_header(self.title)
+        search = ''
+        script = ''
+        if search_script:
+            search = search_widget('{id}.html')
+            script = f'    <script src="{search_script}" defer></script>\n'
+        if nav_script:
+            script += f'    <script src="{nav_script}" defer></script>\n'
+
+        self.notebook_head = f'''</title>
+    <link href="{FONTS_URL}" rel="stylesheet">
+{stylesheet_link(self.stylesheet)}{script}'''
+        self.notebook_shell = f'''</head>
+<body>
+{header}    <div class="main-container">
+        <div class="sidebar">
+{search}            <h3>📚 Documentation</h3>
+            <a href="index.html" class="nav-link">Overview</a>
+            <h3 style="margin-top: 30px;">📓 Notebooks</h3>
+            <noscript><a href="index.html" class="nav-link">All notebooks</a></noscript>
+'''
+        self.index_shell = f'''<!DOCTYPE html>
+<html>
+<head>
+    <title>{self.title}</title>
+    <link href="{FONTS_URL}" rel="stylesheet">
+{stylesheet_link(self.index_stylesheet)}{script}</head>
+<body>
+{header}    <div class="main-container">
+        <div class="sidebar">
+{search}            <h3>📚 Documentation</h3>
+            <a href="index.html" class="nav-link active">Overview</a>
+'''
+
+    def notebook_style_asset(self, style_content):
+        """Href of the stylesheet holding a notebook's own styles, or None"""
+        if not style_content.strip():
+            return None
+        href = self.style_assets.get(style_content)
+        if href is None:
+            # Original Databricks styles, scoped to the notebook container
+            css = f'.notebook-container {{\n{style_content}\n}}\n'
+            href = write_hashed_asset(self.site_dir, 'notebook', css)
+            self.style_assets[style_content] = href
+        return href
+
+    def notebook_assets(self, style_content):
+        """Site-relative hrefs of the stylesheets a notebook page links to"""
+        style_href = self.notebook_style_asset(style_content)
+        return [self.stylesheet] + ([style_href] if style_href else [])
+
+    def notebook_page_parts(self, notebook_name, style_content):
+        """Return (parts before the body, parts after the body) for a notebook page"""
+        before = [
+            '<!DOCTYPE html>\n<html>\n<head>\n    <title>',
+            display_name(notebook_name), ' - ', self.title,
+            self.notebook_head,
+        ]
+        style_href = self.notebook_style_asset(style_content)
+        if style_href:
+            before.append(stylesheet_link(style_href))
+        before += [self.notebook_shell, nav_widget('{id}.html', notebook_name), NOTEBOOK_PAGE_MIDDLE]
+        return before, [NOTEBOOK_PAGE_END]
+
+    def render_notebook_page(self, notebook_name, style_content, body_content):
+        before, after = self.notebook_page_parts(notebook_name, style_content)
+        return ''.join(before + [body_content] + after)
+
+    def render_index_page(self, readme_html, exported):
+        """Overview page listing the exported notebooks
+
+        The list is rendered by the navigation script as on every other
+        page; a plain list of links stands in for it without JavaScript.
+        """
+        parts = [self.index_shell]
+        if exported:
+            parts.append('            <h3 style="margin-top: 30px;">📓 Notebooks</h3>\n')
+            parts.append(nav_widget('{id}.html'))
+            parts.append('            <noscript>\n')
+            for nb in sorted(exported):
+                parts.append(f'            <a href="{nb}.html" class="nav-link">{display_name(nb)}</a>\n')
+            parts.append('            </noscript>\n')
+        parts.append(f'''
+        </div>
+        <div class="content">
+            <div class="content-container">
+                {readme_html}
+            </div>
+        </div>
+    </div>
+</body>
+</html>''')
+        return ''.join(parts)
+
+
+NOTEBOOK_PAGE_MIDDLE = '''
+        </div>
+        <div class="content">
+            <div class="notebook-container">
+                '''
+
+NOTEBOOK_PAGE_END = '''
+            </div>
+        </div>
+    </div>
+</body>
+</html>'''
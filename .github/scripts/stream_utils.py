@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Helpers for handling large notebook exports without holding them in memory.
+Exports are decoded from the API response into a file chunk by chunk, and
+pages are assembled by copying byte ranges out of that file.
+"""
+
+import base64
+import binascii
+import hashlib
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def decode_base64_json_field(chunks, out, field=b'content'):
+    """Stream-decode a base64 string field of a JSON document into `out`
+
+    `chunks` is an iterable of bytes (e.g. response.iter_content()). Only the
+    undecoded tail of the current chunk is buffered. Returns the SHA-256 hex
+    digest of the decoded bytes.
+    """
+    key = b'"' + field + b'"'
+    digest = hashlib.sha256()
+    buf = b''
+    state = 'key'
+    pending = b''
+
+    for chunk in chunks:
+        buf += chunk
+        if state == 'key':
+            pos = buf.find(key)
+            if pos < 0:
+                buf = buf[-len(key):]
+                continue
+            buf = buf[pos + len(key):]
+            state = 'colon'
+        if state == 'colon':
+            stripped = buf.lstrip(b' \t\r\n:')
+            if not stripped:
+                buf = b''
+                continue
+            if not stripped.startswith(b'"'):
+                raise ValueError(f'JSON field {field.decode()} is not a string')
+            buf = stripped[1:]
+            state = 'value'
+        if state == 'value':
+            end = buf.find(b'"')
+            data = buf if end < 0 else buf[:end]
+            # Base64 never needs escaping, but JSON encoders may write '/' as '\/'
+            pending += data.replace(b'\\', b'')
+            usable = len(pending) - len(pending) % 4
+            if usable:
+                decoded = base64.b64decode(pending[:usable])
+                digest.update(decoded)
+                out.write(decoded)
+                pending = pending[usable:]
+            buf = b''
+            if end >= 0:
+                state = 'done'
+                break
+
+    if state != 'done':
+        raise ValueError(f'JSON field {field.decode()} not found or truncated')
+    if pending:
+        try:
+            decoded = base64.b64decode(pending)
+        except binascii.Error as e:
+            raise ValueError(f'Invalid base64 in {field.decode()}: {e}') from e
+        digest.update(decoded)
+        out.write(decoded)
+    return digest.hexdigest()
+
+
+def read_range(f, start, end):
+    f.seek(start)
+    return f.read(end - start)
+
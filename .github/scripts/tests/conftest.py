@@ -0,0 +1,30 @@
+"""
+Shared fixtures: the scripts and benchmarks directories on sys.path, and a
+stub workspace API served on a local port.
+
+Run with: python3 -m pytest .github/scripts/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'benchmarks'))
+
+from stub_workspace import StubWorkspace, start_stub_server  # noqa: E402
+
+
+@pytest.fixture
+def workspace():
+    return StubWorkspace()
+
+
+@pytest.fixture
+def stub_url(workspace):
+    server, base_url = start_stub_server(workspace)
+    yield base_url
+    server.shutdown()
+    server.server_close()
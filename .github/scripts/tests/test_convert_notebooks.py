@@ -0,0 +1,49 @@
+import json
+
+from convert_notebooks import convert_to_html_fragment
+
+
+def write_ipynb(path, outputs):
+    notebook = {
+        'metadata': {'kernelspec': {'language': 'python'}},
+        'cells': [{'cell_type': 'code', 'source': 'show()', 'outputs': outputs}],
+    }
+    path.write_text(json.dumps(notebook))
+    return str(path)
+
+
+def display(data):
+    return {'output_type': 'display_data', 'data': data}
+
+
+def test_javascript_output_is_kept_as_a_script(tmp_path):
+    path = write_ipynb(tmp_path / 'js.ipynb', [
+        display({'application/javascript': 'Bokeh.embed("x");', 'text/plain': '<Figure>'}),
+    ])
+    _, fragment = convert_to_html_fragment(path)
+    assert '<script type="text/javascript">\nBokeh.embed("x");\n</script>' in fragment
+    assert '&lt;Figure&gt;' not in fragment
+
+
+def test_html_preferred_over_javascript(tmp_path):
+    path = write_ipynb(tmp_path / 'both.ipynb', [
+        display({'text/html': '<div id="plot"></div>', 'application/javascript': 'draw();'}),
+    ])
+    _, fragment = convert_to_html_fragment(path)
+    assert '<div id="plot"></div>' in fragment
+    assert 'draw();' not in fragment
+
+
+def test_latex_output(tmp_path):
+    path = write_ipynb(tmp_path / 'latex.ipynb', [display({'text/latex': '$x^2$'})])
+    assert 'output_latex">\n$x^2$' in convert_to_html_fragment(path)[1]
+
+
+def test_unrenderable_output_is_reported(tmp_path, capsys):
+    path = write_ipynb(tmp_path / 'widget.ipynb', [
+        display({'application/vnd.jupyter.widget-view+json': {'model_id': 'abc'}}),
+    ])
+    convert_to_html_fragment(path)
+    out = capsys.readouterr().out
+    assert 'widget.ipynb' in out
+    assert 'application/vnd.jupyter.widget-view+json' in out
@@ -0,0 +1,94 @@
+import os
+import json
+
+import pytest
+
+import export_databricks_notebooks
+from stub_workspace import notebook_html, notebook_source
+
+ROOT = '/Workspace/Users/stub@example.com/accelerator'
+
+
+def nav_ids(tree):
+    ids = {notebook for notebook, _ in tree['notebooks']}
+    for group in tree['groups']:
+        ids |= nav_ids(group)
+    return ids
+
+
+@pytest.fixture
+def export(workspace, stub_url, tmp_path, monkeypatch):
+    """Run export_site() in a scratch checkout against the stub; returns the runner"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('SKIP_SITE_POSTPROCESS', '1')
+    monkeypatch.setenv('GITHUB_REPOSITORY', 'org/demo')
+    for name, value in [('DATABRICKS_HOST', stub_url), ('WORKSPACE_ROOT', '/Workspace/Users'), ('EXPORT_DIRECTORY', ''),
+                        ('WRAP_PROCESSES', 1), ('EXPORT_CONCURRENCY', 2), ('_client', None)]:
+        monkeypatch.setattr(export_databricks_notebooks, name, value)
+    export_databricks_notebooks.get_site_template.cache_clear()
+    os.makedirs('notebooks')
+
+    def add(name, folder='', root=ROOT):
+        with open(f'notebooks/{name}.py', 'w') as f:
+            f.write(notebook_source(name))
+        workspace.add_notebook(f'{root}/{folder}{name}', notebook_html(name), modified_at=1000)
+
+    def run(mode='html'):
+        export_databricks_notebooks._client = None
+        export_databricks_notebooks.export_site(mode)
+        with open('site/nav.json') as f:
+            nav = json.load(f)['tree']
+        with open('site/index.html') as f:
+            return nav_ids(nav), f.read()
+
+    run.add = add
+    yield run
+    export_databricks_notebooks.get_site_template.cache_clear()
+
+
+def test_failed_rewrap_is_not_linked(export, capfd):
+    export.add('first')
+    export.add('second')
+    assert export()[0] == {'first', 'second'}
+
+    # 'second' is unchanged in the workspace but its page has to be re-wrapped,
+    # and the cached export it is wrapped from can no longer be read
+    manifest = export_databricks_notebooks.ExportManifest(export_databricks_notebooks.EXPORT_MANIFEST)
+    os.remove('site/second.html')
+    os.remove(manifest.export_path('second'))
+    os.mkdir(manifest.export_path('second'))
+
+    linked, index_html = export()
+    assert linked == {'first'}
+    assert 'second.html' not in index_html
+    assert 'Failed to write page for second' in capfd.readouterr().out
+
+
+def has_outputs(name):
+    # Only the HTML export carries the notebook's results; an archive render shows the code
+    with open(f'site/{name}.html') as f:
+        return f'<p>Paragraph 0 of {name}</p>' in f.read()
+
+
+def test_html_mode_replaces_archive_exports(export):
+    export.add('first')
+    export.add('second', 'sub/')
+    export('archive')
+    assert not has_outputs('first') and not has_outputs('second')
+
+    export('html')
+    assert has_outputs('first') and has_outputs('second')
+
+    # HTML exports are reused by a later archive run
+    export('archive')
+    assert has_outputs('first') and has_outputs('second')
+
+
+def test_archive_refused_at_workspace_root(export, capfd):
+    export.add('first', root='/Workspace/Users/a@example.com')
+    export.add('second', root='/Workspace/Users/b@example.com')
+    assert export('archive')[0] == {'first', 'second'}
+    out = capfd.readouterr().out
+    assert 'not below /Workspace/Users' in out
+    assert 'as one SOURCE archive' not in out
+    assert has_outputs('first') and has_outputs('second')
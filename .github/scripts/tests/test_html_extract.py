@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+from html_extract import scan_html
+
+CHUNK_SIZES = [1, 2, 5, 16, 17, 4096]
+
+
+def extract(html, chunk_size):
+    data = html.encode('utf-8')
+    result = scan_html(io.BytesIO(data), chunk_size=chunk_size)
+    body = data[result.body[0]:result.body[1]].decode('utf-8') if result.body else None
+    return [data[start:end].decode('utf-8') for start, end in result.styles], body
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_styles_and_body(chunk_size):
+    html = ('<!DOCTYPE html><html><head><style>.a { color: red; }</style>'
+            '<STYLE type="text/css">.b {}</STYLE></head><body class="x"><p>hi</p></body></html>')
+    assert extract(html, chunk_size) == (['.a { color: red; }', '.b {}'], '<p>hi</p>')
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_body_inside_script_string(chunk_size):
+    html = ('<html><head><script>var s = "<body>fake</body>"; var t = \'</body>\';</script></head>'
+            '<body><p>real</p><script>document.write("</body>" + "<style>x</style>")</script></body></html>')
+    styles, body = extract(html, chunk_size)
+    assert styles == []
+    assert body == '<p>real</p><script>document.write("</body>" + "<style>x</style>")</script>'
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_body_inside_comment(chunk_size):
+    html = ('<html><head><!-- <body>old</body> <style>.old {}</style> --></head>'
+            '<body><!-- </body> -->content</body></html>')
+    assert extract(html, chunk_size) == ([], '<!-- </body> -->content')
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_body_inside_attribute_value(chunk_size):
+    html = ('<html><head><meta content="<body>" name=\'</body>\'></head>'
+            '<body data-x="a > b" title=\'</body>\'>text</body></html>')
+    assert extract(html, chunk_size)[1] == 'text'
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_unclosed_body_runs_to_end(chunk_size):
+    assert extract('<html><body><p>cut off', chunk_size) == ([], '<p>cut off')
+
+
+def test_no_body():
+    assert extract('<html><head></head></html>', 4096) == ([], None)
@@ -0,0 +1,105 @@
+import io
+import os
+import base64
+
+import pytest
+
+from large_outputs import IMAGES_DIR, OutputLimits, OutputRewriter
+
+IMAGE = bytes(range(256)) * 12
+IMAGE_URI = 'data:image/png;base64,' + base64.b64encode(IMAGE).decode('ascii')
+
+
+def rewrite(site_dir, html, **limits):
+    data = html.encode('utf-8')
+    out = io.BytesIO()
+    assets = OutputRewriter(str(site_dir), OutputLimits(**limits)).copy_body(data, 0, len(data), out)
+    return out.getvalue().decode('utf-8'), assets
+
+
+def test_inline_image_is_externalized_once(tmp_path):
+    html = f'<p>plot</p><img alt="x" src="{IMAGE_URI}">'
+    first, first_assets = rewrite(tmp_path, html)
+    second, second_assets = rewrite(tmp_path, f'<div>{html}</div>')
+
+    [href] = first_assets
+    assert second_assets == [href]
+    assert href.startswith(f'{IMAGES_DIR}/') and href.endswith('.png')
+    assert first == f'<p>plot</p><img alt="x" src="{href}" loading="lazy">'
+    assert second == f'<div>{first}</div>'
+    assert os.listdir(tmp_path / IMAGES_DIR) == [os.path.basename(href)]
+    assert (tmp_path / href).read_bytes() == IMAGE
+
+
+def test_small_inline_image_stays(tmp_path):
+    html = f'<img src="{IMAGE_URI}">'
+    assert rewrite(tmp_path, html, inline_image_bytes=len(IMAGE_URI) * 2) == (
+        f'<img src="{IMAGE_URI}" loading="lazy">', [])
+
+
+@pytest.mark.parametrize('tag, expected', [
+    ('<img src="a.png">', '<img src="a.png" loading="lazy">'),
+    ("<img src='a.png'>", "<img src='a.png' loading=\"lazy\">"),
+    ('<img src=a.png>', '<img src=a.png loading="lazy">'),
+    ('<img src="a.png"/>', '<img src="a.png" loading="lazy"/>'),
+    ('<img src="a.png" />', '<img src="a.png" loading="lazy" />'),
+    ('<img src="a.png" / >', '<img src="a.png" loading="lazy" / >'),
+    ('<IMG SRC="a.png"\n  alt="b">', '<IMG SRC="a.png"\n  alt="b" loading="lazy">'),
+    ('<img src="a.png" / alt="b">', '<img src="a.png" / alt="b" loading="lazy">'),
+    # An unquoted value keeps its trailing '/'
+    ('<img src=a/>', '<img src=a/ loading="lazy">'),
+])
+def test_lazy_loading(tmp_path, tag, expected):
+    assert rewrite(tmp_path, f'<p>{tag}</p>') == (f'<p>{expected}</p>', [])
+
+
+@pytest.mark.parametrize('html', [
+    '<img src="a.png" loading="eager">',
+    '<img loading=lazy src="a.png">',
+    f'<script>var s = \'<img src="{IMAGE_URI}">\';</script>',
+    f'<style>/* <img src="{IMAGE_URI}"> */</style>',
+    f'<!-- <img src="{IMAGE_URI}"> -->',
+])
+def test_left_alone(tmp_path, html):
+    assert rewrite(tmp_path, html) == (html, [])
+    assert not os.path.exists(tmp_path / IMAGES_DIR)
+
+
+def truncate(tmp_path, text, preview=40):
+    html = f'<pre class="ansiout">{text}</pre>'
+    out, [href] = rewrite(tmp_path, html, text_output_bytes=100, text_preview_bytes=preview)
+    full = (tmp_path / href).read_text(encoding='utf-8')
+    assert f'<pre class="ansiout">{text}</pre>' in full
+    assert out.startswith('<pre class="ansiout">') and out.endswith('</pre>')
+    preview_text, link = out[len('<pre class="ansiout">'):-len('</pre>')].split('\n<a ', 1)
+    assert f'href="{href}"' in link and 'Show full output' in link
+    assert text.startswith(preview_text)
+    return preview_text
+
+
+def test_truncated_at_last_newline(tmp_path):
+    lines = ''.join(f'line {i:02d}\n' for i in range(30))
+    assert truncate(tmp_path, lines, preview=44) == lines[:40]
+
+
+def test_truncated_without_newline_keeps_utf8_whole(tmp_path):
+    text = 'é' * 100
+    preview = truncate(tmp_path, text, preview=41)
+    assert preview == 'é' * 20
+
+
+def test_truncated_without_newline_keeps_entity_whole(tmp_path):
+    text = 'x' * 37 + '&amp;' + 'y' * 100
+    assert truncate(tmp_path, text) == 'x' * 37
+
+
+def test_truncated_without_newline_keeps_tag_whole(tmp_path):
+    text = 'x' * 35 + '<span class="ansi-red">' + 'y' * 100 + '</span>'
+    assert truncate(tmp_path, text) == 'x' * 35
+
+
+def test_code_and_short_outputs_are_not_truncated(tmp_path):
+    long_code = '<pre class="code">' + 'x' * 500 + '</pre>'
+    short_output = '<pre class="ansiout">' + 'x' * 50 + '</pre>'
+    for html in (long_code, short_output):
+        assert rewrite(tmp_path, html, text_output_bytes=100, text_preview_bytes=40) == (html, [])
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from bench_parser import iter_notebook_cells
+from convert_notebooks import iter_mapped_cells
+from corpus import generate_databricks_notebook, generate_notebook
+from highlight import DEFAULT_LANGUAGE, split_magic
+
+EDGE_CASES = [
+    '',
+    '# Databricks notebook source',
+    '# Databricks notebook source\n',
+    'x = 1',
+    '# COMMAND ----------\n# COMMAND ----------\n',
+    '# Databricks notebook source\r\n# MAGIC %md\r\n# MAGIC # Hi\r\n\r\n# COMMAND ----------\r\n\r\nprint(1)\r\n',
+    '# DBTITLE 1,First title\n# MAGIC %md\n# MAGIC text\n# DBTITLE 1,Second\nplain line\n# COMMAND ----------  \n\n\n  \n',
+    '# MAGIC %sql\n# MAGIC SELECT 1\n# COMMAND ----------\n# DBTITLE 0,only title\n# COMMAND ----------\n   indented\n\n',
+    '\n\n# MAGIC %md some heading\n#MAGIC nope\n# MAGICx\n# COMMAND ----------',
+    'a\n# COMMAND ---------- trailing\nb',
+    'héllo wörld ✓\n# COMMAND ----------\n# MAGIC %md\n# MAGIC ünï\n',
+    '\t\n# COMMAND ----------\n\t\t\n',
+]
+# Lines the random notebooks are made of
+PIECES = ['# COMMAND ----------', '# MAGIC %md', '# MAGIC x', '# MAGIC', '# DBTITLE 1,t', '', '  ', 'code',
+          '# MAGIC %sql', '# Databricks notebook source', '\r']
+
+
+def assert_same_cells(path):
+    """iter_mapped_cells() reads the cells the line-by-line parser reads, with their magic's language"""
+    with open(path, encoding='utf-8') as f:
+        expected = list(iter_notebook_cells(f))
+    with open(path, encoding='utf-8') as f:
+        cells = list(iter_mapped_cells(f))
+    assert [cell[:3] for cell in cells] == [cell[:3] for cell in expected]
+    for cell in cells:
+        if cell.type == 'code':
+            assert cell.language == split_magic(cell.content)[1]
+        else:
+            assert cell.language == 'markdown'
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+    return path
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_generated_notebooks(tmp_path, seed):
+    assert_same_cells(generate_notebook(str(tmp_path / 'cells.py'), cells=60, seed=seed))
+    assert_same_cells(generate_databricks_notebook(str(tmp_path / 'large.py'), 50_000, seed=seed))
+
+
+@pytest.mark.parametrize('text', EDGE_CASES)
+def test_edge_cases(tmp_path, text):
+    assert_same_cells(write(tmp_path / 'edge.py', text))
+
+
+def test_random_notebooks(tmp_path):
+    rng = random.Random(1)
+    for _ in range(3000):
+        text = '\n'.join(rng.choice(PIECES) for _ in range(rng.randint(0, 12)))
+        assert_same_cells(write(tmp_path / 'random.py', text))
+
+
+def test_magic_language(tmp_path):
+    path = write(tmp_path / 'magic.py', '# MAGIC %sql\n# MAGIC SELECT 1\n# COMMAND ----------\nx = 1\n')
+    with open(path, encoding='utf-8') as f:
+        assert [cell.language for cell in iter_mapped_cells(f)] == ['sql', DEFAULT_LANGUAGE]
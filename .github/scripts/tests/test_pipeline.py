@@ -0,0 +1,43 @@
+import os
+import pstats
+
+import pytest
+
+import instrumentation
+from pipeline import Stage, run_pipeline
+
+
+# Stage functions are top-level so the spawned pool workers can import them
+
+def square(n):
+    return n * n
+
+
+def increment(n):
+    return n + 1
+
+
+def drop_odd(n):
+    return None if n % 2 else n
+
+
+def profiled_calls(path):
+    """Name -> primitive call count of this module's functions in a profile dump"""
+    return {name: stat[0] for (filename, _, name), stat in pstats.Stats(str(path)).stats.items()
+            if os.path.basename(filename) == os.path.basename(__file__)}
+
+
+@pytest.mark.parametrize('processes', [False, True])
+def test_results_and_dropped_items(processes):
+    stages = [Stage('square', square, workers=2, processes=processes), Stage('drop', drop_odd, workers=2)]
+    assert sorted(run_pipeline(range(6), stages)) == [0, 4, 16]
+
+
+def test_profile_includes_worker_threads_and_processes(tmp_path, capsys):
+    stages = [Stage('square', square, workers=2, processes=True), Stage('increment', increment, workers=2)]
+    with instrumentation.instrumented('run', profile=True, profile_dir=str(tmp_path)):
+        assert sorted(run_pipeline(range(5), stages)) == [1, 2, 5, 10, 17]
+    calls = profiled_calls(tmp_path / 'run.prof')
+    assert calls['square'] == 5
+    assert calls['increment'] == 5
+    assert 'run.prof' in capsys.readouterr().out
@@ -0,0 +1,27 @@
+import os
+
+from postprocess_site import postprocess_site
+
+PAGE = '<html>\n  <body>\n    <p>text</p>\n    <pre>  kept  </pre>\n  </body>\n</html>\n'
+
+
+def make_site(tmp_path):
+    (tmp_path / 'index.html').write_text(PAGE)
+    (tmp_path / 'nav.json').write_text('{"version": 1}')
+    return str(tmp_path)
+
+
+def test_minifies_without_compressing_by_default(tmp_path, monkeypatch):
+    monkeypatch.delenv('SITE_PRECOMPRESS', raising=False)
+    site = make_site(tmp_path)
+    postprocess_site(site, jobs=1, report=False)
+    assert sorted(os.listdir(site)) == ['index.html', 'nav.json']
+    html = (tmp_path / 'index.html').read_text()
+    assert len(html) < len(PAGE) and '<pre>  kept  </pre>' in html
+
+
+def test_precompress_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setenv('SITE_PRECOMPRESS', '1')
+    site = make_site(tmp_path)
+    postprocess_site(site, jobs=1, report=False)
+    assert {'index.html.gz', 'nav.json.gz'} <= set(os.listdir(site))
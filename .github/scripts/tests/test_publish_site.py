@@ -0,0 +1,80 @@
+import os
+import json
+
+import pytest
+
+from publish_site import publish
+from watch_site import SiteWatcher
+
+
+def notebook(title, code):
+    return f'# Databricks notebook source\n# MAGIC %md\n# MAGIC # {title}\n\n# COMMAND ----------\n\n{code}\n'
+
+
+@pytest.fixture
+def checkout(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('notebooks')
+    (tmp_path / 'README.md').write_text('# Accelerator\n')
+    (tmp_path / 'notebooks' / 'intro.py').write_text(notebook('Intro', 'print("hello")'))
+    return tmp_path
+
+
+def site_files(site_dir):
+    files = {}
+    for root, _, filenames in os.walk(site_dir):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, site_dir)] = f.read()
+    return files
+
+
+def manifest(site_dir):
+    with open(os.path.join(site_dir, 'manifest.json')) as f:
+        return json.load(f)
+
+
+def test_publish_writes_sections_manifest_and_shell(checkout):
+    assert publish('site') == (1, 0)
+    sections = manifest('site')['sections']
+    assert [entry['id'] for entry in sections] == ['intro']
+    assert os.path.exists(os.path.join('site', sections[0]['src']))
+    assert 'Accelerator' in (checkout / 'site' / 'index.html').read_text()
+
+
+def test_name_collision_is_skipped_not_failed(checkout, capsys):
+    (checkout / 'notebooks' / 'intro.ipynb').write_text('{"cells": []}')
+    assert publish('site') == (1, 0)
+    out = capsys.readouterr().out
+    assert 'Skipping notebooks/intro.ipynb: notebooks/intro.py has the same notebook name' in out
+    assert 'Failed to convert' not in out
+    sections = manifest('site')['sections']
+    assert [entry['id'] for entry in sections] == ['intro']
+    assert os.listdir(os.path.join('site', os.path.dirname(sections[0]['src']))) == [
+        os.path.basename(sections[0]['src'])]
+
+
+def test_failed_conversion_is_counted(checkout, capsys):
+    (checkout / 'notebooks' / 'broken.ipynb').write_text('not json')
+    assert publish('site') == (1, 1)
+    assert 'Failed to convert notebooks/broken.ipynb' in capsys.readouterr().out
+
+
+def test_watcher_builds_the_same_site_as_publish(checkout):
+    publish('published')
+    SiteWatcher('watched', use_cache=False).build(['notebooks/intro.py'])
+    assert site_files('watched') == site_files('published')
+
+
+def test_watcher_update_rewrites_changed_notebook(checkout):
+    watcher = SiteWatcher('site', use_cache=False)
+    watcher.build(['notebooks/intro.py'])
+    old_src = manifest('site')['sections'][0]['src']
+
+    (checkout / 'notebooks' / 'intro.py').write_text(notebook('Intro', 'print("changed")'))
+    assert watcher.update(['notebooks/intro.py'])
+    new_src = manifest('site')['sections'][0]['src']
+    assert new_src != old_src
+    assert not os.path.exists(os.path.join('site', old_src))
+    assert 'changed' in (checkout / 'site' / new_src).read_text()
@@ -0,0 +1,102 @@
+import os
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from search_index import SEARCH_SCRIPT, build_search_index, tokenize
+from site_templates import SEARCH_INDEX
+
+pytestmark = pytest.mark.skipif(not shutil.which('node'), reason='node is not installed')
+
+# Loads the search script without a DOM and answers requests from stdin, one
+# JSON line each: {"tokenize": text} or {"search": query}
+NODE_HARNESS = '''
+const fs = require('fs');
+const path = require('path');
+const [scriptPath, siteDir, indexUrl] = process.argv.slice(2);
+eval(fs.readFileSync(scriptPath, 'utf8'));
+const fetchJSON = url => fs.promises.readFile(path.join(siteDir, url), 'utf8').then(JSON.parse);
+const searcher = new SiteSearch(indexUrl, fetchJSON);
+const requests = fs.readFileSync(0, 'utf8').split('\\n').filter(Boolean).map(JSON.parse);
+
+(async () => {
+    const index = await searcher.loadIndex();
+    for (const request of requests) {
+        const answer = 'tokenize' in request
+            ? SiteSearch.tokenize(request.tokenize, index.tokenizer)
+            : (await searcher.search(request.search)).map(hit => hit.id);
+        console.log(JSON.stringify(answer));
+    }
+})();
+'''
+
+TEXTS = [
+    'Show the top 10 customers by revenue',
+    'customers by revenue',
+    'the customers',
+    'top_customers = df.groupBy("customer_id").agg(sum("revenue"))',
+    '__init__ _private trailing_ a_b x__y 2024_q1 q1_2024',
+    'Ünïcödé wörds, ÇAPITALS and naïve café résumé',
+    'Numbers 10 2024 ٣٤ 3.14 v2 x86_64 abc123',
+    'Supercalifragilisticexpialidocious_and_antidisestablishmentarianism_words',
+    'a an I x y z is it to of',
+    '中文 日本語 한국어 emoji 🙂 tabs\tand\nnewlines',
+]
+
+
+@pytest.fixture
+def site(tmp_path):
+    notebooks = tmp_path / 'notebooks'
+    notebooks.mkdir()
+    sources = {
+        'sales_report': '# MAGIC %md\n# MAGIC Show the top 10 customers by revenue\n',
+        'inventory': '# MAGIC %md\n# MAGIC Stock levels per warehouse\n\n# COMMAND ----------\n\n'
+                     'top_items = stock.orderBy("level")\n',
+    }
+    paths = []
+    for name, source in sources.items():
+        path = notebooks / f'{name}.py'
+        path.write_text('# Databricks notebook source\n' + source)
+        paths.append(str(path))
+    site_dir = tmp_path / 'site'
+    build_search_index(paths, str(site_dir))
+    script = tmp_path / 'search.js'
+    script.write_text(SEARCH_SCRIPT)
+    harness = tmp_path / 'harness.js'
+    harness.write_text(NODE_HARNESS)
+
+    def run(requests):
+        result = subprocess.run(['node', str(harness), str(script), str(site_dir), SEARCH_INDEX],
+                                check=True, capture_output=True, text=True,
+                                input=''.join(json.dumps(request) + '\n' for request in requests))
+        return [json.loads(line) for line in result.stdout.splitlines()]
+
+    return run
+
+
+def test_query_tokens_match_index_tokens(site):
+    answers = site([{'tokenize': text} for text in TEXTS])
+    assert answers == [list(tokenize(text)) for text in TEXTS]
+
+
+def test_index_carries_tokenizer_rules(site, tmp_path):
+    with open(os.path.join(tmp_path, 'site', SEARCH_INDEX)) as f:
+        rules = json.load(f)['tokenizer']
+    assert {'the', 'by'} <= set(rules['stop_words'])
+    assert (rules['min_length'], rules['max_length']) == (2, 32)
+
+
+@pytest.mark.parametrize('query, hits', [
+    ('top customers', ['sales_report']),
+    ('top 10 customers', ['sales_report']),
+    ('customers by revenue', ['sales_report']),
+    ('the customers', ['sales_report']),
+    ('top_items', ['inventory']),
+    ('top', ['inventory', 'sales_report']),
+    ('the 10', []),
+    ('warehouse revenue', []),
+])
+def test_search(site, query, hits):
+    assert sorted(site([{'search': query}])[0]) == hits
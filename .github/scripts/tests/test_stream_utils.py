@@ -0,0 +1,78 @@
+import io
+import base64
+import hashlib
+import random
+
+import pytest
+
+from stream_utils import decode_base64_json_field
+
+PAYLOAD = bytes(range(256)) * 40 + b'\xff\xfe?>' * 100   # encodes with plenty of '/' and '+'
+
+
+def document(payload=PAYLOAD, escape_slashes=False):
+    encoded = base64.b64encode(payload)
+    if escape_slashes:
+        encoded = encoded.replace(b'/', b'\\/')
+    return b'{"file_type": "html", "content" : \n "' + encoded + b'", "path": "/x"}'
+
+
+def split_at(data, cuts):
+    cuts = sorted(set(cuts))
+    return [data[start:end] for start, end in zip([0] + cuts, cuts + [len(data)])]
+
+
+def decode(chunks):
+    out = io.BytesIO()
+    digest = decode_base64_json_field(chunks, out)
+    return out.getvalue(), digest
+
+
+@pytest.mark.parametrize('escape_slashes', [False, True])
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 7, 64, 4093, 1 << 20])
+def test_fixed_chunk_sizes(size, escape_slashes):
+    data = document(escape_slashes=escape_slashes)
+    decoded, digest = decode(data[i:i + size] for i in range(0, len(data), size))
+    assert decoded == PAYLOAD
+    assert digest == hashlib.sha256(PAYLOAD).hexdigest()
+
+
+@pytest.mark.parametrize('escape_slashes', [False, True])
+def test_random_splits(escape_slashes):
+    data = document(escape_slashes=escape_slashes)
+    rng = random.Random(7)
+    for _ in range(200):
+        cuts = [rng.randrange(1, len(data)) for _ in range(rng.randrange(1, 40))]
+        assert decode(split_at(data, cuts))[0] == PAYLOAD
+
+
+def test_split_inside_key_escape_and_padding():
+    data = document(b'\xfb\xff' * 7, escape_slashes=True)
+    key = data.index(b'"content"')
+    escape = data.index(b'\\/')
+    padding = data.index(b'=')
+    for cuts in ([key + 1], [key + 4, key + 8], [escape + 1], [escape, escape + 1, escape + 2], [padding],
+                 [padding + 1]):
+        assert decode(split_at(data, cuts))[0] == b'\xfb\xff' * 7
+
+
+def test_empty_chunks_are_ignored():
+    data = document()
+    assert decode([b'', data[:10], b'', data[10:], b''])[0] == PAYLOAD
+
+
+def test_missing_or_truncated_field():
+    with pytest.raises(ValueError):
+        decode([b'{"file_type": "html"}'])
+    with pytest.raises(ValueError):
+        decode([document()[:-30]])
+
+
+def test_field_that_is_not_a_string():
+    with pytest.raises(ValueError):
+        decode([b'{"content": null}'])
+
+
+def test_invalid_base64():
+    with pytest.raises(ValueError):
+        decode([b'{"content": "abc"}'])
@@ -0,0 +1,104 @@
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+import workspace_client
+from stub_workspace import notebook_html
+from workspace_client import WorkspaceClient, retry_after_seconds
+
+ROOT = '/Workspace/Users/stub@example.com'
+
+
+class FakeResponse:
+    def __init__(self, retry_after=None):
+        self.headers = {} if retry_after is None else {'Retry-After': retry_after}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Delays the client waits for, recorded instead of slept"""
+    delays = []
+    monkeypatch.setattr(workspace_client.time, 'sleep', delays.append)
+    return delays
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(FakeResponse('3')) == 3.0
+    assert retry_after_seconds(FakeResponse('1.5')) == 1.5
+    assert retry_after_seconds(FakeResponse('-4')) == 0.0
+    assert retry_after_seconds(FakeResponse()) is None
+    assert retry_after_seconds(FakeResponse('soon')) is None
+
+
+def test_retry_after_date():
+    assert 18 <= retry_after_seconds(FakeResponse(formatdate(time.time() + 20, usegmt=True))) <= 20
+    assert retry_after_seconds(FakeResponse(formatdate(time.time() - 60, usegmt=True))) == 0.0
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retries_with_retry_after_seconds(workspace, stub_url, sleeps, status):
+    workspace.add_notebook(f'{ROOT}/one', notebook_html('one'))
+    workspace.refuse_next, workspace.retry_status, workspace.retry_after = 2, status, 7
+    with WorkspaceClient(stub_url, 'stub', max_retries=3, backoff_max=30) as client:
+        objects = client.try_list(ROOT)
+    assert [obj['path'] for obj in objects] == [f'{ROOT}/one']
+    assert sleeps == [7.0, 7.0]
+    assert workspace.request_count == 3
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retries_with_retry_after_date(workspace, stub_url, sleeps, status):
+    workspace.add_notebook(f'{ROOT}/one', notebook_html('one'))
+    workspace.refuse_next, workspace.retry_status = 1, status
+    workspace.retry_after = formatdate(time.time() + 10, usegmt=True)
+    with WorkspaceClient(stub_url, 'stub', max_retries=3, backoff_max=30) as client:
+        assert client.try_list(ROOT)
+    assert len(sleeps) == 1 and 8 <= sleeps[0] <= 10
+
+
+def test_retry_after_is_capped_at_backoff_max(workspace, stub_url, sleeps):
+    workspace.refuse_next, workspace.retry_after = 1, 3600
+    with WorkspaceClient(stub_url, 'stub', backoff_max=5) as client:
+        client.try_list(ROOT)
+    assert sleeps == [5]
+
+
+def test_backoff_without_retry_after(workspace, stub_url, sleeps):
+    workspace.add_notebook(f'{ROOT}/one', notebook_html('one'))
+    workspace.refuse_next, workspace.retry_status, workspace.retry_after = 3, 503, None
+    with WorkspaceClient(stub_url, 'stub', max_retries=3, backoff_base=0.5, backoff_max=30) as client:
+        assert client.try_list(ROOT)
+    assert len(sleeps) == 3
+    assert all(0 <= delay <= 0.5 * 2 ** attempt for attempt, delay in enumerate(sleeps))
+
+
+def test_gives_up_at_retry_limit(workspace, stub_url, sleeps, capsys):
+    workspace.refuse_next, workspace.retry_after = 100, 1
+    with WorkspaceClient(stub_url, 'stub', max_retries=2) as client:
+        response = client.get('/api/2.0/workspace/list', params={'path': ROOT})
+        assert response.status_code == 429
+        assert client.try_list(ROOT) is None
+    assert workspace.request_count == 6
+    assert len(sleeps) == 4
+    assert f'Failed to list {ROOT}: 429' in capsys.readouterr().out
+
+
+# The stub sleeps for its latency, so these tests leave time.sleep alone
+
+def test_timeout_is_retried_then_raised(workspace, stub_url):
+    workspace.latency = 0.3
+    with WorkspaceClient(stub_url, 'stub', max_retries=1, timeout=(1, 0.05), backoff_base=0.01) as client:
+        with pytest.raises(requests.Timeout):
+            client.get('/api/2.0/workspace/list', params={'path': ROOT})
+    # Requests are counted once the stub's latency has passed
+    time.sleep(0.4)
+    assert workspace.request_count == 2
+
+
+def test_timeout_fails_listing(workspace, stub_url, capsys):
+    workspace.latency = 0.3
+    with WorkspaceClient(stub_url, 'stub', max_retries=0, timeout=(1, 0.05)) as client:
+        assert client.try_list(ROOT) is None
+    assert f'Failed to list {ROOT}' in capsys.readouterr().out
@@ -0,0 +1,61 @@
+import time
+
+from stub_workspace import notebook_html
+from workspace_client import WorkspaceClient
+from workspace_discovery import walk_workspace
+
+ROOT = '/Workspace/Users/stub@example.com'
+
+
+def paths(notebooks):
+    return sorted(obj['path'] for obj in notebooks)
+
+
+def test_nested_change_is_found_when_parent_is_unchanged(workspace, stub_url, tmp_path):
+    cache_path = str(tmp_path / 'index.json')
+    workspace.add_notebook(f'{ROOT}/a/b/first', notebook_html('first'), modified_at=1000)
+    with WorkspaceClient(stub_url, 'stub') as client:
+        notebooks, _ = walk_workspace(client, ROOT, cache_path)
+        assert paths(notebooks) == [f'{ROOT}/a/b/first']
+
+        # Neither /a nor /a/b changes its modified_at
+        folders = {path: obj['modified_at'] for path, obj in workspace.objects.items()
+                   if obj['object_type'] == 'DIRECTORY'}
+        workspace.add_notebook(f'{ROOT}/a/b/first', notebook_html('first'), modified_at=2000)
+        workspace.add_notebook(f'{ROOT}/a/b/second', notebook_html('second'), modified_at=2000)
+        assert folders == {path: obj['modified_at'] for path, obj in workspace.objects.items()
+                           if obj['object_type'] == 'DIRECTORY'}
+
+        notebooks, stats = walk_workspace(client, ROOT, cache_path)
+    assert paths(notebooks) == [f'{ROOT}/a/b/first', f'{ROOT}/a/b/second']
+    assert {obj['path']: obj['modified_at'] for obj in notebooks}[f'{ROOT}/a/b/first'] == 2000
+    assert stats == {'listed': 3, 'reused': 0, 'failed': 0}
+
+
+def test_failed_listing_falls_back_to_cache(workspace, stub_url, tmp_path):
+    cache_path = str(tmp_path / 'index.json')
+    workspace.add_notebook(f'{ROOT}/a/kept', notebook_html('kept'))
+    workspace.add_notebook(f'{ROOT}/b/lost', notebook_html('lost'))
+    with WorkspaceClient(stub_url, 'stub', max_retries=0) as client:
+        walk_workspace(client, ROOT, cache_path)
+        workspace.failing_paths = {f'{ROOT}/a', f'{ROOT}/b'}
+        time.sleep(0.002)
+        workspace.add_notebook(f'{ROOT}/a/new', notebook_html('new'))
+
+        notebooks, stats = walk_workspace(client, ROOT, cache_path)
+        assert paths(notebooks) == [f'{ROOT}/a/kept', f'{ROOT}/b/lost']
+        assert stats == {'listed': 1, 'reused': 2, 'failed': 0}
+
+        workspace.failing_paths = set()
+        notebooks, _ = walk_workspace(client, ROOT, cache_path)
+    assert paths(notebooks) == [f'{ROOT}/a/kept', f'{ROOT}/a/new', f'{ROOT}/b/lost']
+
+
+def test_failed_listing_without_cache_is_skipped(workspace, stub_url):
+    workspace.add_notebook(f'{ROOT}/a/one', notebook_html('one'))
+    workspace.add_notebook(f'{ROOT}/b/two', notebook_html('two'))
+    workspace.failing_paths = {f'{ROOT}/a'}
+    with WorkspaceClient(stub_url, 'stub', max_retries=0) as client:
+        notebooks, stats = walk_workspace(client, ROOT)
+    assert paths(notebooks) == [f'{ROOT}/b/two']
+    assert stats == {'listed': 2, 'reused': 0, 'failed': 1}
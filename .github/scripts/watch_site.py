@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Local preview of the single-page site for accelerator authors.
+The site is built once, served over HTTP, and then kept up to date while
+notebooks/ and README.md are edited: only a changed notebook is converted
+again, and only its section, the navigation manifest and the search index
+are rewritten (a README change rewrites the shell page alone). Open pages
+reload themselves through a Server-Sent Events stream.
+
+Changes are found by polling file sizes and modification times, which needs
+no extra dependency and costs a few hundred stat calls per poll.
+
+Usage: python3 .github/scripts/publish_site.py --watch [--port 8000]
+"""
+
+import os
+import glob
+import time
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from build_site import load_readme_html, write_manifest, write_shell, write_shell_assets
+from convert_notebooks import CELL_READERS, NOTEBOOK_PATTERNS, cache_salt, convert_notebook
+from fragment_cache import FragmentCache, DEFAULT_CACHE_DIR
+from highlight import DEFAULT_CELL_CACHE_DIR, highlight_salt
+from publish_site import publish_notebooks, unique_notebooks, write_notebook
+from search_index import notebook_sources, write_search_index
+from site_templates import SITE_DIR
+
+README_PATH = 'README.md'
+POLL_INTERVAL = 0.2
+RELOAD_PATH = '/__reload'
+# Sent to open reload streams this often so dead connections are noticed
+KEEPALIVE_SECONDS = 15
+
+RELOAD_SCRIPT = f'''<script>
+new EventSource("{RELOAD_PATH}").onmessage = () => location.reload();
+</script>
+'''.encode('utf-8')
+
+
+def watched_files(patterns=NOTEBOOK_PATTERNS, readme_path=README_PATH):
+    """Path -> (mtime, size) for every local notebook and the README"""
+    files = {}
+    for path in [readme_path] + [path for pattern in patterns for path in glob.glob(pattern)]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def changed_paths(before, after):
+    """Paths added, modified or removed between two watched_files() snapshots"""
+    return sorted(path for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+
+
+class Reloader:
+    """Tells every open page to reload after a rebuild"""
+
+    def __init__(self):
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def notify(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, version, timeout):
+        """Wait until the version moves past `version`; returns the current version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """Serves the site uncached, with the reload script added to HTML pages"""
+    reloader = None
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == RELOAD_PATH:
+            self.send_reload_stream()
+        elif path.endswith(('/', '.html')):
+            self.send_html(path)
+        else:
+            super().do_GET()
+
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+
+    def send_html(self, path):
+        filepath = self.translate_path(path)
+        if os.path.isdir(filepath):
+            filepath = os.path.join(filepath, 'index.html')
+        try:
+            with open(filepath, 'rb') as f:
+                page = f.read()
+        except OSError:
+            self.send_error(404)
+            return
+        body_end = page.rfind(b'</body>')
+        page = page[:body_end] + RELOAD_SCRIPT + page[body_end:] if body_end >= 0 else page + RELOAD_SCRIPT
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def send_reload_stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        version = self.reloader.version
+        try:
+            while True:
+                current = self.reloader.wait(version, KEEPALIVE_SECONDS)
+                message = f'data: {current}\n\n' if current != version else ': keepalive\n\n'
+                self.wfile.write(message.encode('utf-8'))
+                self.wfile.flush()
+                version = current
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_preview_server(site_dir, reloader, host='127.0.0.1', port=8000):
+    """Serve `site_dir` in a daemon thread; returns (server, url)"""
+    handler = type('Handler', (PreviewHandler,), {'reloader': reloader})
+    server = ThreadingHTTPServer((host, port), partial(handler, directory=site_dir))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}/'
+
+
+class SiteWatcher:
+    """The site's sections, navigation and search terms, updated one file at a time"""
+
+    def __init__(self, site_dir=SITE_DIR, jobs=1, use_cache=True):
+        self.site_dir = site_dir
+        self.jobs = jobs
+        self.cache = self.cell_cache = None
+        if use_cache:
+            self.cache = FragmentCache(DEFAULT_CACHE_DIR, salt=cache_salt())
+            self.cell_cache = FragmentCache(DEFAULT_CELL_CACHE_DIR, salt=highlight_salt())
+        self.entries = {}   # notebook name -> manifest entry
+        self.sources = {}   # notebook name -> path it was converted from
+        self.terms = {}     # notebook name -> search term frequencies
+        self.asset_hrefs = None
+
+    def build(self, paths):
+        """Convert every notebook and write the whole site"""
+        for name, job in publish_notebooks(unique_notebooks(paths).values(), self.site_dir, self.jobs,
+                                           self.cache, self.cell_cache).items():
+            self.entries[name] = job.entry
+            self.sources[name] = job.path
+            self.terms[name] = job.terms
+        self.asset_hrefs = write_shell_assets(self.site_dir)
+        self.write_navigation()
+        self.write_search()
+        self.write_shell()
+
+    def update(self, paths):
+        """Rebuild what the changed `paths` affect; returns whether anything was rewritten"""
+        notebooks_changed = False
+        for path in paths:
+            if path == README_PATH:
+                self.write_shell()
+            elif os.path.exists(path):
+                notebooks_changed |= self.update_notebook(path)
+            else:
+                notebooks_changed |= self.remove_notebook(path)
+        if notebooks_changed:
+            self.write_navigation()
+            self.write_search()
+        return notebooks_changed or README_PATH in paths
+
+    def update_notebook(self, path):
+        converted = convert_notebook(path, self.cache, self.cell_cache)
+        if converted is None:
+            # Keep serving the last good version until the file is fixed
+            return False
+        self._write_notebook(path, *converted)
+        return True
+
+    def remove_notebook(self, path):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if self.sources.get(name) != path:
+            return False
+        self._remove_section(self.entries.pop(name))
+        del self.sources[name]
+        self.terms.pop(name, None)
+        print(f"Removed {path}")
+        # A notebook of the same name in the other format takes its place
+        for other in notebook_sources([name]):
+            self.update_notebook(other)
+        return True
+
+    def _write_notebook(self, path, name, fragment):
+        entry, self.terms[name] = write_notebook(self.site_dir, path, name, fragment)
+        previous = self.entries.get(name)
+        if previous and previous['src'] != entry['src']:
+            self._remove_section(previous)
+        self.entries[name] = entry
+        self.sources[name] = path
+
+    def _remove_section(self, entry):
+        section_path = os.path.join(self.site_dir, unquote(entry['src']))
+        if os.path.exists(section_path):
+            os.remove(section_path)
+
+    def write_navigation(self):
+        write_manifest(self.site_dir, [self.entries[name] for name in sorted(self.entries)])
+
+    def write_search(self):
+        write_search_index(self.terms, self.site_dir)
+
+    def write_shell(self):
+        write_shell(self.site_dir, load_readme_html(README_PATH), self.asset_hrefs)
+
+
+def watch(site_dir=SITE_DIR, host='127.0.0.1', port=8000, jobs=1, use_cache=True, interval=POLL_INTERVAL):
+    """Build, serve and rebuild the site on every change until interrupted"""
+    watcher = SiteWatcher(site_dir, jobs, use_cache)
+    files = watched_files()
+    start = time.perf_counter()
+    watcher.build([path for path in files if os.path.splitext(path)[1] in CELL_READERS])
+    print(f"Built {len(watcher.entries)} notebooks in {time.perf_counter() - start:.2f}s")
+
+    reloader = Reloader()
+    server, url = start_preview_server(site_dir, reloader, host, port)
+    print(f"Serving {site_dir} at {url} (Ctrl+C to stop); watching notebooks/ and {README_PATH}")
+    try:
+        while True:
+            time.sleep(interval)
+            current = watched_files()
+            paths = changed_paths(files, current)
+            if not paths:
+                continue
+            files = current
+            start = time.perf_counter()
+            if watcher.update(paths):
+                reloader.notify()
+                print(f"Rebuilt after changes to {', '.join(paths)} in "
+                      f"{(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
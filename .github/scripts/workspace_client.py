@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Connection-pooled client for the Databricks workspace API.
+One requests.Session is shared by a bounded thread pool so every request
+reuses a warm connection. Rate limiting (429) and transient server errors
+are retried with exponential backoff and jitter, honouring Retry-After.
+"""
+
+import os
+import time
+import random
+import hashlib
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import stage
+from stream_utils import decode_base64_json_field, CHUNK_SIZE
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _timed_chunks(chunks, span):
+    """Pass chunks through, timing the waits for each as the span's 'download' part"""
+    chunks = iter(chunks)
+    while True:
+        with span.part('download'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (delta-seconds or HTTP date), or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class WorkspaceClient:
+    """Reusable client for /api/2.0/workspace with pooling, retries and timeouts"""
+
+    def __init__(self, host, token, max_workers=8, timeout=(10, 120),
+                 max_retries=5, backoff_base=0.5, backoff_max=30.0):
+        self.host = host.rstrip('/')
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {token}'
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff delay for a retry attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get(self, endpoint, params=None, stream=False):
+        """GET an API endpoint, retrying rate limits, 5xx and connection errors"""
+        url = f"{self.host}{endpoint}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                response.close()
+                time.sleep(min(delay, self.backoff_max))
+                continue
+            return response
+
+    def try_list(self, path):
+        """List the objects directly under a workspace path, or None on failure"""
+        try:
+            response = self.get('/api/2.0/workspace/list', params={'path': path})
+        except requests.RequestException as e:
+            print(f"Failed to list {path}: {e}")
+            return None
+        if response.status_code == 200:
+            return response.json().get('objects', [])
+        print(f"Failed to list {path}: {response.status_code}")
+        return None
+
+    def export_html_to_file(self, notebook_path, dest_path):
+        """Stream a notebook's HTML export into `dest_path`
+
+        The base64 payload is decoded chunk by chunk as it arrives, so memory
+        use does not grow with the notebook. Returns the SHA-256 of the HTML,
+        or None on failure.
+        """
+        with stage('export', os.path.basename(notebook_path)) as span:
+            return self._export_html_to_file(notebook_path, dest_path, span)
+
+    def _export_html_to_file(self, notebook_path, dest_path, span):
+        try:
+            with span.part('request'):
+                response = self.get('/api/2.0/workspace/export',
+                                    params={'path': notebook_path, 'format': 'HTML'}, stream=True)
+        except requests.RequestException as e:
+            print(f"Failed to export {notebook_path}: {e}")
+            return None
+
+        with response:
+            if response.status_code != 200:
+                print(f"Failed to export {notebook_path}: {response.status_code}")
+                return None
+            try:
+                with open(dest_path, 'wb') as out:
+                    chunks = response.iter_content(CHUNK_SIZE)
+                    if not span.enabled:
+                        return decode_base64_json_field(chunks, out)
+                    # Split the streaming time into waiting for data and decoding it
+                    start = time.perf_counter()
+                    digest = decode_base64_json_field(_timed_chunks(chunks, span), out)
+                    span.add_part('decode', time.perf_counter() - start - span.parts.get('download', 0.0))
+                    span.add_bytes(out.tell())
+                    return digest
+            except (requests.RequestException, ValueError) as e:
+                print(f"Failed to export {notebook_path}: {e}")
+                if os.path.exists(dest_path):
+                    os.remove(dest_path)
+                return None
+
+    def export_directory_to_file(self, directory, dest_path, export_format='SOURCE'):
+        """Download a whole workspace folder as one archive into `dest_path`
+
+        SOURCE gives a zip of notebook sources, DBC a Databricks archive. The
+        archive is requested as a direct download and streamed to disk; a
+        JSON (base64) response is decoded on the fly instead. Returns the
+        SHA-256 of the archive, or None on failure.
+        """
+        with stage('export_archive', directory) as span:
+            try:
+                with span.part('request'):
+                    response = self.get('/api/2.0/workspace/export', stream=True, params={
+                        'path': directory, 'format': export_format, 'direct_download': 'true'})
+            except requests.RequestException as e:
+                print(f"Failed to export {directory}: {e}")
+                return None
+
+            with response:
+                if response.status_code != 200:
+                    print(f"Failed to export {directory}: {response.status_code} {response.text[:200]}")
+                    return None
+                try:
+                    with open(dest_path, 'wb') as out:
+                        chunks = _timed_chunks(response.iter_content(CHUNK_SIZE), span)
+                        if response.headers.get('Content-Type', '').startswith('application/json'):
+                            digest = decode_base64_json_field(chunks, out)
+                        else:
+                            hasher = hashlib.sha256()
+                            for chunk in chunks:
+                                hasher.update(chunk)
+                                out.write(chunk)
+                            digest = hasher.hexdigest()
+                        span.add_bytes(out.tell())
+                        return digest
+                except (requests.RequestException, ValueError) as e:
+                    print(f"Failed to export {directory}: {e}")
+                    if os.path.exists(dest_path):
+                        os.remove(dest_path)
+                    return None
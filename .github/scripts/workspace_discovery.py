@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Discover notebooks in a Databricks workspace by walking the directory tree.
+The walk is breadth-first and lists each level concurrently through the
+shared WorkspaceClient. Every directory is listed on every run: a folder's
+modified_at is not bumped by edits further down the tree, so it cannot tell
+whether a subtree changed. The listings are cached only so that a directory
+whose listing fails is walked from its last good listing instead of
+dropping its notebooks from the site.
+"""
+
+import os
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_INDEX_CACHE = '.cache/workspace_index.json'
+
+# Object types that can contain notebooks
+CONTAINER_TYPES = {'DIRECTORY', 'REPO'}
+
+# Listing fields worth keeping; everything else is dropped from the cache
+KEPT_FIELDS = ('path', 'object_type', 'object_id', 'modified_at', 'language')
+
+
+def _slim(obj):
+    return {k: obj[k] for k in KEPT_FIELDS if k in obj}
+
+
+def load_index_cache(cache_path, root):
+    """Return cached directory listings for `root`, or {} if there are none"""
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('root') != root:
+        return {}
+    return data.get('directories', {})
+
+
+def save_index_cache(cache_path, root, directories):
+    """Write directory listings atomically"""
+    cache_dir = os.path.dirname(cache_path) or '.'
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'root': root, 'directories': directories}, f)
+    os.replace(tmp_path, cache_path)
+
+
+def walk_workspace(client, root, cache_path=None):
+    """Breadth-first walk below `root`, returning (notebook objects, stats)"""
+    cached_dirs = load_index_cache(cache_path, root)
+    directories = {}
+    notebooks = []
+    stats = {'listed': 0, 'reused': 0, 'failed': 0}
+
+    frontier = [root]
+    with ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+        while frontier:
+            next_frontier = []
+            for path, objects in zip(frontier, executor.map(client.try_list, frontier)):
+                if objects is not None:
+                    objects = [_slim(obj) for obj in objects]
+                    stats['listed'] += 1
+                elif path in cached_dirs:
+                    # Listing failed: fall back to the last good one
+                    objects = cached_dirs[path]['objects']
+                    stats['reused'] += 1
+                else:
+                    stats['failed'] += 1
+                    continue
+                directories[path] = {'objects': objects}
+                for obj in objects:
+                    if obj.get('object_type') in CONTAINER_TYPES:
+                        next_frontier.append(obj['path'])
+                    elif obj.get('object_type') == 'NOTEBOOK':
+                        notebooks.append(obj)
+            frontier = next_frontier
+
+    if cache_path:
+        save_index_cache(cache_path, root, directories)
+
+    return notebooks, stats
+
+
+def build_notebook_index(notebooks):
+    """Map notebook name -> listing object
+
+    When several notebooks share a name the shallowest path wins, then the
+    lexicographically smallest.
+    """
+    index = {}
+    duplicates = 0
+    for obj in sorted(notebooks, key=lambda o: (o['path'].count('/'), o['path'])):
+        name = obj['path'].rsplit('/', 1)[-1]
+        if name in index:
+            duplicates += 1
+            continue
+        index[name] = obj
+    return index, duplicates
+
+
+def discover_notebooks(client, root, cache_path=DEFAULT_INDEX_CACHE):
+    """Discover notebooks below `root` and return the name -> object index"""
+    notebooks, stats = walk_workspace(client, root, cache_path)
+    index, duplicates = build_notebook_index(notebooks)
+    print(f"Discovered {len(notebooks)} notebooks under {root} "
+          f"({stats['listed']} directories listed, {stats['reused']} failed and taken from cache, "
+          f"{stats['failed']} failed)")
+    if duplicates:
+        print(f"{duplicates} notebooks share a name with a shallower notebook and were skipped")
+    return index